@@ -0,0 +1,88 @@
+"""
+Analysis Worker module
+Contains the background thread that runs the MCDA methods off the GUI thread
+and reports every method as soon as it finishes
+"""
+
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from mcda_methods import perform_analysis_parallel
+from pareto import non_dominated_sort
+
+
+class AnalysisWorker(QThread):
+    """
+    Thread running perform_analysis_parallel for the main window
+    
+    Signals are emitted from the worker thread and delivered to slots in the
+    GUI thread through queued connections, so the event loop keeps running
+    while the methods are computed. Cancellation is cooperative: methods that
+    have not finished are reported as cancelled right away, while a method
+    already running in a thread completes in the background and is discarded.
+    """
+    
+    # Method name and its MethodRun, as soon as the method is done
+    method_finished = pyqtSignal(str, object)
+    # Number of finished methods and the total number of methods
+    progress = pyqtSignal(int, int)
+    # Pareto layer of every alternative (0 is the Pareto front), once the methods are done
+    pareto_layers_ready = pyqtSignal(object)
+    # Rankings of all methods (empty lists for failed ones), as returned by perform_analysis
+    analysis_finished = pyqtSignal(dict)
+    # Error message if the analysis could not run at all
+    analysis_failed = pyqtSignal(str)
+    
+    def __init__(self, data, methods, weights, top_k=None, timeout=None, parent=None):
+        """
+        Args:
+            data: Decision matrix (alternatives x criteria)
+            methods: List of method names to use
+            weights: Criteria weights
+            top_k: Rank only the best top_k alternatives of each method (all if None)
+            timeout: Per-method time limit in seconds (none if None)
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.data = data
+        self.methods = list(methods)
+        self.weights = weights
+        self.top_k = top_k
+        self.timeout = timeout
+        self._cancel_event = threading.Event()
+        self._finished_count = 0
+    
+    def cancel(self):
+        """Ask the analysis to stop; safe to call from any thread"""
+        self._cancel_event.set()
+    
+    def is_cancelled(self):
+        """Whether cancel() was called"""
+        return self._cancel_event.is_set()
+    
+    def _on_method_run(self, run):
+        """perform_analysis_parallel callback, called in the worker thread"""
+        self._finished_count += 1
+        self.method_finished.emit(run.method, run)
+        self.progress.emit(self._finished_count, len(self.methods))
+    
+    def run(self):
+        """Run the analysis (executed in the worker thread by start())"""
+        self._finished_count = 0
+        try:
+            runs = perform_analysis_parallel(
+                self.data, self.methods, self.weights, top_k=self.top_k, timeout=self.timeout,
+                cancel_event=self._cancel_event, callback=self._on_method_run
+            )
+        except Exception as e:
+            self.analysis_failed.emit(str(e))
+            return
+        if not self.is_cancelled() and len(self.data):
+            # Sorted here rather than in the results window, it is O(n^2 k) in the worst case
+            try:
+                self.pareto_layers_ready.emit(non_dominated_sort(self.data))
+            except ValueError:
+                pass
+        self.analysis_finished.emit({method: run.result.tolist() if run.ok else []
+                                     for method, run in runs.items()})
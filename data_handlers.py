@@ -3,13 +3,479 @@ Data Handlers module
 Contains classes and functions for managing data sources and validation
 """
 
+import os
 import csv
 import json
 import xml.etree.ElementTree as ET
 import sqlite3
+import tempfile
+from itertools import islice
+from urllib.request import pathname2url
 import pandas as pd
 import numpy as np
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Iterator, Optional, Tuple, Callable
+
+
+# Number of rows parsed per block by the streaming loaders
+DEFAULT_BLOCK_ROWS = 65536
+
+# Metadata stored next to native .npy matrices
+METADATA_KEYS = ('criteria_names', 'alternatives_names', 'directions')
+
+# Children of the XML root that hold one row of values each
+XML_ROW_TAGS = ('row', 'alternative', 'record', 'value', 'cell', 'criterion')
+
+# SQLite read tuning: bytes of the database file accessed through mmap and page cache size in KiB
+SQLITE_MMAP_SIZE = 1 << 28
+SQLITE_CACHE_KIB = 1 << 16
+
+# Allowed values of the journal_mode and synchronous pragmas for SQLite writes
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# File extensions read and written through pyarrow
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+# How non-numeric and empty cells are stored: 'zero' replaces them with 0.0, 'nan' keeps NaN
+MISSING_POLICIES = ('zero', 'nan')
+
+
+def metadata_path(file_path: str) -> str:
+    """Path of the JSON sidecar holding the metadata of a native .npy matrix"""
+    return file_path + '.json'
+
+
+def _import_pyarrow():
+    """Import pyarrow lazily, it is only needed for the columnar formats"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow formats require pyarrow: pip install pyarrow")
+
+
+def _apply_missing_policy(block: np.ndarray, missing: str) -> np.ndarray:
+    """Replace NaN cells of a block in place according to the missing-value policy"""
+    if missing == 'zero':
+        np.nan_to_num(block, copy=False, nan=0.0, posinf=np.inf, neginf=-np.inf)
+    elif missing != 'nan':
+        raise ValueError(f"Unknown missing value policy: {missing}. Valid options: {MISSING_POLICIES}")
+    return block
+
+
+def count_lines(file_path: str, chunk_size: int = 1 << 20) -> int:
+    """
+    Count the lines of a text file without decoding it
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read at a time
+        
+    Returns:
+        Number of lines (a last line without a trailing newline is counted)
+    """
+    lines = 0
+    last = b'\n'
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    return lines + (last != b'\n')
+
+
+def coerce_numeric(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert tabular values to a float64 matrix in one vectorized pass
+    
+    Numeric columns are copied as is, other columns go through pandas.to_numeric,
+    so no cell is converted by a Python-level try/except.
+    
+    Args:
+        values: DataFrame, 2D array or list of rows (short rows are padded)
+        
+    Returns:
+        Tuple of (matrix with NaN in place of non-numeric cells,
+        boolean mask of the cells that are non-numeric, empty or NaN)
+    """
+    frame = values if isinstance(values, pd.DataFrame) else pd.DataFrame(values)
+    # Column-major layout makes every column a contiguous write
+    matrix = np.empty(frame.shape, dtype=np.float64, order='F')
+    for j in range(frame.shape[1]):
+        matrix[:, j] = _column_to_float(frame.iloc[:, j])
+    return matrix, np.isnan(matrix)
+
+
+def _column_to_float(column: pd.Series) -> np.ndarray:
+    """Convert one column to float64, NaN where a cell is not a number"""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    try:
+        # NumPy parses numeric strings with correct rounding
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    except (ValueError, TypeError):
+        pass
+    
+    # pandas finds the non-numeric cells, the valid ones are re-parsed exactly when possible
+    converted = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(converted)
+    try:
+        converted[valid] = column[valid].to_numpy(dtype=np.float64)
+    except (ValueError, TypeError):
+        pass
+    return converted
+
+
+def csv_width(file_path: str, chunk_size: int = 1 << 20) -> Optional[int]:
+    """
+    Number of fields in the widest row of a CSV file, counted from the raw bytes
+    
+    Args:
+        file_path: Path to the CSV file
+        chunk_size: Number of bytes read at a time
+        
+    Returns:
+        Widest row width, or None if the file has quoted fields (commas inside
+        quotes cannot be told apart without parsing)
+    """
+    width = 0
+    carry = 0
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            if b'"' in chunk:
+                return None
+            buffer = np.frombuffer(chunk, dtype=np.uint8)
+            commas = np.flatnonzero(buffer == ord(','))
+            ends = np.flatnonzero(buffer == ord('\n'))
+            if len(ends):
+                # Commas before every line end, differenced into commas per line
+                before = np.searchsorted(commas, ends)
+                per_line = np.diff(before, prepend=0)
+                per_line[0] += carry
+                width = max(width, int(per_line.max()) + 1)
+                carry = len(commas) - int(before[-1])
+            else:
+                carry += len(commas)
+    return max(width, carry + 1)
+
+
+def _iter_coerced_csv(file_path: str, block_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream a CSV file as (matrix, non-numeric mask) blocks
+    
+    Rows may differ in length: the pandas tokenizer is given the width of the
+    widest row, otherwise it rejects a long row in the first block and drops
+    the extra fields of long rows in later blocks. Files with quoted fields
+    are read with the csv module.
+    """
+    width = csv_width(file_path)
+    if width is None:
+        yield from _iter_coerced_csv_rows(file_path, block_rows)
+        return
+    # round_trip parsing gives the same values as float(), the default parser may be off by one ulp
+    with pd.read_csv(file_path, header=None, names=range(width), chunksize=block_rows, encoding='utf-8',
+                     skip_blank_lines=True, low_memory=False, float_precision='round_trip') as reader:
+        for chunk in reader:
+            yield coerce_numeric(chunk)
+
+
+def _iter_coerced_csv_rows(file_path: str, block_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Stream a CSV file of rows of any width with the csv module"""
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        rows = (row for row in csv.reader(f) if row)
+        while True:
+            block = list(islice(rows, block_rows))
+            if not block:
+                break
+            yield coerce_numeric(block)
+
+
+def _iter_coerced_xml(file_path: str, block_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream an XML file as (matrix, non-numeric mask) blocks
+    
+    The file is parsed incrementally and every row element is cleared once its
+    values are taken, so memory does not grow with the size of the document.
+    """
+    rows = []
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(file_path, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if depth == 1:
+                root = element
+            continue
+        
+        if depth == 2:
+            if element.tag.lower() in XML_ROW_TAGS:
+                row = [child.text for child in element]
+                if row:
+                    rows.append(row)
+            # Drop the processed row from the root as well as its own children
+            element.clear()
+            root.clear()
+            if len(rows) >= block_rows:
+                yield coerce_numeric(rows)
+                rows = []
+        depth -= 1
+    
+    if rows:
+        yield coerce_numeric(rows)
+
+
+def _iter_json_array(f) -> Iterator[Any]:
+    """
+    Parse the elements of a top-level JSON array one by one
+    
+    Uses ijson when it is installed, otherwise decodes the file chunk by chunk
+    with the standard decoder so that the whole document is never in memory.
+    """
+    try:
+        import ijson
+        yield from ijson.items(f.buffer, 'item', use_float=True)
+        return
+    except ImportError:
+        pass
+    
+    decoder = json.JSONDecoder()
+    buffer = f.read(1 << 20).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Expected a top-level JSON array")
+    pos = 1
+    eof = False
+    while True:
+        # Skip whitespace and separators, reading more text when the buffer runs out
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(1 << 20), 0
+            eof = not buffer
+        if pos >= len(buffer) or buffer[pos] == ']':
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+            # A number at the very end of the buffer may continue in the next chunk
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield value
+            pos = end
+            continue
+        chunk = f.read(1 << 20)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+
+def _iter_json_lines(f) -> Iterator[Any]:
+    """Parse a JSON Lines file, one value per non-empty line"""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_coerced_json(elements: Iterator[Any], block_rows: int,
+                       columns: List[str]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Turn a stream of JSON values into (matrix, non-numeric mask) blocks
+    
+    Arrays are rows and objects are records whose keys are criterion columns;
+    the keys are appended to columns in order of first appearance. A stream of
+    plain numbers forms a single row.
+    """
+    batch = []
+    scalars = []
+    
+    def flush():
+        if isinstance(batch[0], dict):
+            frame = pd.DataFrame.from_records(batch)
+            columns.extend(key for key in frame.columns if key not in columns)
+            return coerce_numeric(frame.reindex(columns=columns))
+        return coerce_numeric(batch)
+    
+    for element in elements:
+        if isinstance(element, (list, dict)):
+            batch.append(element)
+            if len(batch) >= block_rows:
+                yield flush()
+                batch = []
+        else:
+            scalars.append(element)
+    
+    if batch:
+        yield flush()
+    if scalars:
+        yield coerce_numeric([scalars])
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for use in an SQLite statement"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def connect_sqlite_readonly(file_path: str) -> sqlite3.Connection:
+    """
+    Open an SQLite database read-only with pragmas tuned for bulk reads
+    
+    Args:
+        file_path: Path to the database
+        
+    Returns:
+        Connection that cannot modify the database
+    """
+    uri = 'file:' + pathname2url(os.path.abspath(file_path)) + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    # A negative cache size is in KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = {-SQLITE_CACHE_KIB}")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def sqlite_select(conn: sqlite3.Connection, table: Optional[str] = None, query: Optional[str] = None,
+                  columns: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Build the SELECT statement reading a decision matrix
+    
+    Args:
+        conn: Database connection
+        table: Table to read (the first user table if neither table nor query is given)
+        query: SQL query to read instead of a table
+        columns: Columns to project, all columns if None
+        
+    Returns:
+        SELECT statement, or None if the database has no tables
+    """
+    if query is not None:
+        source = f"({query.strip().rstrip(';')})"
+    else:
+        if table is None:
+            row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                               "AND name NOT LIKE 'sqlite_%' ORDER BY rowid LIMIT 1").fetchone()
+            if row is None:
+                return None
+            table = row[0]
+        source = quote_identifier(table)
+    projection = ', '.join(quote_identifier(column) for column in columns) if columns else '*'
+    return f"SELECT {projection} FROM {source}"
+
+
+def connect_sqlite_for_writing(file_path: str, journal_mode: Optional[str] = None,
+                               synchronous: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open an SQLite database for bulk writes
+    
+    Args:
+        file_path: Path to the database (created if missing)
+        journal_mode: Journal mode pragma, e.g. 'WAL' (database default if None)
+        synchronous: Synchronous pragma, e.g. 'NORMAL' (database default if None)
+        
+    Returns:
+        Connection with the pragmas applied
+    """
+    if journal_mode is not None and journal_mode.upper() not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unknown journal mode: {journal_mode}. Valid options: {SQLITE_JOURNAL_MODES}")
+    if synchronous is not None and synchronous.upper() not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unknown synchronous mode: {synchronous}. Valid options: {SQLITE_SYNCHRONOUS_MODES}")
+    
+    conn = sqlite3.connect(file_path)
+    if journal_mode is not None:
+        conn.execute(f"PRAGMA journal_mode = {journal_mode.upper()}")
+    if synchronous is not None:
+        conn.execute(f"PRAGMA synchronous = {synchronous.upper()}")
+    return conn
+
+
+def _iter_matrix_rows(matrix: np.ndarray, block_rows: int = DEFAULT_BLOCK_ROWS) -> Iterator[List[float]]:
+    """Rows of a matrix as Python lists, converted one block at a time"""
+    for start in range(0, len(matrix), block_rows):
+        yield from matrix[start:start + block_rows].tolist()
+
+
+def _iter_coerced_sqlite(cursor: sqlite3.Cursor, block_rows: int, total: Optional[int] = None,
+                         progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                         ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Stream the rows of an executed cursor as (matrix, non-numeric mask) blocks"""
+    loaded = 0
+    while True:
+        rows = cursor.fetchmany(block_rows)
+        if not rows:
+            break
+        loaded += len(rows)
+        yield coerce_numeric(rows)
+        if progress_callback:
+            progress_callback(loaded, total)
+
+
+def iter_csv_blocks(file_path: str, block_rows: int = DEFAULT_BLOCK_ROWS,
+                    missing: str = 'zero') -> Iterator[np.ndarray]:
+    """
+    Stream a CSV decision matrix as blocks of float64 rows
+    
+    Args:
+        file_path: Path to the CSV file
+        block_rows: Number of rows per block
+        missing: 'zero' to store non-numeric and empty cells as 0.0, 'nan' to keep NaN
+        
+    Yields:
+        Float64 arrays of at most block_rows rows
+    """
+    for block, _ in _iter_coerced_csv(file_path, block_rows):
+        yield _apply_missing_policy(block, missing)
+
+
+def collect_blocks(blocks: Iterator[np.ndarray], expected_rows: Optional[int] = None) -> np.ndarray:
+    """
+    Copy a stream of row blocks into one float64 matrix
+    
+    The matrix is preallocated with expected_rows rows (an upper bound is fine)
+    and grown by doubling if the stream turns out to be longer. Blocks with
+    fewer columns than the others are padded with NaN.
+    
+    Args:
+        blocks: Iterator of 2D float arrays
+        expected_rows: Expected number of rows, if known
+        
+    Returns:
+        Float64 matrix with all rows
+    """
+    matrix = None
+    n_rows = 0
+    for block in blocks:
+        if matrix is None:
+            capacity = max(expected_rows or 0, len(block), 1)
+            matrix = np.empty((capacity, block.shape[1]), dtype=np.float64)
+        needed = n_rows + len(block)
+        width = max(matrix.shape[1], block.shape[1])
+        if needed > len(matrix) or width > matrix.shape[1]:
+            capacity = max(2 * len(matrix), needed) if needed > len(matrix) else len(matrix)
+            grown = np.empty((capacity, width), dtype=np.float64)
+            grown[:n_rows, :matrix.shape[1]] = matrix[:n_rows]
+            grown[:n_rows, matrix.shape[1]:] = np.nan
+            matrix = grown
+        matrix[n_rows:n_rows + len(block), :block.shape[1]] = block
+        matrix[n_rows:n_rows + len(block), block.shape[1]:] = np.nan
+        n_rows += len(block)
+    
+    if matrix is None:
+        return np.empty((0, 0), dtype=np.float64)
+    if n_rows < len(matrix):
+        # Release the unused tail instead of keeping a view on the larger buffer
+        matrix = matrix[:n_rows].copy() if n_rows < len(matrix) // 2 else matrix[:n_rows]
+    return matrix
 
 
 class DataManager:
@@ -21,154 +487,221 @@ class DataManager:
         self.data = None
         self.original_data = None
         self.metadata = {}
+        # Cells of the last loaded file that were not numbers, None if the format is typed
+        self.non_numeric_mask = None
         
-    def load_from_file(self, file_path: str) -> bool:
+    def load_from_file(self, file_path: str, missing: str = 'zero', columns: Optional[List[str]] = None,
+                       filters: Optional[List[Any]] = None, table: Optional[str] = None,
+                       query: Optional[str] = None,
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bool:
         """
         Load data from various file formats
         
         Args:
             file_path: Path to the file to load
+            missing: 'zero' to store non-numeric and empty cells as 0.0, 'nan' to keep
+                NaN for clean_data; the cells are listed in non_numeric_mask
+            columns: Criteria (column names) to read (Parquet, Arrow and SQLite only)
+            filters: Row filters applied before loading, in the pyarrow form
+                [('col', '>', 0), ...] (Parquet and Arrow only)
+            table: Table to read (SQLite only, the first table by default)
+            query: SQL query to read instead of a table (SQLite only)
+            progress_callback: Called with (rows loaded, total rows) after every
+                block (SQLite only)
             
         Returns:
             True if loading was successful, False otherwise
         """
         try:
+            # Names and counts of the previous file must not outlive it
+            self.metadata = {}
+            self.non_numeric_mask = None
             if file_path.endswith('.csv'):
-                self.data = self._load_csv(file_path)
+                self.data = self._load_csv(file_path, missing)
             elif file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-                self.data = self._load_excel(file_path)
-            elif file_path.endswith('.json'):
-                self.data = self._load_json(file_path)
+                self.data = self._load_excel(file_path, missing)
+            elif file_path.endswith(('.json', '.jsonl', '.ndjson')):
+                self.data = self._load_json(file_path, missing)
             elif file_path.endswith('.xml'):
-                self.data = self._load_xml(file_path)
+                self.data = self._load_xml(file_path, missing)
             elif file_path.endswith('.db') or file_path.endswith('.sqlite'):
-                self.data = self._load_sqlite(file_path)
+                self.data = self._load_sqlite(file_path, missing, table, query, columns, progress_callback)
+            elif file_path.endswith('.npy'):
+                self.data = self._load_npy(file_path)
+            elif file_path.endswith(PARQUET_EXTENSIONS):
+                self.data = self._load_columnar(file_path, 'parquet', columns, filters, missing)
+            elif file_path.endswith(ARROW_EXTENSIONS):
+                self.data = self._load_columnar(file_path, 'ipc', columns, filters, missing)
             else:
                 raise ValueError(f"Unsupported file format: {file_path}")
                 
-            self.original_data = self.data.copy()
+            if not isinstance(self.data, np.memmap):
+                self.data = np.asarray(self.data, dtype=np.float64)
+            # clean_data never modifies the matrix in place, so the original can share it
+            self.original_data = self.data
             return True
         except Exception as e:
             print(f"Error loading file {file_path}: {str(e)}")
             return False
     
-    def _load_csv(self, file_path: str) -> List[List[float]]:
-        """Load data from CSV file"""
-        data = []
-        with open(file_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                float_row = []
-                for cell in row:
-                    try:
-                        float_row.append(float(cell))
-                    except ValueError:
-                        # Skip non-numeric cells
-                        float_row.append(0.0)
-                data.append(float_row)
-        return data
+    def iter_blocks(self, file_path: str, block_rows: int = DEFAULT_BLOCK_ROWS,
+                    missing: str = 'zero') -> Iterator[np.ndarray]:
+        """
+        Stream a data file as blocks of float64 rows without loading it whole
+        
+        Args:
+            file_path: Path to the file (CSV, XML or SQLite)
+            block_rows: Number of rows per block
+            missing: 'zero' to store non-numeric and empty cells as 0.0, 'nan' to keep NaN
+            
+        Returns:
+            Iterator of float64 arrays of at most block_rows rows
+        """
+        if file_path.endswith('.csv'):
+            chunks = _iter_coerced_csv(file_path, block_rows)
+        elif file_path.endswith('.xml'):
+            chunks = _iter_coerced_xml(file_path, block_rows)
+        elif file_path.endswith('.db') or file_path.endswith('.sqlite'):
+            chunks = self._iter_sqlite_file(file_path, block_rows)
+        else:
+            raise ValueError(f"Streaming is not supported for: {file_path}")
+        return (_apply_missing_policy(block, missing) for block, _ in chunks)
+    
+    def _coerce(self, values: Any, missing: str) -> np.ndarray:
+        """Run loaded values through the shared numeric coercion and record the mask"""
+        matrix, self.non_numeric_mask = coerce_numeric(values)
+        return _apply_missing_policy(matrix, missing)
     
-    def _load_excel(self, file_path: str) -> List[List[float]]:
+    def _collect_coerced(self, chunks: Iterator[Tuple[np.ndarray, np.ndarray]], missing: str,
+                         expected_rows: Optional[int] = None) -> np.ndarray:
+        """Collect streamed (matrix, mask) blocks into one matrix and record the mask"""
+        matrix = collect_blocks((block for block, _ in chunks), expected_rows)
+        # Padding of short rows is NaN as well, so the mask is taken from the collected matrix
+        self.non_numeric_mask = np.isnan(matrix)
+        return _apply_missing_policy(matrix, missing)
+    
+    def _load_csv(self, file_path: str, missing: str = 'zero') -> np.ndarray:
+        """Load data from CSV file, streaming it in blocks into a preallocated matrix"""
+        return self._collect_coerced(_iter_coerced_csv(file_path, DEFAULT_BLOCK_ROWS), missing, count_lines(file_path))
+    
+    def _load_excel(self, file_path: str, missing: str = 'zero') -> np.ndarray:
         """Load data from Excel file"""
-        df = pd.read_excel(file_path, header=None)
-        # Convert to numeric, replacing non-numeric values with NaN, then fill with 0
-        df = pd.to_numeric(df.stack(), errors='coerce').unstack().fillna(0.0)
-        return df.values.tolist()
+        return self._coerce(pd.read_excel(file_path, header=None), missing)
     
-    def _load_json(self, file_path: str) -> List[List[float]]:
-        """Load data from JSON file"""
+    def _load_json(self, file_path: str, missing: str = 'zero') -> np.ndarray:
+        """
+        Load data from JSON or JSON Lines file
+        
+        JSON Lines files and top-level JSON arrays are parsed incrementally and
+        collected in blocks. Arrays are rows, objects are records whose keys
+        become the criteria names. A top-level object is either a mapping of
+        criterion names to columns or a single record.
+        """
+        columns = []
         with open(file_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-            
-        # Handle different JSON structures
-        if isinstance(raw_data, list):
-            if len(raw_data) > 0 and isinstance(raw_data[0], list):
-                # Already in matrix format
-                data = raw_data
+            if file_path.endswith(('.jsonl', '.ndjson')):
+                elements = _iter_json_lines(f)
+                expected_rows = count_lines(file_path)
             else:
-                # Single array - convert to matrix
-                data = [raw_data]
-        else:
-            # Object format - extract values
-            data = [list(raw_data.values())] if isinstance(raw_data, dict) else []
+                first = f.read(1 << 10).lstrip()[:1]
+                f.seek(0)
+                if first == '{':
+                    raw_data = json.load(f)
+                    if raw_data and all(isinstance(v, list) for v in raw_data.values()):
+                        # Column format - one list of values per criterion
+                        self.metadata['criteria_names'] = [str(key) for key in raw_data]
+                        return self._coerce(pd.DataFrame(raw_data), missing)
+                    elements = iter([raw_data])
+                else:
+                    elements = _iter_json_array(f)
+                expected_rows = None
             
-        # Convert to float matrix
-        result = []
-        for row in data:
-            float_row = []
-            for cell in row:
-                try:
-                    float_row.append(float(cell))
-                except (ValueError, TypeError):
-                    float_row.append(0.0)
-            result.append(float_row)
-        return result
-    
-    def _load_xml(self, file_path: str) -> List[List[float]]:
-        """Load data from XML file"""
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        data = []
-        # Look for various possible structures
-        for element in root:
-            if element.tag.lower() in ['row', 'alternative', 'record']:
-                row = []
-                for subelement in element:
-                    try:
-                        row.append(float(subelement.text or '0'))
-                    except ValueError:
-                        row.append(0.0)
-                if row:
-                    data.append(row)
-            elif element.tag.lower() in ['value', 'cell', 'criterion']:
-                # Flat structure - treat as single row
-                row = []
-                for subelement in element:
-                    try:
-                        row.append(float(subelement.text or '0'))
-                    except ValueError:
-                        row.append(0.0)
-                if row:
-                    data.append(row)
-                    
-        return data
-    
-    def _load_sqlite(self, file_path: str) -> List[List[float]]:
-        """Load data from SQLite database"""
-        conn = sqlite3.connect(file_path)
-        cursor = conn.cursor()
-        
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+            matrix = self._collect_coerced(_iter_coerced_json(elements, DEFAULT_BLOCK_ROWS, columns),
+                                           missing, expected_rows)
         
-        if not tables:
+        if columns:
+            self.metadata['criteria_names'] = [str(key) for key in columns]
+        return matrix
+    
+    def _load_xml(self, file_path: str, missing: str = 'zero') -> np.ndarray:
+        """Load data from XML file, parsing it incrementally into a growing matrix"""
+        return self._collect_coerced(_iter_coerced_xml(file_path, DEFAULT_BLOCK_ROWS), missing)
+    
+    def _iter_sqlite_file(self, file_path: str, block_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Stream the first table of an SQLite database, closing the connection at the end"""
+        conn = connect_sqlite_readonly(file_path)
+        try:
+            sql = sqlite_select(conn)
+            if sql is not None:
+                yield from _iter_coerced_sqlite(conn.execute(sql), block_rows)
+        finally:
             conn.close()
-            return []
+    
+    def _load_sqlite(self, file_path: str, missing: str = 'zero', table: Optional[str] = None,
+                     query: Optional[str] = None, columns: Optional[List[str]] = None,
+                     progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> np.ndarray:
+        """
+        Load data from SQLite database
+        
+        The database is opened read-only, the rows are counted first so that the
+        matrix can be preallocated and progress reported, then fetched in blocks.
+        """
+        conn = connect_sqlite_readonly(file_path)
+        try:
+            sql = sqlite_select(conn, table, query, columns)
+            if sql is None:
+                return np.empty((0, 0))
             
-        # Use first table
-        table_name = tables[0][0]
-        
-        # Get all data from the table
-        cursor.execute(f"SELECT * FROM {table_name};")
-        rows = cursor.fetchall()
-        
-        conn.close()
-        
-        # Convert to float matrix
-        data = []
-        for row in rows:
-            float_row = []
-            for cell in row:
-                try:
-                    float_row.append(float(cell))
-                except (ValueError, TypeError):
-                    float_row.append(0.0)
-            data.append(float_row)
+            total = conn.execute(f"SELECT COUNT(*) FROM ({sql})").fetchone()[0]
+            self.metadata['row_count'] = total
+            if progress_callback:
+                progress_callback(0, total)
             
+            cursor = conn.execute(sql)
+            self.metadata['criteria_names'] = [description[0] for description in cursor.description]
+            chunks = _iter_coerced_sqlite(cursor, DEFAULT_BLOCK_ROWS, total, progress_callback)
+            return self._collect_coerced(chunks, missing, total)
+        finally:
+            conn.close()
+    
+    def _load_npy(self, file_path: str) -> np.memmap:
+        """
+        Load a native .npy matrix by memory mapping it read-only
+        
+        Only the header is read, pages of the matrix are loaded on access and
+        shared between processes mapping the same file. Criteria names,
+        alternative names and directions are read from the JSON sidecar.
+        """
+        data = np.load(file_path, mmap_mode='r', allow_pickle=False)
+        if data.dtype != np.float64 or data.ndim != 2:
+            raise ValueError(f"Expected a 2D float64 matrix, got {data.ndim}D {data.dtype}")
+        
+        sidecar = metadata_path(file_path)
+        if os.path.exists(sidecar):
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            self.metadata.update({key: stored[key] for key in METADATA_KEYS if key in stored})
         return data
     
+    def _load_columnar(self, file_path: str, file_format: str, columns: Optional[List[str]] = None,
+                       filters: Optional[List[Any]] = None, missing: str = 'zero') -> np.ndarray:
+        """
+        Load a Parquet or Arrow IPC file
+        
+        Only the requested columns are read and the filters are pushed down to
+        the reader, so row groups that cannot match are skipped. Column names
+        become the criteria names.
+        """
+        pa = _import_pyarrow()
+        
+        dataset = pa.dataset.dataset(file_path, format=file_format)
+        expression = pa.parquet.filters_to_expression(filters) if filters else None
+        table = dataset.to_table(columns=columns, filter=expression)
+        
+        self.metadata['criteria_names'] = table.column_names
+        # Typed numeric columns reach the coercion stage without a Python-level conversion
+        return self._coerce(table.to_pandas(), missing)
+    
     def validate_data(self) -> Dict[str, Any]:
         """
         Validate the loaded data
@@ -179,6 +712,9 @@ class DataManager:
         if self.data is None:
             return {'valid': False, 'errors': ['No data loaded']}
         
+        if isinstance(self.data, np.ndarray):
+            return self._validate_array(self.data)
+        
         errors = []
         warnings = []
         
@@ -217,6 +753,27 @@ class DataManager:
             'has_missing_values': any(any(pd.isna(val) for val in row) for row in self.data) if self.data else False
         }
     
+    def _validate_array(self, arr: np.ndarray) -> Dict[str, Any]:
+        """Validate a decision matrix held as a NumPy array"""
+        errors = []
+        warnings = []
+        
+        if arr.ndim != 2 or arr.size == 0:
+            errors.append('Data is empty or not a matrix')
+        elif not np.issubdtype(arr.dtype, np.number):
+            errors.append(f'Non-numeric data type: {arr.dtype}')
+        else:
+            if arr.shape[0] < 2:
+                warnings.append('At least 2 alternatives are recommended')
+        
+        return {
+            'valid': len(errors) == 0,
+            'errors': errors,
+            'warnings': warnings,
+            'shape': arr.shape if arr.ndim == 2 else (0, 0),
+            'has_missing_values': bool(np.isnan(arr).any()) if not errors else False
+        }
+    
     def clean_data(self, strategy='fill_zero') -> bool:
         """
         Clean the data according to specified strategy
@@ -231,31 +788,25 @@ class DataManager:
             return False
             
         try:
-            # Convert to numpy array for easier manipulation
-            arr = np.array(self.data, dtype=float)
+            # Arrays are used as is (no copy); the result is always a new array
+            was_list = isinstance(self.data, list)
+            arr = np.asarray(self.data, dtype=float)
             
             # Identify problematic values
-            mask = np.isnan(arr) | np.isinf(arr)
+            mask = ~np.isfinite(arr)
             
             if not np.any(mask):
                 # No cleaning needed
                 return True
                 
             if strategy == 'fill_zero':
-                arr[mask] = 0.0
+                arr = np.where(mask, 0.0, arr)
             elif strategy == 'fill_mean':
-                # Fill each column separately
-                for j in range(arr.shape[1]):
-                    col = arr[:, j]
-                    col_mask = np.isnan(col) | np.isinf(col)
-                    if np.any(col_mask):
-                        # Calculate mean of valid values in the column
-                        valid_vals = col[~col_mask]
-                        if len(valid_vals) > 0:
-                            fill_val = np.mean(valid_vals)
-                            arr[col_mask, j] = fill_val
-                        else:
-                            arr[col_mask, j] = 0.0
+                # Fill each column with the mean of its valid values (0.0 if there are none)
+                valid_counts = np.sum(~mask, axis=0)
+                valid_sums = np.sum(np.where(mask, 0.0, arr), axis=0)
+                col_means = np.divide(valid_sums, valid_counts, out=np.zeros(arr.shape[1]), where=valid_counts > 0)
+                arr = np.where(mask, col_means, arr)
             elif strategy == 'remove_rows':
                 # Remove any rows that contain invalid values
                 valid_rows = ~np.any(mask, axis=1)
@@ -264,18 +815,23 @@ class DataManager:
                 raise ValueError(f"Unknown cleaning strategy: {strategy}")
                 
             # Update data
-            self.data = arr.tolist()
+            self.data = arr.tolist() if was_list else arr
             return True
         except Exception as e:
             print(f"Error during data cleaning: {str(e)}")
             return False
     
-    def save_to_file(self, file_path: str) -> bool:
+    def save_to_file(self, file_path: str, table: str = 'data_matrix', journal_mode: Optional[str] = None,
+                     synchronous: Optional[str] = None, index_columns: Optional[List[str]] = None) -> bool:
         """
         Save data to various file formats
         
         Args:
             file_path: Path to save the file
+            table: Table to write to (SQLite only)
+            journal_mode: Journal mode pragma such as 'WAL' (SQLite only)
+            synchronous: Synchronous pragma such as 'NORMAL' (SQLite only)
+            index_columns: Columns indexed once all rows are written (SQLite only)
             
         Returns:
             True if saving was successful, False otherwise
@@ -285,12 +841,18 @@ class DataManager:
                 self._save_csv(file_path)
             elif file_path.endswith('.xlsx'):
                 self._save_excel(file_path)
-            elif file_path.endswith('.json'):
+            elif file_path.endswith(('.json', '.jsonl', '.ndjson')):
                 self._save_json(file_path)
             elif file_path.endswith('.xml'):
                 self._save_xml(file_path)
             elif file_path.endswith('.db') or file_path.endswith('.sqlite'):
-                self._save_sqlite(file_path)
+                self._save_sqlite(file_path, table, journal_mode, synchronous, index_columns)
+            elif file_path.endswith('.npy'):
+                self._save_npy(file_path)
+            elif file_path.endswith(PARQUET_EXTENSIONS):
+                self._save_columnar(file_path, 'parquet')
+            elif file_path.endswith(ARROW_EXTENSIONS):
+                self._save_columnar(file_path, 'ipc')
             else:
                 raise ValueError(f"Unsupported file format: {file_path}")
                 
@@ -299,56 +861,166 @@ class DataManager:
             print(f"Error saving file {file_path}: {str(e)}")
             return False
     
+    def _criteria_names(self, n_cols: int) -> List[str]:
+        """Criteria names for saving, generated when the stored ones do not match the matrix"""
+        names = self.metadata.get('criteria_names')
+        if names and len(names) == n_cols:
+            return [str(name) for name in names]
+        return [f'col_{j}' for j in range(n_cols)]
+    
     def _save_csv(self, file_path: str):
         """Save data to CSV file"""
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            for row in self.data:
-                writer.writerow(row)
+        pd.DataFrame(np.asarray(self.data)).to_csv(file_path, header=False, index=False, encoding='utf-8')
     
     def _save_excel(self, file_path: str):
         """Save data to Excel file"""
-        df = pd.DataFrame(self.data)
+        df = pd.DataFrame(np.asarray(self.data))
         df.to_excel(file_path, index=False, header=False)
     
     def _save_json(self, file_path: str):
-        """Save data to JSON file"""
+        """Save data to JSON file, or to JSON Lines with one row array per line"""
+        matrix = np.asarray(self.data)
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            if file_path.endswith(('.jsonl', '.ndjson')):
+                for start in range(0, len(matrix), DEFAULT_BLOCK_ROWS):
+                    f.writelines(json.dumps(row) + '\n' for row in matrix[start:start + DEFAULT_BLOCK_ROWS].tolist())
+            else:
+                json.dump(matrix.tolist(), f, ensure_ascii=False, indent=2)
     
     def _save_xml(self, file_path: str):
-        """Save data to XML file"""
-        root = ET.Element("data")
+        """Save data to XML file, writing it row block by row block"""
+        matrix = np.asarray(self.data)
+        n_cols = matrix.shape[1] if matrix.ndim == 2 else 0
+        value_tags = [f'<value col="{j}">' for j in range(n_cols)]
+        
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write("<?xml version='1.0' encoding='utf-8'?>\n<data>")
+            for start in range(0, len(matrix), DEFAULT_BLOCK_ROWS):
+                lines = []
+                for i, row in enumerate(matrix[start:start + DEFAULT_BLOCK_ROWS].tolist(), start):
+                    cells = ''.join(f'{tag}{val}</value>' for tag, val in zip(value_tags, row))
+                    lines.append(f'<row id="{i}">{cells}</row>')
+                f.write(''.join(lines))
+            f.write('</data>')
+    
+    def _save_npy(self, file_path: str):
+        """
+        Save data as a native .npy matrix with a JSON metadata sidecar
         
-        for i, row in enumerate(self.data):
-            row_elem = ET.SubElement(root, "row", id=str(i))
-            for j, val in enumerate(row):
-                val_elem = ET.SubElement(row_elem, "value", col=str(j))
-                val_elem.text = str(val)
+        The matrix is written to a temporary file next to the target and moved
+        over it, so saving back to the file the data is memory mapped from
+        never truncates the mapped pages.
+        """
+        matrix = np.asarray(self.data, dtype=np.float64)
+        fd, tmp_path = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(os.path.abspath(file_path)))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, matrix, allow_pickle=False)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        
+        stored = {key: self.metadata[key] for key in METADATA_KEYS if self.metadata.get(key) is not None}
+        if len(stored.get('criteria_names', ())) != (matrix.shape[1] if matrix.ndim == 2 else 0):
+            stored.pop('criteria_names', None)
+        with open(metadata_path(file_path), 'w', encoding='utf-8') as f:
+            json.dump(stored, f, ensure_ascii=False, indent=2)
+    
+    def _save_columnar(self, file_path: str, file_format: str):
+        """Save data to a Parquet or Arrow IPC file with one float64 column per criterion"""
+        pa = _import_pyarrow()
         
-        tree = ET.ElementTree(root)
-        tree.write(file_path, encoding='utf-8', xml_declaration=True)
+        matrix = np.asarray(self.data, dtype=np.float64)
+        table = pa.table({name: matrix[:, j] for j, name in enumerate(self._criteria_names(matrix.shape[1]))})
+        
+        if file_format == 'parquet':
+            pa.parquet.write_table(table, file_path)
+        else:
+            with pa.OSFile(file_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    
+    def _save_sqlite(self, file_path: str, table: str = 'data_matrix', journal_mode: Optional[str] = None,
+                     synchronous: Optional[str] = None, index_columns: Optional[List[str]] = None):
+        """
+        Save data to SQLite database
+        
+        All rows are inserted with executemany in a single transaction; indexes
+        are created afterwards so they are built once instead of on every insert.
+        """
+        matrix = np.asarray(self.data, dtype=np.float64)
+        n_cols = matrix.shape[1] if matrix.ndim == 2 else 0
+        columns_def = ', '.join(f'{quote_identifier(name)} REAL' for name in self._criteria_names(n_cols))
+        placeholders = ', '.join('?' * n_cols)
+        
+        conn = connect_sqlite_for_writing(file_path, journal_mode, synchronous)
+        try:
+            with conn:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {quote_identifier(table)} ({columns_def})")
+                conn.executemany(f"INSERT INTO {quote_identifier(table)} VALUES ({placeholders})",
+                                 _iter_matrix_rows(matrix))
+            
+            if index_columns:
+                with conn:
+                    for column in index_columns:
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS {quote_identifier(f'idx_{table}_{column}')} "
+                                     f"ON {quote_identifier(table)} ({quote_identifier(column)})")
+        finally:
+            conn.close()
     
-    def _save_sqlite(self, file_path: str):
-        """Save data to SQLite database"""
-        conn = sqlite3.connect(file_path)
-        cursor = conn.cursor()
+    def save_results(self, file_path: str, results: Dict[str, Any], table: str = 'analysis_results',
+                     journal_mode: Optional[str] = None, synchronous: Optional[str] = None) -> bool:
+        """
+        Write analysis scores and ranks to a table of an SQLite database
         
-        # Create table
-        n_cols = len(self.data[0]) if self.data else 0
-        columns_def = ', '.join([f'col_{i} REAL' for i in range(n_cols)])
-        cursor.execute(f"CREATE TABLE IF NOT EXISTS data_matrix ({columns_def})")
+        The table has one row per method and alternative: (method, alternative,
+        score, rank), with 0-based alternative indices and rank positions. Plain
+        ranking lists only have rows for the alternatives they rank. Rows of the
+        same methods written earlier are replaced.
         
-        # Insert data
-        for row in self.data:
-            placeholders = ', '.join(['?' for _ in row])
-            cursor.execute(f"INSERT INTO data_matrix VALUES ({placeholders})", row)
+        Args:
+            file_path: Path to the database, usually the one the data came from
+            results: Method name -> MethodResult or ranking list
+            table: Results table name
+            journal_mode: Journal mode pragma such as 'WAL'
+            synchronous: Synchronous pragma such as 'NORMAL'
+            
+        Returns:
+            True if saving was successful, False otherwise
+        """
+        def rows():
+            for method, result in results.items():
+                if result is None:
+                    continue
+                if not hasattr(result, 'positions'):
+                    # A plain ranking list carries no scores and may cover only the top_k alternatives
+                    for position, alternative in enumerate(np.asarray(result, dtype=int).tolist()):
+                        yield (method, alternative, None, position)
+                    continue
+                scores = np.asarray(result.scores, dtype=np.float64)
+                for alternative, (score, position) in enumerate(zip(scores.tolist(), result.positions.tolist())):
+                    yield (method, alternative, None if score != score else score,
+                           None if position < 0 else position)
         
-        conn.commit()
-        conn.close()
+        try:
+            conn = connect_sqlite_for_writing(file_path, journal_mode, synchronous)
+            try:
+                with conn:
+                    name = quote_identifier(table)
+                    conn.execute(f"CREATE TABLE IF NOT EXISTS {name} "
+                                 "(method TEXT, alternative INTEGER, score REAL, rank INTEGER)")
+                    conn.executemany(f"DELETE FROM {name} WHERE method = ?",
+                                     [(method,) for method in results])
+                    conn.executemany(f"INSERT INTO {name} VALUES (?, ?, ?, ?)", rows())
+            finally:
+                conn.close()
+            return True
+        except Exception as e:
+            print(f"Error saving results to {file_path}: {str(e)}")
+            return False
 
 
-def load_data_from_file(file_path: str) -> Union[List[List[float]], None]:
+def load_data_from_file(file_path: str) -> Union[np.ndarray, None]:
     """
     Convenience function to load data from a file
     
@@ -356,7 +1028,7 @@ def load_data_from_file(file_path: str) -> Union[List[List[float]], None]:
         file_path: Path to the file to load
         
     Returns:
-        Loaded data or None if loading failed
+        Loaded float64 matrix or None if loading failed
     """
     dm = DataManager()
     if dm.load_from_file(file_path):
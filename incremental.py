@@ -0,0 +1,261 @@
+"""
+Incremental analysis module
+Contains a session object that keeps the scores and rankings of the additive
+and column-statistic MCDA methods up to date when single cells or rows of the
+decision matrix are edited, instead of recomputing every method from scratch
+"""
+
+import numpy as np
+
+from mcda_methods import METHODS, NormalizationCache
+
+
+# Method name -> (how its score is built from the matrix, whether higher scores are better)
+INCREMENTAL_METHODS = {
+    'WSR': ('weighted_sum', True),
+    'AHP': ('weighted_sum', True),
+    'CHP': ('weighted_sum', True),
+    'MINSUM': ('sum', False),
+    'F-AHP': ('sum_normalized', True),
+    'DEMATEL': ('minmax', True),
+    'TOPSIS': ('topsis', True),
+}
+
+
+class SortedRanking:
+    """
+    Order-statistics structure over the scores of one method
+    
+    Keeps the alternatives sorted by (key, index), where the key is the score
+    negated when higher is better, so the rank of an alternative is found by
+    binary search and a changed score is moved to its new position by
+    shifting only the entries between the old and the new position.
+    """
+    
+    def __init__(self, scores, higher_is_better=True):
+        self.sign = -1.0 if higher_is_better else 1.0
+        self.rebuild(scores)
+    
+    def rebuild(self, scores):
+        """Sort all alternatives again, used when most scores changed"""
+        keys = self.sign * np.asarray(scores, dtype=float)
+        previous = getattr(self, 'order', None)
+        if previous is not None and len(previous) == len(keys):
+            # Scores usually shift only slightly, and timsort is fast on the nearly sorted previous order
+            order = previous[np.argsort(keys[previous], kind='stable')]
+            sorted_keys = keys[order]
+            if not np.any(sorted_keys[1:] == sorted_keys[:-1]):
+                self.order, self.keys = order, sorted_keys
+                return
+        self.order = np.lexsort((np.arange(len(keys)), keys))
+        self.keys = keys[self.order]
+    
+    def _position(self, key, index):
+        """Position of (key, index) in the sorted order, or where it would be inserted"""
+        low = int(np.searchsorted(self.keys, key, side='left'))
+        high = int(np.searchsorted(self.keys, key, side='right'))
+        # Among equal keys the alternatives are sorted by index
+        return low + int(np.searchsorted(self.order[low:high], index))
+    
+    def move(self, index, old_score, new_score):
+        """
+        Update the position of one alternative after its score changed
+        
+        Args:
+            index: Alternative index
+            old_score: Score the alternative is currently sorted by
+            new_score: New score
+        """
+        old_key, new_key = self.sign * old_score, self.sign * new_score
+        current = self._position(old_key, index)
+        target = self._position(new_key, index)
+        if target > current:
+            # The entries in between move one place up
+            target -= 1
+            self.keys[current:target] = self.keys[current + 1:target + 1]
+            self.order[current:target] = self.order[current + 1:target + 1]
+        elif target < current:
+            self.keys[target + 1:current + 1] = self.keys[target:current]
+            self.order[target + 1:current + 1] = self.order[target:current]
+        self.keys[target] = new_key
+        self.order[target] = index
+    
+    def rank_of(self, index, score):
+        """0-based rank position of an alternative with the given current score"""
+        return self._position(self.sign * score, index)
+    
+    def top(self, top_k=None):
+        """Alternative indices from best to worst (only the best top_k if given)"""
+        return self.order[:top_k].copy() if top_k is not None else self.order.copy()
+
+
+class IncrementalAnalysis:
+    """
+    Analysis session that patches scores when the decision matrix is edited
+    
+    Column sums, sums of squares and extrema are maintained incrementally.
+    For the weighted-sum methods (WSR, AHP, CHP) and MINSUM an edit changes
+    only the score of the edited row, which is patched in O(k) and moved in the
+    ranking. F-AHP, DEMATEL and TOPSIS depend on column statistics, so the
+    contribution of every edited column is replaced in O(n) (DEMATEL only when
+    a column minimum or maximum changed) and the ranking is sorted again.
+    """
+    
+    def __init__(self, matrix, weights, methods=None):
+        """
+        Args:
+            matrix: Decision matrix (alternatives x criteria), copied
+            weights: Criteria weights
+            methods: Method names to maintain (all of INCREMENTAL_METHODS if None)
+        """
+        self.matrix = np.array(matrix, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.methods = list(methods) if methods is not None else list(INCREMENTAL_METHODS)
+        for method in self.methods:
+            if method not in INCREMENTAL_METHODS:
+                raise ValueError(f"Method {method} does not support incremental updates")
+        self.refresh()
+    
+    def refresh(self):
+        """Recompute all statistics, scores and rankings from the matrix"""
+        cache = NormalizationCache(self.matrix)
+        self.sums = cache.column_stat('sum').copy()
+        self.sums_sq = cache.column_stat('sum_sq').copy()
+        self.mins = cache.column_stat('min').copy()
+        self.maxs = cache.column_stat('max').copy()
+        
+        self._scores = {}
+        self._rankings = {}
+        for method in self.methods:
+            function, uses_weights = METHODS[method]
+            result = function(cache, self.weights) if uses_weights else function(cache)
+            self._scores[method] = np.array(result.scores, dtype=float)
+            self._rankings[method] = SortedRanking(self._scores[method], INCREMENTAL_METHODS[method][1])
+            if method == 'TOPSIS':
+                # Squared distances to the ideal solutions, kept as sums of per-column terms
+                self._topsis_sq = [result.details['dist_positive'] ** 2, result.details['dist_negative'] ** 2]
+    
+    def _column_terms(self, kind, column, j, stats):
+        """Contribution of column j to the scores of a column-statistic method"""
+        total, total_sq, low, high = stats
+        weight = self.weights[j]
+        if kind == 'sum_normalized':
+            return weight * column / (total if total != 0 else 1.0)
+        if kind == 'minmax':
+            if high == low:
+                return np.full(len(column), weight)
+            return weight * (column - low) / (high - low)
+        # TOPSIS: squared distances of the weighted vector-normalized column to its ideals
+        norm = np.sqrt(total_sq)
+        weighted = weight * column / (norm if norm != 0 else 1.0)
+        return (weighted - weighted.max()) ** 2, (weighted - weighted.min()) ** 2
+    
+    def update_cell(self, row, col, value):
+        """
+        Change one cell of the decision matrix
+        
+        Args:
+            row: Alternative index
+            col: Criterion index
+            value: New value
+        """
+        self.update_row(row, {col: value})
+    
+    def update_row(self, row, values):
+        """
+        Change several cells of one alternative
+        
+        Args:
+            row: Alternative index
+            values: Full row of new values, or a dictionary criterion index -> value
+        """
+        items = values.items() if isinstance(values, dict) else enumerate(values)
+        changes = [(j, float(v)) for j, v in items if float(v) != self.matrix[row, j]]
+        if not changes:
+            return
+        
+        old_values = {}
+        old_stats = {}
+        for j, value in changes:
+            old = self.matrix[row, j]
+            old_values[j] = old
+            old_stats[j] = (self.sums[j], self.sums_sq[j], self.mins[j], self.maxs[j])
+            
+            self.matrix[row, j] = value
+            self.sums[j] += value - old
+            self.sums_sq[j] += value * value - old * old
+            # An extremum only needs a column scan when the value that held it moved inwards
+            if value <= self.mins[j]:
+                self.mins[j] = value
+            elif old == self.mins[j]:
+                self.mins[j] = self.matrix[:, j].min()
+            if value >= self.maxs[j]:
+                self.maxs[j] = value
+            elif old == self.maxs[j]:
+                self.maxs[j] = self.matrix[:, j].max()
+        
+        for method in self.methods:
+            kind = INCREMENTAL_METHODS[method][0]
+            scores = self._scores[method]
+            old_score = scores[row]
+            resort = False
+            
+            if kind == 'weighted_sum':
+                scores[row] += sum(self.weights[j] * (value - old_values[j]) for j, value in changes)
+            elif kind == 'sum':
+                scores[row] += sum(value - old_values[j] for j, value in changes)
+            else:
+                for j, value in changes:
+                    new_stats = (self.sums[j], self.sums_sq[j], self.mins[j], self.maxs[j])
+                    if kind == 'minmax' and new_stats[2:] == old_stats[j][2:]:
+                        # Same range - only the edited cell changes its term
+                        cells = np.array([old_values[j], value])
+                        before, after = self._column_terms(kind, cells, j, new_stats)
+                        scores[row] += after - before
+                        continue
+                    
+                    column = self.matrix[:, j]
+                    old_column = column.copy()
+                    old_column[row] = old_values[j]
+                    old_terms = self._column_terms(kind, old_column, j, old_stats[j])
+                    new_terms = self._column_terms(kind, column, j, new_stats)
+                    if kind == 'topsis':
+                        for sq, before, after in zip(self._topsis_sq, old_terms, new_terms):
+                            sq += after - before
+                    else:
+                        scores += new_terms - old_terms
+                    resort = True
+                
+                if kind == 'topsis':
+                    positive, negative = (np.sqrt(np.maximum(sq, 0.0)) for sq in self._topsis_sq)
+                    scores[:] = negative / (positive + negative)
+            
+            if resort:
+                self._rankings[method].rebuild(scores)
+            else:
+                self._rankings[method].move(row, old_score, scores[row])
+    
+    def scores(self, method):
+        """Current scores of a method (a copy)"""
+        return self._scores[method].copy()
+    
+    def ranking(self, method, top_k=None):
+        """
+        Current ranking of a method
+        
+        Args:
+            method: Method name
+            top_k: Return only the best top_k alternatives (all if None)
+        
+        Returns:
+            List of alternative indices from best to worst
+        """
+        return self._rankings[method].top(top_k).tolist()
+    
+    def rank_of(self, method, row):
+        """0-based rank position of an alternative in a method's ranking"""
+        return self._rankings[method].rank_of(row, self._scores[method][row])
+    
+    def rankings(self, top_k=None):
+        """Current rankings of all maintained methods, as returned by perform_analysis"""
+        return {method: self.ranking(method, top_k) for method in self.methods}
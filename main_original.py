@@ -12,6 +12,7 @@ from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.colors as mcolors
+from pareto import pareto_front
 
 
 method_descriptions = {
@@ -547,17 +548,9 @@ class ResultsWindow(QWidget):
         if not data or not isinstance(data, list) or len(data) < 2:
             return []
         
-        pareto_front = []
-        for i, alt1 in enumerate(data):
-            dominated = False
-            for j, alt2 in enumerate(data):
-                if i != j:
-                    if all(a >= b for a, b in zip(alt1, alt2)) and any(a > b for a, b in zip(alt1, alt2)):
-                        dominated = True
-                        break
-            if not dominated:
-                pareto_front.append(alt1)
-        return pareto_front
+        # Все критерии минимизируются; фронт кэшируется, поэтому повторное переключение мгновенно
+        front = pareto_front(data, directions=['cost'] * len(data[0]))
+        return [data[i] for i in front]
 
     def minsum(self):
         data = self.read_table_data(self.data_table)
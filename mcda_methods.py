@@ -3,41 +3,184 @@ MCDA Methods module
 Contains implementations of various Multi-Criteria Decision Analysis methods
 """
 
+import hashlib
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import numpy as np
-import math
 
+from pareto import non_dominated_sort
+from result_cache import default_cache, matrix_digest, result_key
 
-def normalize_matrix(matrix):
-    """Normalize decision matrix using vector normalization"""
-    matrix = np.array(matrix, dtype=float)
-    norm_matrix = np.zeros_like(matrix)
+
+class NormalizationCache:
+    """
+    Decision matrix converted to a float array once, with its column
+    statistics and normalised variants computed on first use and reused by
+    every method that needs them
+    """
     
-    for j in range(matrix.shape[1]):
-        col_sum_sq = np.sum(matrix[:, j] ** 2)
-        if col_sum_sq != 0:
-            norm_matrix[:, j] = matrix[:, j] / math.sqrt(col_sum_sq)
-        else:
-            norm_matrix[:, j] = matrix[:, j]
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float)
+        self._cache = {}
+    
+    def column_stat(self, name):
+        """
+        Column statistic of the matrix
+        
+        Args:
+            name: 'min', 'max', 'sum' or 'sum_sq'
+        
+        Returns:
+            Array with one value per criterion
+        """
+        key = ('stat', name)
+        if key not in self._cache:
+            if name == 'min':
+                value = np.min(self.matrix, axis=0)
+            elif name == 'max':
+                value = np.max(self.matrix, axis=0)
+            elif name == 'sum':
+                value = np.sum(self.matrix, axis=0)
+            elif name == 'sum_sq':
+                value = np.einsum('ij,ij->j', self.matrix, self.matrix)
+            else:
+                raise ValueError(f"Unknown column statistic: {name}")
+            self._cache[key] = value
+        return self._cache[key]
+    
+    def normalized(self, kind, constant=1.0):
+        """
+        Normalised variant of the matrix
+        
+        Args:
+            kind: 'vector' (x / ||x||), 'minmax' ((x - min) / (max - min)) or 'sum' (x / sum(x))
+            constant: Value used by 'minmax' for columns where all values are equal
+        
+        Returns:
+            Normalised matrix (shared, must not be modified in place)
+        """
+        key = (kind, constant) if kind == 'minmax' else (kind,)
+        if key not in self._cache:
+            if kind == 'vector':
+                norms = np.sqrt(self.column_stat('sum_sq'))
+                value = self.matrix / np.where(norms != 0, norms, 1.0)
+            elif kind == 'minmax':
+                mins = self.column_stat('min')
+                ranges = self.column_stat('max') - mins
+                constant_cols = ranges == 0
+                value = (self.matrix - mins) / np.where(constant_cols, 1.0, ranges)
+                value[:, constant_cols] = constant
+            elif kind == 'sum':
+                sums = self.column_stat('sum')
+                value = self.matrix / np.where(sums != 0, sums, 1.0)
+            else:
+                raise ValueError(f"Unknown normalization: {kind}")
+            self._cache[key] = value
+        return self._cache[key]
+
+
+def rank_order(scores, higher_is_better=True, top_k=None):
+    """
+    Alternative indices ordered from best to worst
     
-    return norm_matrix
+    With top_k only the best top_k alternatives are selected with
+    np.argpartition and only that slice is sorted.
+    
+    Args:
+        scores: Score of every alternative
+        higher_is_better: Whether higher scores are better
+        top_k: Number of best alternatives to return (all if None)
+    
+    Returns:
+        Array of alternative indices
+    """
+    keys = -np.asarray(scores) if higher_is_better else np.asarray(scores)
+    if top_k is None or top_k >= len(keys):
+        return np.argsort(keys)
+    if top_k <= 0:
+        return np.array([], dtype=int)
+    top = np.argpartition(keys, top_k - 1)[:top_k]
+    return top[np.argsort(keys[top])]
 
 
-def topsis(matrix, weights):
+class MethodResult:
+    """
+    Result of one MCDA method: the score of every alternative, the ranking
+    derived from it and the intermediate arrays the method computed, all
+    kept as NumPy arrays
+    """
+    
+    def __init__(self, method, scores, higher_is_better=True, details=None, top_k=None):
+        self.method = method
+        self.scores = np.asarray(scores)
+        self.higher_is_better = higher_is_better
+        # Alternative indices from best to worst (only the best top_k if given)
+        self.ranking = rank_order(self.scores, higher_is_better, top_k)
+        self.details = details or {}
+    
+    @property
+    def positions(self):
+        """0-based rank position of every alternative (-1 if outside a top_k ranking)"""
+        positions = np.full(len(self.scores), -1, dtype=int)
+        positions[self.ranking] = np.arange(len(self.ranking))
+        return positions
+    
+    def expand(self, rows, n_alt):
+        """
+        Map a result computed on a subset of rows back to the full matrix
+        
+        Args:
+            rows: Indices of the rows the method was run on
+            n_alt: Number of alternatives in the full matrix
+        
+        Returns:
+            self, with scores of the other alternatives set to NaN
+        """
+        scores = np.full(n_alt, np.nan)
+        scores[rows] = self.scores
+        self.scores = scores
+        self.ranking = np.asarray(rows)[self.ranking]
+        return self
+    
+    def tolist(self):
+        """Ranking as a list of alternative indices, as returned by the list API"""
+        return self.ranking.tolist()
+
+
+def as_normalization_cache(matrix):
+    """Wrap a decision matrix in a NormalizationCache unless it already is one"""
+    if isinstance(matrix, NormalizationCache):
+        return matrix
+    return NormalizationCache(matrix)
+
+
+def normalize_matrix(matrix):
+    """Normalize decision matrix using vector normalization"""
+    return as_normalization_cache(matrix).normalized('vector')
+
+
+def topsis_result(matrix, weights, top_k=None):
     """
     TOPSIS (Technique for Order Preference by Similarity to Ideal Solution)
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
+    weights = np.asarray(weights, dtype=float)
     
     # Normalize the matrix
-    norm_matrix = normalize_matrix(matrix)
+    norm_matrix = as_normalization_cache(matrix).normalized('vector')
     
     # Weight the normalized matrix
     weighted_matrix = norm_matrix * weights
@@ -54,134 +197,180 @@ def topsis(matrix, weights):
     scores = dist_negative / (dist_positive + dist_negative)
     
     # Rank alternatives by score (higher is better)
-    ranks = np.argsort(-scores).tolist()  # Negative for descending order
-    return ranks
+    return MethodResult(
+        'TOPSIS', scores, higher_is_better=True,
+        details={'dist_positive': dist_positive, 'dist_negative': dist_negative},
+        top_k=top_k
+    )
+
+
+def topsis(matrix, weights, top_k=None):
+    """
+    TOPSIS (Technique for Order Preference by Similarity to Ideal Solution)
+    
+    Returns:
+        List of rankings for each alternative (see topsis_result)
+    """
+    return topsis_result(matrix, weights, top_k=top_k).tolist()
 
 
-def wsr(matrix, weights):
+def wsr_result(matrix, weights, top_k=None):
     """
     Weighted Sum Model (WSM)
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
+    matrix = as_normalization_cache(matrix).matrix
+    weights = np.asarray(weights, dtype=float)
     
     # Calculate weighted sum for each alternative
-    scores = np.sum(matrix * weights, axis=1)
+    scores = matrix @ weights
     
     # Rank alternatives by score (higher is better)
-    ranks = np.argsort(-scores).tolist()  # Negative for descending order
-    return ranks
+    return MethodResult('WSR', scores, higher_is_better=True, top_k=top_k)
 
 
-def electre_iv(matrix):
+def wsr(matrix, weights, top_k=None):
     """
-    ELECTRE IV method (without weights)
-    
-    Args:
-        matrix: Decision matrix (alternatives x criteria)
+    Weighted Sum Model (WSM)
     
     Returns:
-        List of rankings for each alternative
+        List of rankings for each alternative (see wsr_result)
     """
-    matrix = np.array(matrix, dtype=float)
+    return wsr_result(matrix, weights, top_k=top_k).tolist()
+
+
+# Upper bound on the number of elements in one pairwise block (rows x alternatives x criteria)
+PAIRWISE_BLOCK_ELEMENTS = 2 ** 22
+
+
+def _row_block_size(n_alt, n_crit, block_size=None):
+    """Number of rows per pairwise block so that a block stays within PAIRWISE_BLOCK_ELEMENTS"""
+    if block_size is not None:
+        return max(1, int(block_size))
+    return max(1, PAIRWISE_BLOCK_ELEMENTS // max(1, n_alt * n_crit))
+
+
+def electre_iv_matrices(matrix, q=0.1, p=0.3, v=0.5, block_size=None):
+    """
+    Concordance, discordance and credibility matrices of ELECTRE IV
     
-    # Normalize the matrix using min-max normalization
-    mins = np.min(matrix, axis=0)
-    maxs = np.max(matrix, axis=0)
-    ranges = maxs - mins
+    The pairwise differences are evaluated with NumPy broadcasting over blocks
+    of rows, so memory stays bounded by PAIRWISE_BLOCK_ELEMENTS while each
+    block is processed at ufunc speed.
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        q: Indifference threshold (scalar or one value per criterion)
+        p: Preference threshold (scalar or one value per criterion)
+        v: Veto threshold (scalar or one value per criterion)
+        block_size: Number of rows per block (computed automatically if None)
     
-    # Handle case where all values in a column are the same
-    ranges[ranges == 0] = 1
-    normalized_matrix = (matrix - mins) / ranges
+    Returns:
+        Tuple of (concordance, discordance, credibility) n x n matrices
+    """
+    # Min-max normalization; columns where all values are the same become 0
+    normalized_matrix = as_normalization_cache(matrix).normalized('minmax', constant=0.0)
     
     n_alt, n_crit = normalized_matrix.shape
     
-    # Define thresholds
-    q = [0.1] * n_crit  # Indifference threshold
-    p = [0.3] * n_crit  # Preference threshold
-    v = [0.5] * n_crit  # Veto threshold
+    q = np.broadcast_to(np.asarray(q, dtype=float), (n_crit,))
+    p = np.broadcast_to(np.asarray(p, dtype=float), (n_crit,))
+    v = np.broadcast_to(np.asarray(v, dtype=float), (n_crit,))
     
-    # Concordance matrix
     concordance = np.zeros((n_alt, n_alt))
-    for i in range(n_alt):
-        for j in range(n_alt):
-            if i != j:
-                s = 0
-                total_weight = n_crit
-                for k in range(n_crit):
-                    diff = normalized_matrix[j, k] - normalized_matrix[i, k]
-                    if diff >= p[k]:
-                        s += 0
-                    elif diff <= q[k]:
-                        s += 1
-                    else:
-                        s += (p[k] - diff) / (p[k] - q[k])
-                concordance[i, j] = s / total_weight
-    
-    # Discordance matrix
     discordance = np.zeros((n_alt, n_alt))
-    for i in range(n_alt):
-        for j in range(n_alt):
-            if i != j:
-                max_diff = 0
-                max_range = 0
-                for k in range(n_crit):
-                    diff = normalized_matrix[j, k] - normalized_matrix[i, k]
-                    if p[k] != 0:
-                        curr_diff = max(0, diff - p[k]) / (v[k] - p[k])
-                        if curr_diff > max_diff:
-                            max_diff = curr_diff
-                discordance[i, j] = max_diff
+    
+    step = _row_block_size(n_alt, n_crit, block_size)
+    for start in range(0, n_alt, step):
+        stop = min(start + step, n_alt)
+        
+        # diff[b, j, k] = x[j, k] - x[i, k] for every row i of the block
+        diff = normalized_matrix[np.newaxis, :, :] - normalized_matrix[start:stop, np.newaxis, :]
+        
+        # Partial concordance: 1 below q, 0 above p, linear in between
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = np.where(diff >= p, 0.0, np.where(diff <= q, 1.0, (p - diff) / (p - q)))
+        concordance[start:stop] = partial.sum(axis=2) / n_crit
+        
+        # Discordance: largest excess over the preference threshold
+        excess = np.maximum(0.0, diff - p)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            excess = np.where(p != 0, excess / (v - p), 0.0)
+        discordance[start:stop] = np.maximum(excess.max(axis=2, initial=0.0), 0.0)
+    
+    np.fill_diagonal(concordance, 0.0)
+    np.fill_diagonal(discordance, 0.0)
     
     # Outranking relations
-    credibility = np.zeros((n_alt, n_alt))
-    for i in range(n_alt):
-        for j in range(n_alt):
-            if i != j:
-                credibility[i, j] = concordance[i, j] * (1 - discordance[i, j])
+    credibility = concordance * (1 - discordance)
+    
+    return concordance, discordance, credibility
+
+
+def electre_iv_result(matrix, top_k=None):
+    """
+    ELECTRE IV method (without weights)
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
+    
+    Returns:
+        MethodResult with scores, ranking and intermediate arrays
+    """
+    concordance, discordance, credibility = electre_iv_matrices(matrix)
     
     # Calculate dominance counts
     dominance_count = np.sum(credibility > 0.5, axis=1)
-    ranks = np.argsort(-dominance_count).tolist()
+    return MethodResult(
+        'ELECTRE', dominance_count, higher_is_better=True,
+        details={'concordance': concordance, 'discordance': discordance, 'credibility': credibility},
+        top_k=top_k
+    )
+
+
+def electre_iv(matrix, top_k=None):
+    """
+    ELECTRE IV method (without weights)
     
-    return ranks
+    Returns:
+        List of rankings for each alternative (see electre_iv_result)
+    """
+    return electre_iv_result(matrix, top_k=top_k).tolist()
 
 
-def Vikor(matrix, weights):
+def vikor_result(matrix, weights, top_k=None):
     """
     VIKOR (VlseKriterijumska Optimizacija I Kompromisno Resenje)
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
+    cache = as_normalization_cache(matrix)
+    matrix = cache.matrix
+    weights = np.asarray(weights, dtype=float)
     
     # Determine best and worst values for each criterion
-    f_best = np.max(matrix, axis=0)  # Assuming higher is better
-    f_worst = np.min(matrix, axis=0)
+    f_best = cache.column_stat('max')  # Assuming higher is better
+    f_worst = cache.column_stat('min')
     
     # Calculate Si and Ri values
+    weighted_diffs = weights * (f_best - matrix) / (f_best - f_worst + 1e-10)  # Adding small value to avoid division by zero
+    S = np.sum(weighted_diffs, axis=1)
+    R = np.max(weighted_diffs, axis=1)
     n_alt = matrix.shape[0]
-    S = np.zeros(n_alt)
-    R = np.zeros(n_alt)
-    
-    for i in range(n_alt):
-        diffs = f_best - matrix[i, :]
-        weighted_diffs = weights * diffs / (f_best - f_worst + 1e-10)  # Adding small value to avoid division by zero
-        S[i] = np.sum(weighted_diffs)
-        R[i] = np.max(weighted_diffs)
     
     # Normalize Si and Ri
     S_best = np.min(S)
@@ -196,152 +385,224 @@ def Vikor(matrix, weights):
         Q = v * (S - S_best) / (S_worst - S_best + 1e-10) + (1 - v) * (R - R_best) / (R_worst - R_best + 1e-10)
     
     # Rank by Q values (lower is better)
-    ranks = np.argsort(Q).tolist()
-    return ranks
+    return MethodResult(
+        'VIKOR', Q, higher_is_better=False,
+        details={'S': S, 'R': R},
+        top_k=top_k
+    )
+
 
+def Vikor(matrix, weights, top_k=None):
+    """
+    VIKOR (VlseKriterijumska Optimizacija I Kompromisno Resenje)
+    
+    Returns:
+        List of rankings for each alternative (see vikor_result)
+    """
+    return vikor_result(matrix, weights, top_k=top_k).tolist()
 
-def ahp(matrix, weights):
+
+def ahp_result(matrix, weights, top_k=None):
     """
     Analytic Hierarchy Process (AHP)
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
+    matrix = as_normalization_cache(matrix).matrix
+    weights = np.asarray(weights, dtype=float)
     
     # Calculate weighted sum for each alternative
-    scores = np.sum(matrix * weights, axis=1)
+    scores = matrix @ weights
     
     # Rank alternatives by score (higher is better)
-    ranks = np.argsort(-scores).tolist()  # Negative for descending order
-    return ranks
+    return MethodResult('AHP', scores, higher_is_better=True, top_k=top_k)
+
+
+def ahp(matrix, weights, top_k=None):
+    """
+    Analytic Hierarchy Process (AHP)
+    
+    Returns:
+        List of rankings for each alternative (see ahp_result)
+    """
+    return ahp_result(matrix, weights, top_k=top_k).tolist()
 
 
-def chp(matrix, weights):
+def chp_result(matrix, weights, top_k=None):
     """
     Consensus Hallucination Process (CHP) - Simplified version
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
+    matrix = as_normalization_cache(matrix).matrix
+    weights = np.asarray(weights, dtype=float)
     
     # Calculate weighted sum for each alternative
-    scores = np.sum(matrix * weights, axis=1)
+    scores = matrix @ weights
     
     # Calculate consistency ratio (simplified)
     # For this implementation, we'll just rank by scores
-    ranks = np.argsort(-scores).tolist()  # Negative for descending order
-    return ranks
+    return MethodResult('CHP', scores, higher_is_better=True, top_k=top_k)
 
 
-def minsum(matrix):
+def chp(matrix, weights, top_k=None):
+    """
+    Consensus Hallucination Process (CHP) - Simplified version
+    
+    Returns:
+        List of rankings for each alternative (see chp_result)
+    """
+    return chp_result(matrix, weights, top_k=top_k).tolist()
+
+
+def minsum_result(matrix, top_k=None):
     """
     Minimum Sum Method
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
+    matrix = as_normalization_cache(matrix).matrix
     
     # Calculate sum for each alternative
     sums = np.sum(matrix, axis=1)
     
     # Rank alternatives by sum (lower is better)
-    ranks = np.argsort(sums).tolist()
-    return ranks
+    return MethodResult('MINSUM', sums, higher_is_better=False, top_k=top_k)
+
+
+def minsum(matrix, top_k=None):
+    """
+    Minimum Sum Method
+    
+    Returns:
+        List of rankings for each alternative (see minsum_result)
+    """
+    return minsum_result(matrix, top_k=top_k).tolist()
 
 
-def minmax(matrix):
+def minmax_result(matrix, top_k=None):
     """
     Minimax Method
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
+    matrix = as_normalization_cache(matrix).matrix
     
     # Find maximum value for each alternative
     max_values = np.max(matrix, axis=1)
     
     # Rank alternatives by max value (lower is better)
-    ranks = np.argsort(max_values).tolist()
-    return ranks
+    return MethodResult('MINMAX', max_values, higher_is_better=False, top_k=top_k)
 
 
-def maxmin(matrix):
+def minmax(matrix, top_k=None):
+    """
+    Minimax Method
+    
+    Returns:
+        List of rankings for each alternative (see minmax_result)
+    """
+    return minmax_result(matrix, top_k=top_k).tolist()
+
+
+def maxmin_result(matrix, top_k=None):
     """
     Maximin Method
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
+    matrix = as_normalization_cache(matrix).matrix
     
     # Find minimum value for each alternative
     min_values = np.min(matrix, axis=1)
     
     # Rank alternatives by min value (higher is better)
-    ranks = np.argsort(-min_values).tolist()  # Negative for descending order
-    return ranks
+    return MethodResult('MAXMIN', min_values, higher_is_better=True, top_k=top_k)
 
 
-def dip(matrix):
+def maxmin(matrix, top_k=None):
+    """
+    Maximin Method
+    
+    Returns:
+        List of rankings for each alternative (see maxmin_result)
+    """
+    return maxmin_result(matrix, top_k=top_k).tolist()
+
+
+def dip_result(matrix, top_k=None):
     """
     Distance to Ideal Point Method
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
+    cache = as_normalization_cache(matrix)
     
     # Find ideal point (maximum for each criterion)
-    ideal_point = np.max(matrix, axis=0)
+    ideal_point = cache.column_stat('max')
     
     # Calculate Euclidean distance to ideal point for each alternative
-    distances = np.sqrt(np.sum((matrix - ideal_point) ** 2, axis=1))
+    distances = np.sqrt(np.sum((cache.matrix - ideal_point) ** 2, axis=1))
     
     # Rank alternatives by distance (lower is better)
-    ranks = np.argsort(distances).tolist()
-    return ranks
+    return MethodResult('DIP', distances, higher_is_better=False, top_k=top_k)
 
 
-def orp(matrix):
+def dip(matrix, top_k=None):
+    """
+    Distance to Ideal Point Method
+    
+    Returns:
+        List of rankings for each alternative (see dip_result)
+    """
+    return dip_result(matrix, top_k=top_k).tolist()
+
+
+def orp_result(matrix, top_k=None):
     """
     Generalized Decision Rule (Обобщенное решающее правило)
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    
     # Normalize the matrix using vector normalization
-    norm_matrix = normalize_matrix(matrix)
+    norm_matrix = as_normalization_cache(matrix).normalized('vector')
     
     # Apply multiple methods and combine results
     # Using MINSUM, MAXMIN, and DIP for the combination
@@ -355,94 +616,277 @@ def orp(matrix):
     combined_scores = minsum_scores + (1 / (maxmin_scores + 1e-10)) + dip_distances
     
     # Rank alternatives by combined score (lower is better)
-    ranks = np.argsort(combined_scores).tolist()
-    return ranks
+    return MethodResult(
+        'ОРП', combined_scores, higher_is_better=False,
+        details={'minsum': minsum_scores, 'maxmin': maxmin_scores, 'dip': dip_distances},
+        top_k=top_k
+    )
 
 
-def promethee_ii(matrix, weights):
+def orp(matrix, top_k=None):
     """
-    PROMETHEE II (Preference Ranking Organization METHod for Enrichment Evaluation)
+    Generalized Decision Rule (Обобщенное решающее правило)
+    
+    Returns:
+        List of rankings for each alternative (see orp_result)
+    """
+    return orp_result(matrix, top_k=top_k).tolist()
+
+
+# Standard PROMETHEE generalised criteria
+PREFERENCE_FUNCTIONS = ('usual', 'u-shape', 'v-shape', 'level', 'linear', 'gaussian')
+
+
+def preference_function(d, kind='v-shape', q=0.0, p=0.0, s=0.0):
+    """
+    Evaluate a PROMETHEE preference function on an array of differences
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        d: Array of pairwise differences
+        kind: One of PREFERENCE_FUNCTIONS
+        q: Indifference threshold (u-shape, level, linear)
+        p: Preference threshold (v-shape, level, linear)
+        s: Inflection point (gaussian)
+    
+    Returns:
+        Array of preference degrees in [0, 1] with the shape of d
+    """
+    d = np.asarray(d, dtype=float)
+    
+    if kind == 'usual' or (kind == 'v-shape' and p <= 0) or (kind == 'gaussian' and s <= 0):
+        return (d > 0).astype(float)
+    elif kind == 'u-shape':
+        return (d > q).astype(float)
+    elif kind == 'v-shape':
+        return np.clip(d / p, 0.0, 1.0)
+    elif kind == 'level':
+        return np.where(d > p, 1.0, np.where(d > q, 0.5, 0.0))
+    elif kind == 'linear':
+        if p <= q:
+            return (d > q).astype(float)
+        return np.clip((d - q) / (p - q), 0.0, 1.0)
+    elif kind == 'gaussian':
+        return np.where(d > 0, 1.0 - np.exp(-d ** 2 / (2 * s ** 2)), 0.0)
+    raise ValueError(f"Unknown preference function: {kind}")
+
+
+def resolve_preference_functions(matrix, preference_functions=None):
+    """
+    Fill in per-criterion preference function parameters
+    
+    Column ranges and standard deviations are computed once here and used as
+    defaults: p defaults to the criterion range (so 'v-shape' reproduces the
+    range-normalised linear preference), q to 0 and s to the column standard
+    deviation.
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        preference_functions: None, a single spec or one spec per criterion.
+            A spec is a function name or a dict with 'type' and optional 'q', 'p', 's'
+    
+    Returns:
+        List of (kind, q, p, s) tuples, one per criterion
+    """
+    cache = as_normalization_cache(matrix)
+    matrix = cache.matrix
+    n_crit = matrix.shape[1]
+    
+    if preference_functions is None or isinstance(preference_functions, (str, dict)):
+        preference_functions = [preference_functions] * n_crit
+    if len(preference_functions) != n_crit:
+        raise ValueError(f"Expected {n_crit} preference functions, got {len(preference_functions)}")
+    
+    ranges = cache.column_stat('max') - cache.column_stat('min') if len(matrix) else np.zeros(n_crit)
+    stds = np.std(matrix, axis=0) if len(matrix) else np.zeros(n_crit)
+    
+    resolved = []
+    for k, spec in enumerate(preference_functions):
+        if spec is None:
+            spec = {}
+        elif isinstance(spec, str):
+            spec = {'type': spec}
+        kind = spec.get('type', 'v-shape').lower()
+        if kind not in PREFERENCE_FUNCTIONS:
+            raise ValueError(f"Unknown preference function: {kind}")
+        q = float(spec.get('q', 0.0))
+        p = float(spec.get('p', ranges[k]))
+        s = float(spec.get('s', stds[k]))
+        resolved.append((kind, q, p, s))
+    
+    return resolved
+
+
+def _is_sortable_preference(kind, q, p, s):
+    """Whether a preference function is piecewise linear without an indifference threshold"""
+    return kind in ('usual', 'v-shape') or (kind == 'linear' and q == 0)
+
+
+def _sorted_criterion_flows(column, p):
+    """
+    Unweighted leaving and entering sums of one criterion using sorting and prefix sums
+    
+    For the V-shape function P(d) = min(1, max(0, d) / p) the sum over all j of
+    P(x_j - x_i) only depends on how many values lie in (x_i, x_i + p], their sum,
+    and how many lie above x_i + p, all of which are answered by binary search
+    over the sorted column. p <= 0 gives the usual criterion.
+    """
+    n_alt = len(column)
+    order = np.argsort(column)
+    # Shift by the minimum to keep prefix sums small
+    sorted_col = column[order] - column[order[0]]
+    
+    # Queries are answered in sorted order (cache friendly) and scattered back
+    at_or_below = np.searchsorted(sorted_col, sorted_col, side='right')
+    below = np.searchsorted(sorted_col, sorted_col, side='left')
+    
+    if p <= 0:
+        leaving = (n_alt - at_or_below).astype(float)
+        entering = below.astype(float)
+    else:
+        prefix = np.concatenate(([0.0], np.cumsum(sorted_col)))
+        
+        # Alternatives better than x_i: (x_i, x_i + p] contribute linearly, the rest fully
+        upper = np.searchsorted(sorted_col, sorted_col + p, side='right')
+        leaving = ((prefix[upper] - prefix[at_or_below]) - (upper - at_or_below) * sorted_col
+                   + p * (n_alt - upper)) / p
+        
+        # Alternatives worse than x_i: (x_i - p, x_i) contribute linearly, the rest fully
+        lower = np.searchsorted(sorted_col, sorted_col - p, side='right')
+        entering = ((below - lower) * sorted_col - (prefix[below] - prefix[lower])
+                    + p * lower) / p
+    
+    result_leaving = np.empty(n_alt)
+    result_entering = np.empty(n_alt)
+    result_leaving[order] = leaving
+    result_entering[order] = entering
+    return result_leaving, result_entering
+
+
+def promethee_flows(matrix, weights, preference_functions=None, block_size=None, algorithm='auto'):
+    """
+    Leaving, entering and net outranking flows of PROMETHEE II
+    
+    The 'pairwise' algorithm evaluates preference degrees over blocks of rows
+    of the n x n comparison matrix, one criterion at a time, and sums them into
+    the flows immediately, so neither the n x n x k preference tensor nor the
+    full n x n global preference matrix is ever materialised. It is the
+    reference implementation and works with every preference function.
+    
+    The 'sorted' algorithm is O(k * n log n) and applies when every criterion
+    uses the usual or V-shape function (or linear with q = 0). 'auto' picks it
+    whenever it applies.
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        preference_functions: Preference function specs (see resolve_preference_functions)
+        block_size: Number of rows per block (computed automatically if None)
+        algorithm: 'auto', 'pairwise' or 'sorted'
     
     Returns:
-        List of rankings for each alternative
+        Tuple of (leaving_flow, entering_flow, net_flow) arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
+    cache = as_normalization_cache(matrix)
+    matrix = cache.matrix
+    weights = np.asarray(weights, dtype=float)
     
     n_alt, n_crit = matrix.shape
+    functions = resolve_preference_functions(cache, preference_functions)
+    
+    sortable = all(_is_sortable_preference(*function) for function in functions)
+    if algorithm == 'auto':
+        algorithm = 'sorted' if sortable else 'pairwise'
+    elif algorithm == 'sorted' and not sortable:
+        raise ValueError("The sorted algorithm only supports usual and V-shape preference functions")
+    elif algorithm not in ('sorted', 'pairwise'):
+        raise ValueError(f"Unknown PROMETHEE algorithm: {algorithm}")
+    
+    leaving_flow = np.zeros(n_alt)
+    entering_flow = np.zeros(n_alt)
+    
+    if algorithm == 'sorted':
+        for k, (kind, q, p, s) in enumerate(functions):
+            if weights[k] == 0 or n_alt == 0:
+                continue
+            leaving, entering = _sorted_criterion_flows(matrix[:, k], 0.0 if kind == 'usual' else p)
+            leaving_flow += weights[k] * leaving
+            entering_flow += weights[k] * entering
+    else:
+        step = _row_block_size(n_alt, 1, block_size)
+        for start in range(0, n_alt, step):
+            stop = min(start + step, n_alt)
+            pi_block = np.zeros((stop - start, n_alt))
+            
+            for k, (kind, q, p, s) in enumerate(functions):
+                if weights[k] == 0:
+                    continue
+                # diff[b, j] = x[j, k] - x[i, k] for every row i of the block
+                diff = matrix[np.newaxis, :, k] - matrix[start:stop, k, np.newaxis]
+                pi_block += weights[k] * preference_function(diff, kind, q, p, s)
+            
+            leaving_flow[start:stop] = pi_block.sum(axis=1)
+            entering_flow += pi_block.sum(axis=0)
+    
+    leaving_flow /= max(n_alt - 1, 1)
+    entering_flow /= max(n_alt - 1, 1)
+    
+    return leaving_flow, entering_flow, leaving_flow - entering_flow
+
+
+def promethee_ii_result(matrix, weights, preference_functions=None, algorithm='auto', top_k=None):
+    """
+    PROMETHEE II (Preference Ranking Organization METHod for Enrichment Evaluation)
     
-    # Calculate preference functions for each criterion
-    P = np.zeros((n_alt, n_alt, n_crit))
-    
-    for k in range(n_crit):
-        for i in range(n_alt):
-            for j in range(n_alt):
-                # Using linear preference function
-                diff = matrix[j, k] - matrix[i, k]
-                
-                if diff <= 0:
-                    P[i, j, k] = 0
-                else:
-                    # Normalize the difference based on the range of the criterion
-                    max_val = np.max(matrix[:, k])
-                    min_val = np.min(matrix[:, k])
-                    
-                    if max_val != min_val:
-                        normalized_diff = diff / (max_val - min_val)
-                        P[i, j, k] = min(1, normalized_diff)
-                    else:
-                        P[i, j, k] = 0
-    
-    # Calculate global preference index
-    pi_matrix = np.zeros((n_alt, n_alt))
-    for i in range(n_alt):
-        for j in range(n_alt):
-            if i != j:
-                pi_matrix[i, j] = np.sum(weights * P[i, j, :])
-    
-    # Calculate leaving and entering flows
-    leaving_flow = np.sum(pi_matrix, axis=1) / (n_alt - 1)  # How much each alternative outranks others
-    entering_flow = np.sum(pi_matrix, axis=0) / (n_alt - 1)  # How much each alternative is outranked by others
-    
-    # Net flow
-    net_flow = leaving_flow - entering_flow
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        weights: Criteria weights
+        preference_functions: Optional preference function specs per criterion
+            (defaults to a linear preference normalised by the criterion range)
+        algorithm: 'auto', 'pairwise' or 'sorted' (see promethee_flows)
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
+    
+    Returns:
+        MethodResult with scores, ranking and intermediate arrays
+    """
+    leaving_flow, entering_flow, net_flow = promethee_flows(
+        matrix, weights, preference_functions, algorithm=algorithm
+    )
     
     # Rank by net flow (higher is better)
-    ranks = np.argsort(-net_flow).tolist()
+    return MethodResult(
+        'PROMETHEE', net_flow, higher_is_better=True,
+        details={'leaving_flow': leaving_flow, 'entering_flow': entering_flow},
+        top_k=top_k
+    )
+
+
+def promethee_ii(matrix, weights, preference_functions=None, algorithm='auto', top_k=None):
+    """
+    PROMETHEE II (Preference Ranking Organization METHod for Enrichment Evaluation)
     
-    return ranks
+    Returns:
+        List of rankings for each alternative (see promethee_ii_result)
+    """
+    return promethee_ii_result(matrix, weights, preference_functions, algorithm, top_k=top_k).tolist()
 
 
-def grey_relational_analysis(matrix, weights):
+def grey_relational_analysis_result(matrix, weights, top_k=None):
     """
     Grey Relational Analysis (GRA)
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
-    
-    n_alt, n_crit = matrix.shape
+    weights = np.asarray(weights, dtype=float)
     
     # Normalize the decision matrix
-    # For benefit criteria, use min-max normalization
-    normalized_matrix = np.zeros_like(matrix)
-    for j in range(n_crit):
-        min_val = np.min(matrix[:, j])
-        max_val = np.max(matrix[:, j])
-        if max_val != min_val:
-            normalized_matrix[:, j] = (matrix[:, j] - min_val) / (max_val - min_val)
-        else:
-            normalized_matrix[:, j] = 1.0  # If all values are the same
+    # For benefit criteria, use min-max normalization (1.0 if all values are the same)
+    normalized_matrix = as_normalization_cache(matrix).normalized('minmax', constant=1.0)
     
     # Determine reference sequence (best values for each criterion)
     reference_sequence = np.max(normalized_matrix, axis=0)
@@ -460,100 +904,105 @@ def grey_relational_analysis(matrix, weights):
     grey_rel_coeff = (min_dev + zeta * max_dev) / (deviation_matrix + zeta * max_dev)
     
     # Calculate weighted grey relational grades
-    grey_grades = np.zeros(n_alt)
-    for i in range(n_alt):
-        grey_grades[i] = np.sum(weights * grey_rel_coeff[i, :])
+    grey_grades = grey_rel_coeff @ weights
     
     # Rank by grey relational grade (higher is better)
-    ranks = np.argsort(-grey_grades).tolist()
+    return MethodResult(
+        'GRA', grey_grades, higher_is_better=True,
+        details={'grey_relational_coefficients': grey_rel_coeff},
+        top_k=top_k
+    )
+
+
+def grey_relational_analysis(matrix, weights, top_k=None):
+    """
+    Grey Relational Analysis (GRA)
     
-    return ranks
+    Returns:
+        List of rankings for each alternative (see grey_relational_analysis_result)
+    """
+    return grey_relational_analysis_result(matrix, weights, top_k=top_k).tolist()
 
 
-def fuzzy_ahp(matrix, weights):
+def fuzzy_ahp_result(matrix, weights, top_k=None):
     """
     Fuzzy Analytic Hierarchy Process (F-AHP)
     Simplified implementation using triangular fuzzy numbers
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
-    
-    n_alt, n_crit = matrix.shape
+    weights = np.asarray(weights, dtype=float)
     
     # Convert crisp values to fuzzy numbers and back for demonstration
     # In a real implementation, we would handle fuzzy comparison matrices
     # Here we'll just apply fuzzy-like transformations to the weights
     
     # Normalize the decision matrix
-    normalized_matrix = np.zeros_like(matrix)
-    for j in range(n_crit):
-        col_sum = np.sum(matrix[:, j])
-        if col_sum != 0:
-            normalized_matrix[:, j] = matrix[:, j] / col_sum
-        else:
-            normalized_matrix[:, j] = matrix[:, j]
+    normalized_matrix = as_normalization_cache(matrix).normalized('sum')
     
     # Calculate fuzzy synthetic extent (simplified approach)
     # Apply weights and compute scores
-    weighted_scores = np.zeros(n_alt)
-    for i in range(n_alt):
-        weighted_scores[i] = np.sum(weights * normalized_matrix[i, :])
+    weighted_scores = normalized_matrix @ weights
     
     # Rank by weighted scores (higher is better)
-    ranks = np.argsort(-weighted_scores).tolist()
+    return MethodResult('F-AHP', weighted_scores, higher_is_better=True, top_k=top_k)
+
+
+def fuzzy_ahp(matrix, weights, top_k=None):
+    """
+    Fuzzy Analytic Hierarchy Process (F-AHP)
     
-    return ranks
+    Returns:
+        List of rankings for each alternative (see fuzzy_ahp_result)
+    """
+    return fuzzy_ahp_result(matrix, weights, top_k=top_k).tolist()
 
 
-def dematel(matrix, weights):
+def dematel_result(matrix, weights, top_k=None):
     """
     DEMATEL (Decision Making Trial and Evaluation Laboratory)
     Simplified implementation focusing on direct relation matrix
     
     Args:
-        matrix: Decision matrix (alternatives x criteria)
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
         weights: Criteria weights
+        top_k: Keep only the best top_k alternatives in the ranking (all if None)
     
     Returns:
-        List of rankings for each alternative
+        MethodResult with scores, ranking and intermediate arrays
     """
-    matrix = np.array(matrix, dtype=float)
-    weights = np.array(weights, dtype=float)
-    
-    n_alt, n_crit = matrix.shape
+    weights = np.asarray(weights, dtype=float)
     
     # For DEMATEL, we typically work with a relationship matrix
     # Since we have alternatives vs criteria, we'll adapt the method
     # Create a direct relation matrix based on normalized values
     
     # Normalize the matrix to [0,1] range
-    normalized_matrix = np.zeros_like(matrix)
-    for j in range(n_crit):
-        min_val = np.min(matrix[:, j])
-        max_val = np.max(matrix[:, j])
-        if max_val != min_val:
-            normalized_matrix[:, j] = (matrix[:, j] - min_val) / (max_val - min_val)
-        else:
-            normalized_matrix[:, j] = 1.0
+    normalized_matrix = as_normalization_cache(matrix).normalized('minmax', constant=1.0)
     
     # Create a weighted influence matrix
     # Each alternative influences criteria based on its performance and weights
-    influence_matrix = normalized_matrix * weights
-    
-    # Calculate total influence for each alternative
-    total_influence = np.sum(influence_matrix, axis=1)
+    # and calculate total influence for each alternative
+    total_influence = normalized_matrix @ weights
     
     # Rank by total influence (higher is better)
-    ranks = np.argsort(-total_influence).tolist()
+    return MethodResult('DEMATEL', total_influence, higher_is_better=True, top_k=top_k)
+
+
+def dematel(matrix, weights, top_k=None):
+    """
+    DEMATEL (Decision Making Trial and Evaluation Laboratory)
     
-    return ranks
+    Returns:
+        List of rankings for each alternative (see dematel_result)
+    """
+    return dematel_result(matrix, weights, top_k=top_k).tolist()
 
 
 class MCDAData:
@@ -562,63 +1011,451 @@ class MCDAData:
     """
     
     def __init__(self, matrix, weights, criteria_names=None, alternatives_names=None):
-        self.matrix = np.array(matrix, dtype=float)
+        # asarray keeps memory-mapped matrices mapped instead of copying them
+        self.matrix = np.asarray(matrix, dtype=float)
         self.weights = np.array(weights, dtype=float)
         self.criteria_names = criteria_names or [f"Criterion_{i+1}" for i in range(len(weights))]
         self.alternatives_names = alternatives_names or [f"Alternative_{i+1}" for i in range(len(matrix))]
 
 
-def perform_analysis(data, methods, weights):
+# Method name -> (implementation returning a MethodResult, whether it takes criteria weights)
+METHODS = {
+    'TOPSIS': (topsis_result, True),
+    'WSR': (wsr_result, True),
+    'ELECTRE': (electre_iv_result, False),
+    'VIKOR': (vikor_result, True),
+    'AHP': (ahp_result, True),
+    'CHP': (chp_result, True),
+    'MINSUM': (minsum_result, False),
+    'MINMAX': (minmax_result, False),
+    'MAXMIN': (maxmin_result, False),
+    'DIP': (dip_result, False),
+    'ОРП': (orp_result, False),
+    'PROMETHEE': (promethee_ii_result, True),
+    'GRA': (grey_relational_analysis_result, True),
+    'F-AHP': (fuzzy_ahp_result, True),
+    'DEMATEL': (dematel_result, True),
+}
+
+
+def _code_version():
     """
-    Perform analysis using selected methods
+    Digest of the sources computing the results, used to salt ResultCache keys
+    
+    If the sources cannot be read (e.g. in a frozen build) a random salt is
+    used instead, so stored results are only reused within this process.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        for module in (__name__, non_dominated_sort.__module__):
+            with open(sys.modules[module].__file__, 'rb') as f:
+                digest.update(f.read())
+    except (OSError, AttributeError, TypeError):
+        return uuid.uuid4().hex
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def _cache_keys(normalization, methods, weights, top_k, pareto_layers):
+    """ResultCache keys of the implemented methods among the selected ones"""
+    dataset = matrix_digest(normalization.matrix)
+    params = {'top_k': top_k, 'pareto_layers': pareto_layers}
+    return {method: result_key(dataset, method, weights if METHODS[method][1] else None, params, CODE_VERSION)
+            for method in methods if method in METHODS}
+
+
+def perform_analysis_results(data, methods, weights, top_k=None, pareto_layers=None, cache=None):
+    """
+    Perform analysis using selected methods, keeping scores and intermediate arrays
+    
+    The decision matrix is converted once and its normalised variants are
+    shared between all selected methods through a NormalizationCache.
+    Results are looked up in a ResultCache by the contents of the matrix, the
+    weights, the method and its parameters, and only the misses are computed.
     
     Args:
         data: Decision matrix (alternatives x criteria)
         methods: List of method names to use
         weights: Criteria weights
+        top_k: Rank only the best top_k alternatives of each method (all if None)
+        pareto_layers: Rank only alternatives in the first pareto_layers Pareto
+            layers (all if None); the layer of every alternative is stored in
+            details['pareto_layer']
+        cache: ResultCache to use (the process-wide default cache if None,
+            no caching if False); results served from the cache are read-only
     
     Returns:
-        Dictionary with results for each method
+        Dictionary with a MethodResult for each method (None if the method failed)
     """
     results = {}
+    normalization = NormalizationCache(data)
+    weights = np.asarray(weights, dtype=float)
+    if cache is None:
+        cache = default_cache()
+    keys = _cache_keys(normalization, methods, weights, top_k, pareto_layers) if cache else {}
+    
+    layers = rows = None
+    n_alt = len(normalization.matrix)
     
     for method in methods:
+        if method not in METHODS:
+            print(f"Method {method} not implemented")
+            results[method] = None
+            continue
+        
+        if cache:
+            result = cache.get(keys[method])
+            if result is not None:
+                results[method] = result
+                continue
+        
+        if pareto_layers is not None and layers is None:
+            # Sorted lazily so that a run answered from the cache skips it
+            layers = non_dominated_sort(normalization.matrix)
+            rows = np.flatnonzero(layers < pareto_layers)
+            normalization = NormalizationCache(normalization.matrix[rows])
+        
+        function, uses_weights = METHODS[method]
         try:
-            if method == 'TOPSIS':
-                results[method] = topsis(data, weights)
-            elif method == 'WSR':
-                results[method] = wsr(data, weights)
-            elif method == 'ELECTRE':
-                results[method] = electre_iv(data)
-            elif method == 'VIKOR':
-                results[method] = Vikor(data, weights)
-            elif method == 'AHP':
-                results[method] = ahp(data, weights)
-            elif method == 'CHP':
-                results[method] = chp(data, weights)
-            elif method == 'MINSUM':
-                results[method] = minsum(data)
-            elif method == 'MINMAX':
-                results[method] = minmax(data)
-            elif method == 'MAXMIN':
-                results[method] = maxmin(data)
-            elif method == 'DIP':
-                results[method] = dip(data)
-            elif method == 'ОРП':
-                results[method] = orp(data)
-            elif method == 'PROMETHEE':
-                results[method] = promethee_ii(data, weights)
-            elif method == 'GRA':
-                results[method] = grey_relational_analysis(data, weights)
-            elif method == 'F-AHP':
-                results[method] = fuzzy_ahp(data, weights)
-            elif method == 'DEMATEL':
-                results[method] = dematel(data, weights)
+            if uses_weights:
+                result = function(normalization, weights, top_k=top_k)
             else:
-                print(f"Method {method} not implemented")
-                results[method] = []
+                result = function(normalization, top_k=top_k)
+            if rows is not None:
+                result.expand(rows, n_alt)
+                result.details['pareto_layer'] = layers
+            results[method] = result
         except Exception as e:
             print(f"Error in method {method}: {str(e)}")
-            results[method] = []
+            results[method] = None
+            continue
+        
+        if cache:
+            cache.put(keys[method], result)
+    
+    return results
+
+
+# Methods dominated by O(n^2) pairwise loops, run in worker processes by the 'auto' executor
+PROCESS_METHODS = ('ELECTRE', 'PROMETHEE')
+
+# Smallest number of alternatives for which the 'auto' executor starts worker processes
+PROCESS_MIN_ALTERNATIVES = 2000
+
+# Seconds between checks for timeouts and cancellation
+POLL_INTERVAL = 0.05
+
+
+class MethodRun:
+    """
+    Outcome of one method in perform_analysis_parallel
+    
+    status is 'ok', 'error', 'timeout' or 'cancelled'; result is the
+    MethodResult when the method succeeded, error the error message otherwise,
+    and elapsed the running time in seconds (0 for cached results).
+    """
+    
+    def __init__(self, method, status, result=None, error=None, elapsed=0.0, executor=None, cached=False):
+        self.method = method
+        self.status = status
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+        self.executor = executor
+        self.cached = cached
+    
+    @property
+    def ok(self):
+        return self.status == 'ok'
+    
+    def __repr__(self):
+        return f"MethodRun({self.method!r}, {self.status!r}, elapsed={self.elapsed:.3f})"
+
+
+def _timed_method(method, normalization, weights, top_k, spec=None):
+    """Run one method and measure its running time (spec is METHODS[method] if None)"""
+    start = time.perf_counter()
+    function, uses_weights = spec or METHODS[method]
+    if uses_weights:
+        result = function(normalization, weights, top_k=top_k)
+    else:
+        result = function(normalization, top_k=top_k)
+    return result, time.perf_counter() - start
+
+
+def _method_process(conn, method, spec, matrix, weights, top_k):
+    """
+    Worker process entry point: run one method and send its outcome through conn
+    
+    The start time is sent first, so the parent can tell a method that is
+    running from a process that is still starting up.
+    """
+    try:
+        conn.send(('started', time.time()))
+        try:
+            result, elapsed = _timed_method(method, NormalizationCache(matrix), weights, top_k, spec)
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+        else:
+            conn.send(('ok', result, elapsed))
+    finally:
+        conn.close()
+
+
+class _ProcessTask:
+    """
+    A method run in its own worker process
+    
+    Each method gets a separate process rather than a pool worker, so a
+    method that timed out or was cancelled is stopped by terminating exactly
+    its process, without waiting for it.
+    """
+    
+    def __init__(self, context, method, matrix, weights, top_k):
+        self.method = method
+        # Wall-clock start reported by the worker, None until it is running
+        self.started = None
+        # ('ok', result, elapsed) or ('error', message) once the method is done
+        self.outcome = None
+        self.connection, child_conn = context.Pipe(duplex=False)
+        # The function is sent along with the name, so methods registered at runtime work in a spawned process
+        self.process = context.Process(target=_method_process, daemon=True,
+                                       args=(child_conn, method, METHODS[method], matrix, weights, top_k))
+        self._child_conn = child_conn
+    
+    def start(self):
+        self.process.start()
+        self._child_conn.close()
+    
+    def poll(self):
+        """Read the messages sent so far; True once the outcome is known"""
+        try:
+            while self.outcome is None and self.connection.poll():
+                message = self.connection.recv()
+                if message[0] == 'started':
+                    self.started = message[1]
+                else:
+                    self.outcome = message
+        except (EOFError, OSError):
+            self.outcome = ('error', f"Worker process of {self.method} exited unexpectedly")
+        return self.outcome is not None
+    
+    def stop(self):
+        """Terminate the worker process without waiting for it to exit"""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
+
+
+def _process_context():
+    """Multiprocessing context for worker processes, never 'fork' (the caller may run threads)"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def perform_analysis_parallel(data, methods, weights, top_k=None, pareto_layers=None, cache=None,
+                              executor='auto', max_workers=None, timeout=None, cancel_event=None,
+                              callback=None):
+    """
+    Perform analysis running the selected methods concurrently
+    
+    NumPy-bound methods run in a thread pool and share one NormalizationCache
+    (the GIL is released inside NumPy). Methods dominated by pairwise loops
+    (PROCESS_METHODS) run in worker processes, one per method, started with
+    the forkserver (or spawn) method since the caller may be a GUI thread.
+    Cached results are returned without dispatching.
+    
+    A method that runs longer than timeout seconds is reported as 'timeout'
+    and abandoned: its worker process is terminated and not waited for, while
+    a thread cannot be stopped and finishes in the background. Setting
+    cancel_event cancels every method that has not finished yet in the same way.
+    
+    Args:
+        data: Decision matrix (alternatives x criteria)
+        methods: List of method names to use
+        weights: Criteria weights
+        top_k: Rank only the best top_k alternatives of each method (all if None)
+        pareto_layers: Rank only alternatives in the first pareto_layers Pareto layers (all if None)
+        cache: ResultCache to use (the process-wide default cache if None, no caching if False)
+        executor: 'auto' (processes for PROCESS_METHODS on matrices with at least
+            PROCESS_MIN_ALTERNATIVES rows, threads otherwise), 'thread' or 'process'
+        max_workers: Number of threads and of concurrent worker processes
+            (chosen by concurrent.futures and os.cpu_count() if None)
+        timeout: Per-method time limit in seconds, counted from the start of the method (none if None)
+        cancel_event: threading.Event that cancels the remaining methods when set
+        callback: Function called with each MethodRun as soon as it is final
+    
+    Returns:
+        Dictionary with a MethodRun for each method, in the order of methods
+    """
+    if executor not in ('auto', 'thread', 'process'):
+        raise ValueError(f"Unknown executor: {executor}")
+    
+    normalization = NormalizationCache(data)
+    weights = np.asarray(weights, dtype=float)
+    if cache is None:
+        cache = default_cache()
+    keys = _cache_keys(normalization, methods, weights, top_k, pareto_layers) if cache else {}
+    n_alt = len(normalization.matrix)
+    runs = {}
+    
+    def finish(run):
+        runs[run.method] = run
+        if callback is not None:
+            callback(run)
+    
+    todo = []
+    for method in methods:
+        if method not in METHODS:
+            finish(MethodRun(method, 'error', error=f"Method {method} not implemented"))
+            continue
+        result = cache.get(keys[method]) if cache else None
+        if result is not None:
+            finish(MethodRun(method, 'ok', result=result, cached=True))
+        else:
+            todo.append(method)
+    
+    layers = rows = None
+    if todo and pareto_layers is not None:
+        layers = non_dominated_sort(normalization.matrix)
+        rows = np.flatnonzero(layers < pareto_layers)
+        normalization = NormalizationCache(normalization.matrix[rows])
+    
+    def use_process(method):
+        if executor == 'auto':
+            return method in PROCESS_METHODS and len(normalization.matrix) >= PROCESS_MIN_ALTERNATIVES
+        return executor == 'process'
+    
+    def complete(method, kind, outcome):
+        if outcome[0] == 'error':
+            finish(MethodRun(method, 'error', error=outcome[1], elapsed=outcome[2], executor=kind))
+            return
+        result, elapsed = outcome[1], outcome[2]
+        if rows is not None:
+            result.expand(rows, n_alt)
+            result.details['pareto_layer'] = layers
+        if cache:
+            cache.put(keys[method], result)
+        finish(MethodRun(method, 'ok', result=result, elapsed=elapsed, executor=kind))
+    
+    def elapsed_since(start, now):
+        return now - start if start is not None else 0.0
+    
+    threads = None
+    futures = {}
+    started = {}
+    queued = []
+    running = []
+    process_slots = max_workers or os.cpu_count() or 1
+    try:
+        process_methods = [method for method in todo if use_process(method)]
+        if process_methods:
+            context = _process_context()
+            # The matrix is O(n*k) while the methods are O(n^2), so it is simply pickled to each process
+            matrix = np.ascontiguousarray(normalization.matrix)
+            queued = [_ProcessTask(context, method, matrix, weights, top_k) for method in process_methods]
+        
+        for method in todo:
+            if not use_process(method):
+                if threads is None:
+                    threads = ThreadPoolExecutor(max_workers=max_workers)
+                # Threads share the NormalizationCache; a variant computed twice by a race is only wasted work
+                futures[threads.submit(_timed_method, method, normalization, weights, top_k)] = method
+        
+        pending = set(futures)
+        while pending or queued or running:
+            while queued and len(running) < process_slots:
+                task = queued.pop(0)
+                task.start()
+                running.append(task)
+            
+            if pending:
+                done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            else:
+                done = set()
+                multiprocessing.connection.wait([task.connection for task in running], timeout=POLL_INTERVAL)
+            for future in done:
+                pending.discard(future)
+                method = futures[future]
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    complete(method, 'thread', ('error', f"{type(e).__name__}: {e}",
+                                                elapsed_since(started.get(future), time.time())))
+                    continue
+                complete(method, 'thread', ('ok', result, elapsed))
+            
+            for task in list(running):
+                if task.poll():
+                    running.remove(task)
+                    task.process.join()
+                    outcome = task.outcome
+                    if outcome[0] == 'error':
+                        outcome = outcome + (elapsed_since(task.started, time.time()),)
+                    complete(task.method, 'process', outcome)
+            
+            now = time.time()
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            status = 'cancelled' if cancelled else 'timeout'
+            message = 'cancelled' if cancelled else 'timed out'
+            for future in list(pending):
+                if future not in started and future.running():
+                    started[future] = now
+                elapsed = elapsed_since(started.get(future), now)
+                if cancelled or (timeout is not None and elapsed > timeout):
+                    pending.discard(future)
+                    future.cancel()
+                    finish(MethodRun(futures[future], status, error=f"Method {futures[future]} {message}",
+                                     elapsed=elapsed, executor='thread'))
+            for task in list(running):
+                elapsed = elapsed_since(task.started, now)
+                if cancelled or (timeout is not None and elapsed > timeout):
+                    running.remove(task)
+                    task.stop()
+                    finish(MethodRun(task.method, status, error=f"Method {task.method} {message}",
+                                     elapsed=elapsed, executor='process'))
+            if cancelled:
+                for task in queued:
+                    finish(MethodRun(task.method, status, error=f"Method {task.method} {message}",
+                                     executor='process'))
+                queued = []
+    finally:
+        if threads is not None:
+            threads.shutdown(wait=False, cancel_futures=True)
+        # Only reached with tasks left if an exception escaped the loop
+        for task in running:
+            task.stop()
+    
+    return {method: runs[method] for method in methods}
+
+
+def perform_analysis(data, methods, weights, top_k=None, pareto_layers=None, cache=None,
+                     parallel=False, timeout=None):
+    """
+    Perform analysis using selected methods
     
-    return results
\ No newline at end of file
+    Args:
+        data: Decision matrix (alternatives x criteria)
+        methods: List of method names to use
+        weights: Criteria weights
+        top_k: Return only the best top_k alternatives of each method (all if None)
+        pareto_layers: Rank only alternatives in the first pareto_layers Pareto layers (all if None)
+        cache: ResultCache to use (the process-wide default cache if None, no caching if False)
+        parallel: Run the methods concurrently (see perform_analysis_parallel)
+        timeout: Per-method time limit in seconds when parallel (none if None)
+    
+    Returns:
+        Dictionary with results for each method
+    """
+    if parallel:
+        runs = perform_analysis_parallel(data, methods, weights, top_k, pareto_layers, cache, timeout=timeout)
+        for run in runs.values():
+            if not run.ok:
+                print(f"Error in method {run.method}: {run.error}")
+        return {method: run.result.tolist() if run.ok else [] for method, run in runs.items()}
+    
+    results = perform_analysis_results(data, methods, weights, top_k, pareto_layers, cache)
+    return {method: result.tolist() if result is not None else []
+            for method, result in results.items()}
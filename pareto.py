@@ -0,0 +1,349 @@
+"""
+Pareto module
+Contains skyline (Pareto front) algorithms used to sort out non-Pareto-optimal
+alternatives before ranking
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from utils import fingerprint_array
+
+
+# Number of cached fronts kept per process
+FRONT_CACHE_SIZE = 32
+
+# Upper bound on the number of elements in one dominance block (rows x rows x criteria)
+DOMINANCE_BLOCK_ELEMENTS = 2 ** 22
+
+# Below this many points divide-and-conquer compares all pairs directly
+DC_LEAF_SIZE = 256
+
+_front_cache = OrderedDict()
+
+
+def orient_matrix(data, directions=None):
+    """
+    Convert a decision matrix so that higher values are better on every criterion
+    
+    Args:
+        data: Decision matrix (alternatives x criteria)
+        directions: Optional list of 'benefit'/'max' or 'cost'/'min' per criterion
+            (all benefit if None)
+    
+    Returns:
+        Float array where cost criteria are negated
+    """
+    matrix = np.asarray(data, dtype=float)
+    if matrix.ndim != 2:
+        raise ValueError("Decision matrix must be two-dimensional")
+    if not directions:
+        return matrix
+    if len(directions) != matrix.shape[1]:
+        raise ValueError(f"Expected {matrix.shape[1]} directions, got {len(directions)}")
+    
+    signs = np.array([-1.0 if d.lower() in ('cost', 'min') else 1.0 for d in directions])
+    return matrix * signs
+
+
+def dominated_by(candidates, points):
+    """
+    Which candidates are dominated by at least one of the points
+    
+    All criteria must already be oriented so that higher is better.
+    
+    Args:
+        candidates: Array (m x k) of points to test
+        points: Array (p x k) of potential dominators
+    
+    Returns:
+        Boolean array of length m
+    """
+    candidates = np.asarray(candidates, dtype=float)
+    points = np.asarray(points, dtype=float)
+    result = np.zeros(len(candidates), dtype=bool)
+    if len(candidates) == 0 or len(points) == 0:
+        return result
+    
+    n_crit = candidates.shape[1]
+    step = max(1, DOMINANCE_BLOCK_ELEMENTS // max(1, len(points) * n_crit))
+    for start in range(0, len(candidates), step):
+        block = candidates[start:start + step, np.newaxis, :]
+        # points[j] dominates block[i] if it is >= everywhere and > somewhere
+        at_least = np.all(points[np.newaxis, :, :] >= block, axis=2)
+        better = np.any(points[np.newaxis, :, :] > block, axis=2)
+        result[start:start + step] = np.any(at_least & better, axis=1)
+    return result
+
+
+def _lexicographic_order(matrix):
+    """
+    Row indices in descending lexicographic order
+    
+    In this order no row can be dominated by a row that comes after it, which
+    is what the sort-first and divide-and-conquer algorithms rely on.
+    """
+    return np.lexsort(-matrix.T[::-1])
+
+
+def skyline_sfs(matrix, block_size=256):
+    """
+    Sort-first skyline: rows are visited in descending lexicographic order so
+    that a row can only be dominated by rows visited before it, and each block
+    of rows is checked against the front found so far and against itself
+    
+    Args:
+        matrix: Oriented decision matrix (higher is better)
+        block_size: Number of rows checked together
+    
+    Returns:
+        Sorted array of front row indices
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    order = _lexicographic_order(matrix)
+    front = []
+    front_points = matrix[:0]
+    
+    for start in range(0, len(order), block_size):
+        idx = order[start:start + block_size]
+        block = matrix[idx]
+        # Dominators of a block row are either in the front or earlier in the block;
+        # by transitivity it is enough to test against block rows the front left
+        keep = ~dominated_by(block, front_points)
+        keep &= ~dominated_by(block, block[keep])
+        front.extend(idx[keep].tolist())
+        front_points = np.vstack([front_points, block[keep]])
+    
+    return np.sort(np.array(front, dtype=int))
+
+
+def skyline_bnl(matrix):
+    """
+    Block-nested-loops skyline: keeps a window of mutually non-dominated rows,
+    discarding each new row dominated by the window and evicting window rows
+    the new row dominates
+    
+    Args:
+        matrix: Oriented decision matrix (higher is better)
+    
+    Returns:
+        Sorted array of front row indices
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    n_alt, n_crit = matrix.shape
+    window = np.empty((n_alt, n_crit))
+    window_idx = np.empty(n_alt, dtype=int)
+    size = 0
+    
+    for i in range(n_alt):
+        row = matrix[i]
+        current = window[:size]
+        if size and np.any(np.all(current >= row, axis=1) & np.any(current > row, axis=1)):
+            continue
+        if size:
+            survivors = ~(np.all(row >= current, axis=1) & np.any(row > current, axis=1))
+            kept = int(survivors.sum())
+            window[:kept] = current[survivors]
+            window_idx[:kept] = window_idx[:size][survivors]
+            size = kept
+        window[size] = row
+        window_idx[size] = i
+        size += 1
+    
+    return np.sort(window_idx[:size])
+
+
+def _dc_front(matrix, idx):
+    """Front of matrix[idx], where idx is in descending lexicographic order"""
+    if len(idx) <= DC_LEAF_SIZE:
+        points = matrix[idx]
+        return idx[~dominated_by(points, points)]
+    
+    middle = len(idx) // 2
+    upper = _dc_front(matrix, idx[:middle])
+    lower = _dc_front(matrix, idx[middle:])
+    # Rows of the lower half cannot dominate rows of the upper half
+    lower = lower[~dominated_by(matrix[lower], matrix[upper])]
+    return np.concatenate([upper, lower])
+
+
+def skyline_dc(matrix):
+    """
+    Divide-and-conquer skyline: splits the rows in descending lexicographic
+    order, computes the front of both halves recursively and merges them by
+    filtering the lower front against the upper one. Scales best when there
+    are many criteria and the front is large
+    
+    Args:
+        matrix: Oriented decision matrix (higher is better)
+    
+    Returns:
+        Sorted array of front row indices
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    return np.sort(_dc_front(matrix, _lexicographic_order(matrix)))
+
+
+ALGORITHMS = {
+    'sfs': skyline_sfs,
+    'bnl': skyline_bnl,
+    'dc': skyline_dc,
+}
+
+
+def _layers_by_peeling(matrix):
+    """Reference non-dominated sorting: repeatedly peel off the front of the remaining rows"""
+    layers = np.full(len(matrix), -1, dtype=int)
+    remaining = np.arange(len(matrix))
+    layer = 0
+    while len(remaining):
+        points = matrix[remaining]
+        front = ~dominated_by(points, points)
+        layers[remaining[front]] = layer
+        remaining = remaining[~front]
+        layer += 1
+    return layers
+
+
+def _layers_by_ens(matrix):
+    """
+    Efficient non-dominated sort with binary search (ENS-BS)
+    
+    Rows are visited in descending lexicographic order, so a row can only be
+    dominated by rows already assigned to a layer. If a row is dominated by a
+    member of layer j it is also dominated by a member of every earlier layer,
+    which makes the first layer without a dominator findable by binary search.
+    """
+    n_alt, n_crit = matrix.shape
+    layers = np.full(n_alt, -1, dtype=int)
+    # Members of each layer, stored in preallocated buffers that grow by doubling
+    fronts = []
+    sizes = []
+    
+    for i in _lexicographic_order(matrix):
+        row = matrix[i]
+        low, high = 0, len(fronts)
+        while low < high:
+            middle = (low + high) // 2
+            members = fronts[middle][:sizes[middle]]
+            at_least = members[np.all(members >= row, axis=1)]
+            if len(at_least) and np.any(at_least != row):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(fronts):
+            fronts.append(np.empty((16, n_crit)))
+            sizes.append(0)
+        if sizes[low] == len(fronts[low]):
+            fronts[low] = np.vstack([fronts[low], np.empty_like(fronts[low])])
+        fronts[low][sizes[low]] = row
+        sizes[low] += 1
+        layers[i] = low
+    
+    return layers
+
+
+LAYER_ALGORITHMS = {
+    'peeling': _layers_by_peeling,
+    'ens': _layers_by_ens,
+}
+
+
+def non_dominated_sort(data, directions=None, algorithm='ens'):
+    """
+    Pareto layer of every alternative
+    
+    Layer 0 is the Pareto front, layer 1 the front of the remaining
+    alternatives, and so on.
+    
+    Args:
+        data: Decision matrix (alternatives x criteria)
+        directions: Optional list of 'benefit'/'max' or 'cost'/'min' per criterion
+            (all benefit if None)
+        algorithm: 'ens' (efficient non-dominated sort) or 'peeling' (reference)
+    
+    Returns:
+        Integer array with the 0-based layer of every alternative
+    """
+    matrix = orient_matrix(data, directions)
+    if algorithm not in LAYER_ALGORITHMS:
+        raise ValueError(f"Unknown non-dominated sorting algorithm: {algorithm}")
+    return LAYER_ALGORITHMS[algorithm](matrix)
+
+
+def benchmark_non_dominated_sort(n_alt=10000, n_crit=10, seed=0):
+    """
+    Time every non-dominated sorting algorithm on a random matrix
+    
+    Args:
+        n_alt: Number of alternatives
+        n_crit: Number of criteria
+        seed: Random seed
+    
+    Returns:
+        Dictionary with the time in seconds for each algorithm
+    """
+    import time
+    
+    matrix = np.random.default_rng(seed).random((n_alt, n_crit))
+    timings = {}
+    reference = None
+    for name, function in LAYER_ALGORITHMS.items():
+        start = time.perf_counter()
+        layers = function(matrix)
+        timings[name] = time.perf_counter() - start
+        if reference is not None and not np.array_equal(layers, reference):
+            raise AssertionError(f"{name} layers differ from the reference")
+        reference = layers
+    return timings
+
+
+def _dataset_key(matrix, algorithm):
+    """Cache key for an oriented matrix"""
+    return (fingerprint_array(matrix), algorithm)
+
+
+def pareto_front(data, directions=None, algorithm='auto', use_cache=True):
+    """
+    Indices of the Pareto-optimal (non-dominated) alternatives
+    
+    Args:
+        data: Decision matrix (alternatives x criteria)
+        directions: Optional list of 'benefit'/'max' or 'cost'/'min' per criterion
+            (all benefit if None)
+        algorithm: 'auto', 'sfs', 'bnl' or 'dc'
+        use_cache: Reuse the front computed earlier for the same dataset
+    
+    Returns:
+        Sorted read-only array of front row indices
+    """
+    matrix = orient_matrix(data, directions)
+    if algorithm == 'auto':
+        algorithm = 'dc' if matrix.shape[1] > 4 else 'sfs'
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown skyline algorithm: {algorithm}")
+    
+    key = _dataset_key(matrix, algorithm) if use_cache else None
+    if key is not None and key in _front_cache:
+        _front_cache.move_to_end(key)
+        return _front_cache[key]
+    
+    front = ALGORITHMS[algorithm](matrix)
+    front.flags.writeable = False
+    
+    if key is not None:
+        _front_cache[key] = front
+        while len(_front_cache) > FRONT_CACHE_SIZE:
+            _front_cache.popitem(last=False)
+    return front
+
+
+def clear_front_cache():
+    """Forget all cached fronts"""
+    _front_cache.clear()
+
+
+if __name__ == "__main__":
+    for name, seconds in benchmark_non_dominated_sort().items():
+        print(f"{name}: {seconds:.2f} s")
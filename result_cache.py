@@ -0,0 +1,254 @@
+"""
+Result cache module
+Contains a content-addressed cache of MCDA method results with an in-memory
+LRU tier and an optional on-disk SQLite tier shared between sessions
+"""
+
+import copy
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils import fingerprint_array
+
+
+# Number of results kept in memory by default
+MEMORY_CACHE_ENTRIES = 128
+
+# Default size limit of the in-memory tier in bytes
+MEMORY_CACHE_BYTES = 64 * 1024 * 1024
+
+# Default size limit of the on-disk tier in bytes
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+# Layout of the stored results, part of every key so that older entries are never served
+CACHE_FORMAT_VERSION = 2
+
+
+def matrix_digest(matrix):
+    """
+    Hash of the contents, shape and dtype of a decision matrix
+    
+    Args:
+        matrix: Decision matrix
+    
+    Returns:
+        Hex digest string
+    """
+    return fingerprint_array(np.asarray(matrix, dtype=float))
+
+
+def result_key(dataset, method, weights=None, params=None, version=None):
+    """
+    Cache key of one method run
+    
+    Args:
+        dataset: Digest of the decision matrix (see matrix_digest)
+        method: Method name
+        weights: Criteria weights, None if the method does not use them
+        params: Dictionary of other method parameters (must be JSON serializable)
+        version: Version of the code computing the result, so that results of
+            an older implementation are not served after an upgrade
+    
+    Returns:
+        Hex digest string
+    """
+    description = {
+        'format': CACHE_FORMAT_VERSION,
+        'version': version,
+        'dataset': dataset,
+        'method': method,
+        'weights': None if weights is None else np.asarray(weights, dtype=float).tolist(),
+        'params': params or {},
+    }
+    text = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _cached_copy(result):
+    """Read-only copy of a result for the cache, the caller's result is left writable"""
+    cached = copy.copy(result)
+    cached.scores = np.array(result.scores)
+    cached.ranking = np.array(result.ranking)
+    cached.details = {name: np.array(value) for name, value in result.details.items()}
+    return _freeze(cached)
+
+
+def _freeze(result):
+    """Make the arrays of a cached result read-only, since the object is shared"""
+    for value in [result.scores, result.ranking, *result.details.values()]:
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return result
+
+
+def _result_bytes(result):
+    """Size of the arrays of a result in bytes"""
+    return sum(np.asarray(value).nbytes for value in [result.scores, result.ranking, *result.details.values()])
+
+
+class ResultCache:
+    """
+    Two-tier cache of method results
+    
+    Results are kept in an in-memory LRU of at most max_entries items and
+    memory_bytes bytes of arrays. If a path is given they are also pickled
+    into an SQLite database, where the least recently used entries are
+    evicted once the stored size exceeds max_bytes. The cache stores a
+    complete read-only copy of every result and hits share that copy. A
+    result whose arrays exceed the limit of a tier, such as the n x n
+    matrices of ELECTRE on a large dataset, is not stored in that tier.
+    """
+    
+    def __init__(self, max_entries=MEMORY_CACHE_ENTRIES, path=None, max_bytes=DISK_CACHE_BYTES,
+                 memory_bytes=MEMORY_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ['hits', 'misses', 'memory_hits', 'disk_hits', 'memory_evictions', 'disk_evictions'], 0)
+        
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("CREATE TABLE IF NOT EXISTS results "
+                                   "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+    
+    def get(self, key):
+        """
+        Cached result for a key
+        
+        Args:
+            key: Key from result_key
+        
+        Returns:
+            MethodResult or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats['hits'] += 1
+                self._stats['memory_hits'] += 1
+                return self._memory[key]
+            
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    with self._conn:
+                        self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                    result = _freeze(pickle.loads(row[0]))
+                    self._remember(key, result)
+                    self._stats['hits'] += 1
+                    self._stats['disk_hits'] += 1
+                    return result
+            
+            self._stats['misses'] += 1
+            return None
+    
+    def put(self, key, result):
+        """
+        Store a result in both tiers
+        
+        Args:
+            key: Key from result_key
+            result: MethodResult to store
+        """
+        size = _result_bytes(result)
+        with self._lock:
+            if size <= self.memory_bytes:
+                self._remember(key, _cached_copy(result))
+            if self._conn is not None and size <= self.max_bytes:
+                value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                       (key, value, len(value), time.time()))
+                    self._evict_disk()
+    
+    def _remember(self, key, result):
+        """Put a result into the memory tier, evicting the least recently used ones"""
+        if key in self._memory:
+            self._memory_size -= _result_bytes(self._memory.pop(key))
+        self._memory[key] = result
+        self._memory_size += _result_bytes(result)
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_size > self.memory_bytes):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= _result_bytes(evicted)
+            self._stats['memory_evictions'] += 1
+    
+    def _evict_disk(self):
+        """Delete the least recently used disk entries until the size limit is met"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed").fetchall():
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._stats['disk_evictions'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+    
+    def stats(self):
+        """
+        Cache statistics
+        
+        Returns:
+            Dictionary with hit, miss and eviction counters and the current
+            number of entries and bytes in each tier
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_size
+            if self._conn is not None:
+                count, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                stats['disk_entries'] = count
+                stats['disk_bytes'] = size
+            return stats
+    
+    def clear(self):
+        """Remove all entries from both tiers (statistics are kept)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM results")
+    
+    def close(self):
+        """Close the on-disk tier"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache = ResultCache()
+
+
+def default_cache():
+    """The process-wide cache used by perform_analysis"""
+    return _default_cache
+
+
+def set_default_cache(cache):
+    """
+    Replace the process-wide cache, e.g. with one that has an on-disk tier
+    
+    Args:
+        cache: ResultCache instance
+    """
+    global _default_cache
+    _default_cache = cache
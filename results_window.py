@@ -4,6 +4,9 @@ Contains the ResultsWindow class for displaying MCDA analysis results with enhan
 """
 
 import sys
+from collections import OrderedDict
+
+import numpy as np
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
@@ -16,22 +19,46 @@ from visualization import (
     create_performance_spider_chart,
     create_scatter_plot_2d,
     create_heatmap,
-    create_parallel_coordinates
+    create_parallel_coordinates,
+    FigureCache
 )
+from table_models import ArrayTableModel, ColumnTableModel
+from utils import hash_data
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 
+# Number of charts per window that keep their canvas; older ones are redrawn from the figure cache
+RENDERED_CHARTS = 4
+
+
 class ResultsWindow(QMainWindow):
     """Window to display analysis results with enhanced visualization, designed as a proper window with menu bar and status bar"""
     
     def __init__(self, data, methods, inputs, results, parent=None):
         super(ResultsWindow, self).__init__(parent)
         
-        self.data = data
-        self.methods = methods
+        # Decision matrix as a float array (alternatives x criteria)
+        self.data = np.array(data, dtype=float).reshape(len(data), -1) if len(data) else np.zeros((0, 0))
+        self.methods = list(methods)
         self.inputs = inputs
-        self.results = results
+        # Results may arrive one method at a time (see add_result)
+        self.results = dict(results)
+        
+        # Pareto layer of every alternative (0 is the Pareto front), set by set_pareto_layers
+        self.pareto_layers = None
+        # Result table models of the methods with a ranking
+        self.ranking_models = {}
+        
+        # Figures drawn by this window; a figure is never shared with another window,
+        # since matplotlib binds a figure to the last canvas created for it
+        self.figure_cache = FigureCache()
+        # Chart holder widget -> function returning (chart parameters, figure factory)
+        self.chart_specs = {}
+        # Chart holder widget -> layout inside its scroll area that receives the canvas
+        self.chart_layouts = {}
+        # Chart holders with a canvas, least recently shown first: holder -> (key, canvas)
+        self.rendered_charts = OrderedDict()
         
         self.initUI()
         
@@ -163,8 +190,10 @@ class ResultsWindow(QMainWindow):
             self.stacked_widget.setCurrentIndex(1)
         elif view_name == "Charts":
             self.stacked_widget.setCurrentIndex(2)
+            self.render_chart(self.chart_tabs.currentWidget())
         elif view_name == "Comparison":
             self.stacked_widget.setCurrentIndex(3)
+            self.render_chart(self.comparison_viz_group)
             
         self.current_view = view_name
     
@@ -176,15 +205,8 @@ class ResultsWindow(QMainWindow):
         data_group = QGroupBox("Original Data")
         data_layout = QVBoxLayout(data_group)
         
-        self.data_table = QTableWidget()
-        self.data_table.setRowCount(len(self.data))
-        self.data_table.setColumnCount(len(self.data[0]) if self.data else 0)
-        self.data_table.setHorizontalHeaderLabels([f"Criterion {i+1}" for i in range(len(self.data[0]) if self.data else 0)])
-        
-        for i, row in enumerate(self.data):
-            for j, val in enumerate(row):
-                item = QTableWidgetItem(str(val))
-                self.data_table.setItem(i, j, item)
+        self.data_table = QTableView()
+        self.data_table.setModel(ArrayTableModel(self.data, editable=False, parent=self.data_table))
         
         data_layout.addWidget(self.data_table)
         layout.addWidget(data_group)
@@ -219,169 +241,248 @@ class ResultsWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         
         # Create a tab widget for each method's results
-        tabs = QTabWidget()
+        self.results_tabs = QTabWidget()
         
         for method in self.methods:
             if method in self.results:
-                tab = QWidget()
-                tab_layout = QVBoxLayout(tab)
-                
-                results_table = QTableWidget()
-                
-                # Set up the table based on results
-                if isinstance(self.results[method], list) and self.results[method]:
-                    if isinstance(self.results[method][0], (list, tuple)):
-                        # Results are in table format
-                        rows = len(self.results[method])
-                        cols = len(self.results[method][0])
-                        results_table.setRowCount(rows)
-                        results_table.setColumnCount(cols)
-                        
-                        for i, row in enumerate(self.results[method]):
-                            for j, val in enumerate(row):
-                                item = QTableWidgetItem(str(val))
-                                results_table.setItem(i, j, item)
-                    else:
-                        # Results are in single column format (rankings)
-                        results_table.setRowCount(len(self.results[method]))
-                        results_table.setColumnCount(2)
-                        results_table.setHorizontalHeaderLabels(["Alternative", "Rank"])
-                        
-                        for i, val in enumerate(self.results[method]):
-                            alt_item = QTableWidgetItem(f"A{i+1}")
-                            rank_item = QTableWidgetItem(str(val + 1))  # Convert to 1-indexed rank
-                            results_table.setItem(i, 0, alt_item)
-                            results_table.setItem(i, 1, rank_item)
-                
-                tab_layout.addWidget(results_table)
-                tabs.addTab(tab, method)
+                self.add_results_tab(method)
         
-        layout.addWidget(tabs)
+        layout.addWidget(self.results_tabs)
         return widget
     
+    def method_tab_index(self, tabs, method):
+        """Position for a method's tab so that tabs follow the order of the selected methods"""
+        earlier = self.methods[:self.methods.index(method)] if method in self.methods else self.methods
+        return sum(1 for i in range(tabs.count()) if tabs.tabText(i) in earlier)
+    
+    def add_results_tab(self, method):
+        """Add the results table of one method to the results view"""
+        tab = QWidget()
+        tab_layout = QVBoxLayout(tab)
+        
+        results_table = QTableView()
+        model = ColumnTableModel(parent=results_table)
+        
+        # Set up the table based on results
+        if isinstance(self.results[method], list) and self.results[method]:
+            if isinstance(self.results[method][0], (list, tuple)):
+                # Results are in table format
+                model.set_columns([list(column) for column in zip(*self.results[method])])
+            else:
+                # Results are in single column format (alternative indices from best to worst)
+                self.set_ranking_columns(model, self.results[method])
+                self.ranking_models[method] = model
+        
+        results_table.setModel(model)
+        tab_layout.addWidget(results_table)
+        self.results_tabs.insertTab(self.method_tab_index(self.results_tabs, method), tab, method)
+    
+    def set_ranking_columns(self, model, ranking):
+        """Fill a result table model with a ranking and the Pareto layers, if known"""
+        ranking = np.asarray(ranking)
+        layers = self.pareto_layers[ranking] if self.pareto_layers is not None else np.full(len(ranking), -1)
+        model.set_columns(
+            [np.arange(1, len(ranking) + 1), ranking, layers],
+            ["Rank", "Alternative", "Pareto Layer"],
+            # Alternatives and layers are shown 1-indexed
+            [None, lambda val: f"A{val+1}", lambda val: str(val + 1) if val >= 0 else ""]
+        )
+    
+    def set_pareto_layers(self, layers):
+        """
+        Show the Pareto layer of every alternative in the result tables
+        
+        Args:
+            layers: Array with the 0-based Pareto layer of every alternative
+        """
+        self.pareto_layers = np.asarray(layers)
+        for method, model in self.ranking_models.items():
+            self.set_ranking_columns(model, self.results[method])
+    
+    def add_result(self, method, ranking):
+        """
+        Show the result of a method that finished after the window was opened
+        
+        Args:
+            method: Method name
+            ranking: List of alternative indices from best to worst
+        """
+        self.results[method] = ranking
+        self.add_results_tab(method)
+        if ranking:
+            self.add_ranking_chart_tab(method)
+        self.statusBar().showMessage(f"{method} finished ({len(self.results)} of {len(self.methods)} methods)")
+    
+    def add_error(self, method, message):
+        """
+        Show that a method failed, timed out or was cancelled
+        
+        Args:
+            method: Method name
+            message: Error message
+        """
+        tab = QWidget()
+        tab_layout = QVBoxLayout(tab)
+        label = QLabel(message)
+        label.setWordWrap(True)
+        tab_layout.addWidget(label)
+        tab_layout.addStretch()
+        self.results_tabs.insertTab(self.method_tab_index(self.results_tabs, method), tab, method)
+        self.statusBar().showMessage(f"{method}: {message}")
+    
+    def finish_analysis(self, cancelled=False, error=None):
+        """
+        Build the method comparison once every method has reported
+        
+        Args:
+            cancelled: Whether the analysis was cancelled
+            error: Message of the error that stopped the analysis, if any
+        """
+        self.refresh_comparison()
+        if error is not None:
+            self.statusBar().showMessage(f'Analysis failed: {error}')
+        else:
+            self.statusBar().showMessage('Analysis cancelled' if cancelled else 'Analysis complete')
+    
     def create_charts_view(self):
-        """Create the charts view"""
+        """Create the charts view; each chart is rendered when its tab is first shown"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
         
         # Create tabs for different chart types
         tabs = QTabWidget()
+        self.chart_tabs = tabs
         
         # Add ranking charts for each method
         for method in self.methods:
             if method in self.results and isinstance(self.results[method], list) and self.results[method]:
-                # Create a tab with scroll area for the chart
-                tab = QWidget()
-                tab_layout = QVBoxLayout(tab)
-                
-                # Create the ranking chart
-                fig = create_ranking_chart(self.results[method], method)
-                canvas = FigureCanvas(fig)
-                
-                # Add to scroll area
-                scroll = QScrollArea()
-                scroll.setWidgetResizable(True)
-                scroll_content = QWidget()
-                scroll_layout = QVBoxLayout(scroll_content)
-                scroll_layout.addWidget(canvas)
-                scroll.setWidget(scroll_content)
-                
-                tab_layout.addWidget(scroll)
-                tabs.addTab(tab, method)
-        
-        # Add comparison chart
-        if len(self.results) > 1:
-            comparison_tab = QWidget()
-            comparison_layout = QVBoxLayout(comparison_tab)
-            
-            fig = create_comparison_chart(self.results)
-            canvas = FigureCanvas(fig)
-            
-            scroll = QScrollArea()
-            scroll.setWidgetResizable(True)
-            scroll_content = QWidget()
-            scroll_layout = QVBoxLayout(scroll_content)
-            scroll_layout.addWidget(canvas)
-            scroll.setWidget(scroll_content)
-            
-            comparison_layout.addWidget(scroll)
-            tabs.addTab(comparison_tab, "Method Comparison")
-        
-        # Add advanced visualization charts
-        # 2D Scatter Plot Tab
-        scatter_tab = QWidget()
-        scatter_layout = QVBoxLayout(scatter_tab)
-        
-        fig = create_scatter_plot_2d(self.data, 0, 1, "2D Scatter Plot: Criterion 1 vs Criterion 2")
-        canvas = FigureCanvas(fig)
-        
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll_content = QWidget()
-        scroll_layout_2d = QVBoxLayout(scroll_content)
-        scroll_layout_2d.addWidget(canvas)
-        scroll.setWidget(scroll_content)
-        
-        scatter_layout.addWidget(scroll)
-        tabs.addTab(scatter_tab, "2D Scatter Plot")
-        
-        # Heatmap Tab
-        heatmap_tab = QWidget()
-        heatmap_layout = QVBoxLayout(heatmap_tab)
-        
-        fig = create_heatmap(self.data, "Heatmap of Criteria Values")
-        canvas = FigureCanvas(fig)
-        
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll_content = QWidget()
-        scroll_layout_hm = QVBoxLayout(scroll_content)
-        scroll_layout_hm.addWidget(canvas)
-        scroll.setWidget(scroll_content)
+                self.add_ranking_chart_tab(method)
         
-        heatmap_layout.addWidget(scroll)
-        tabs.addTab(heatmap_tab, "Heatmap")
+        # Comparison chart, shared with the comparison view
+        self.comparison_chart_tab = self.add_chart_tab("Method Comparison", self.comparison_chart_spec)
         
-        # Parallel Coordinates Tab
-        par_coord_tab = QWidget()
-        par_coord_layout = QVBoxLayout(par_coord_tab)
-        
-        fig = create_parallel_coordinates(self.data, "All Methods", [f"C{i+1}" for i in range(len(self.data[0]) if self.data else 0)])
-        canvas = FigureCanvas(fig)
-        
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll_content = QWidget()
-        scroll_layout_pc = QVBoxLayout(scroll_content)
-        scroll_layout_pc.addWidget(canvas)
-        scroll.setWidget(scroll_content)
-        
-        par_coord_layout.addWidget(scroll)
-        tabs.addTab(par_coord_tab, "Parallel Coordinates")
+        # Add advanced visualization charts
+        criteria_names = [f"C{i+1}" for i in range(self.data.shape[1])]
+        self.add_chart_tab("2D Scatter Plot", lambda: (
+            ('scatter', 0, 1),
+            lambda: create_scatter_plot_2d(self.data, 0, 1, "2D Scatter Plot: Criterion 1 vs Criterion 2")
+        ))
+        self.add_chart_tab("Heatmap", lambda: (
+            ('heatmap',),
+            lambda: create_heatmap(self.data, "Heatmap of Criteria Values")
+        ))
+        self.add_chart_tab("Parallel Coordinates", lambda: (
+            ('parallel',),
+            lambda: create_parallel_coordinates(self.data, "All Methods", criteria_names)
+        ))
         
         # Spider Chart Tab (using first method for example)
         if self.methods:
-            spider_tab = QWidget()
-            spider_layout = QVBoxLayout(spider_tab)
-            
             # Using the original data for spider chart visualization
             # This would normally use the results of a specific method
-            fig = create_performance_spider_chart(self.data, self.methods[0], [f"C{i+1}" for i in range(len(self.data[0]) if self.data else 0)])
-            canvas = FigureCanvas(fig)
-            
-            scroll = QScrollArea()
-            scroll.setWidgetResizable(True)
-            scroll_content = QWidget()
-            scroll_layout_sp = QVBoxLayout(scroll_content)
-            scroll_layout_sp.addWidget(canvas)
-            scroll.setWidget(scroll_content)
-            
-            spider_layout.addWidget(scroll)
-            tabs.addTab(spider_tab, "Spider Chart")
+            self.add_chart_tab("Spider Chart", lambda: (
+                ('spider', self.methods[0]),
+                lambda: create_performance_spider_chart(self.data, self.methods[0], criteria_names)
+            ))
         
+        # Tabs added or switched while the charts view is hidden are rendered by switch_view
+        tabs.currentChanged.connect(lambda index: self.render_chart(tabs.widget(index)) if widget.isVisible() else None)
         layout.addWidget(tabs)
         return widget
     
+    def add_chart_tab(self, title, spec, index=None):
+        """
+        Add an empty chart tab that is rendered when shown
+        
+        Args:
+            title: Tab title
+            spec: Function returning (chart parameters, figure factory) at render time
+            index: Tab position (appended if None)
+        
+        Returns:
+            The tab widget
+        """
+        tab = QWidget()
+        self.add_chart_scroll_area(tab, QVBoxLayout(tab))
+        self.chart_specs[tab] = spec
+        if index is None:
+            self.chart_tabs.addTab(tab, title)
+        else:
+            self.chart_tabs.insertTab(index, tab, title)
+        return tab
+    
+    def add_chart_scroll_area(self, holder, layout):
+        """Add the scroll area that will hold the canvas of a chart holder"""
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll_content = QWidget()
+        self.chart_layouts[holder] = QVBoxLayout(scroll_content)
+        scroll.setWidget(scroll_content)
+        layout.addWidget(scroll)
+    
+    def add_ranking_chart_tab(self, method):
+        """Add the ranking chart of one method to the charts view"""
+        self.add_chart_tab(method, lambda: (
+            ('ranking', method, hash_data(self.results[method])),
+            lambda: create_ranking_chart(self.results[method], method)
+        ), self.method_tab_index(self.chart_tabs, method))
+    
+    def comparison_results(self):
+        """Results of the methods that produced a ranking, in the order of the selected methods"""
+        return {method: self.results[method] for method in self.methods if self.results.get(method)}
+    
+    def comparison_chart_spec(self):
+        """Chart parameters and factory of the comparison chart"""
+        results = self.comparison_results()
+        return ('comparison', hash_data(results)), lambda: create_comparison_chart(results) if results else None
+    
+    def render_chart(self, holder):
+        """
+        Show the chart of a chart tab or of the comparison view
+        
+        Figures come from the window's figure cache, so a chart is only drawn
+        on the first visit. A canvas is created once per figure and moved when the
+        same chart is shown elsewhere (the comparison chart appears in the
+        charts view and the comparison view). Only the RENDERED_CHARTS most
+        recently shown holders keep their canvases.
+        """
+        if holder not in self.chart_specs:
+            return
+        if holder in self.rendered_charts:
+            self.rendered_charts.move_to_end(holder)
+            return
+        
+        key, factory = self.chart_specs[holder]()
+        figure = self.figure_cache.get(key, factory)
+        if figure is None:
+            return
+        
+        canvas = None
+        for other, (other_key, other_canvas) in list(self.rendered_charts.items()):
+            if other_key == key:
+                # Take the canvas over from the other holder
+                canvas = other_canvas
+                canvas.setParent(None)
+                del self.rendered_charts[other]
+        if canvas is not None and canvas.figure is not figure:
+            # The figure was evicted from the cache and drawn again
+            canvas.deleteLater()
+            canvas = None
+        if canvas is None:
+            canvas = FigureCanvas(figure)
+        self.chart_layouts[holder].addWidget(canvas)
+        self.rendered_charts[holder] = (key, canvas)
+        
+        while len(self.rendered_charts) > RENDERED_CHARTS:
+            self.release_chart(next(iter(self.rendered_charts)))
+    
+    def release_chart(self, holder):
+        """Delete the canvas of a chart holder, the figure stays in the figure cache"""
+        if holder in self.rendered_charts:
+            key, canvas = self.rendered_charts.pop(holder)
+            canvas.setParent(None)
+            canvas.deleteLater()
+    
     def create_comparison_view(self):
         """Create the comparison view"""
         widget = QWidget()
@@ -391,47 +492,42 @@ class ResultsWindow(QMainWindow):
         comparison_layout = QVBoxLayout(comparison_group)
         
         # Create a table comparing results from different methods
-        comparison_table = QTableWidget()
-        
-        if self.results:
-            methods_list = list(self.results.keys())
-            n_alternatives = len(self.results[methods_list[0]]) if methods_list else 0
-            
-            comparison_table.setColumnCount(len(methods_list) + 1)  # +1 for alternative labels
-            comparison_table.setRowCount(n_alternatives)
-            
-            # Set headers
-            headers = ["Alternative"] + methods_list
-            comparison_table.setHorizontalHeaderLabels(headers)
-            
-            # Fill the table
-            for i in range(n_alternatives):
-                # Set alternative label
-                alt_item = QTableWidgetItem(f"A{i+1}")
-                comparison_table.setItem(i, 0, alt_item)
-                
-                # Set results for each method
-                for j, method in enumerate(methods_list):
-                    if i < len(self.results[method]):
-                        rank = self.results[method][i] + 1  # Convert to 1-indexed
-                        item = QTableWidgetItem(str(rank))
-                        comparison_table.setItem(i, j + 1, item)
-        
-        comparison_layout.addWidget(comparison_table)
+        self.comparison_table = QTableView()
+        self.comparison_model = ColumnTableModel(parent=self.comparison_table)
+        self.comparison_table.setModel(self.comparison_model)
+        comparison_layout.addWidget(self.comparison_table)
         layout.addWidget(comparison_group)
         
-        # Add visualization comparing all methods
-        viz_group = QGroupBox("Comparison Visualization")
-        viz_layout = QVBoxLayout(viz_group)
-        
-        fig = create_comparison_chart(self.results)
-        canvas = FigureCanvas(fig)
-        viz_layout.addWidget(canvas)
-        
-        layout.addWidget(viz_group)
+        # Add visualization comparing all methods, rendered when the view is shown
+        self.comparison_viz_group = QGroupBox("Comparison Visualization")
+        self.add_chart_scroll_area(self.comparison_viz_group, QVBoxLayout(self.comparison_viz_group))
+        self.chart_specs[self.comparison_viz_group] = self.comparison_chart_spec
+        layout.addWidget(self.comparison_viz_group)
         
+        self.refresh_comparison()
         return widget
     
+    def refresh_comparison(self):
+        """Fill the comparison table from the current results and redraw visible comparison charts"""
+        results = self.comparison_results()
+        methods_list = list(results)
+        n_alternatives = len(results[methods_list[0]]) if methods_list else 0
+        
+        # Alternative labels and the results of each method, converted to 1-indexed when displayed
+        one_indexed = lambda val: str(val + 1)
+        self.comparison_model.set_columns(
+            [np.arange(n_alternatives)] + [results[method] for method in methods_list],
+            ["Alternative"] + methods_list,
+            [lambda val: f"A{val+1}"] + [one_indexed] * len(methods_list)
+        )
+        self.chart_tabs.setTabVisible(self.chart_tabs.indexOf(self.comparison_chart_tab), len(results) > 1)
+        
+        # The chart key includes the results, so shown charts are stale now
+        for holder in [self.comparison_chart_tab, self.comparison_viz_group]:
+            self.release_chart(holder)
+            if holder.isVisible():
+                self.render_chart(holder)
+    
     def save_report(self):
         """Save a report of the analysis"""
         options = QFileDialog.Options()
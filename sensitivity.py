@@ -0,0 +1,347 @@
+"""
+Sensitivity analysis module
+Contains weight-sweep sensitivity analysis: batches of weight vectors (grid,
+one-at-a-time perturbation or Dirichlet samples) are scored for all of them
+at once with matrix products, and the resulting rankings are summarised into
+rank-stability statistics and weight intervals in which the top alternative
+stays best
+"""
+
+import itertools
+
+import numpy as np
+
+from mcda_methods import NormalizationCache, as_normalization_cache, promethee_flows
+
+
+# Weighted methods that can be scored for a whole batch of weight vectors
+# Method name -> whether higher scores are better
+BATCH_METHODS = {
+    'WSR': True,
+    'TOPSIS': True,
+    'VIKOR': False,
+    'GRA': True,
+    'PROMETHEE': True,
+}
+
+
+def grid_weights(n_crit, steps=10):
+    """
+    All weight vectors on a regular grid over the simplex
+    
+    Args:
+        n_crit: Number of criteria
+        steps: Number of grid steps, every weight is a multiple of 1 / steps
+    
+    Returns:
+        Array of shape (W, n_crit) with rows summing to 1
+    """
+    rows = []
+    # Stars and bars: the positions of n_crit - 1 bars among steps + n_crit - 1 slots
+    for bars in itertools.combinations(range(steps + n_crit - 1), n_crit - 1):
+        edges = np.array((-1,) + bars + (steps + n_crit - 1,))
+        rows.append(np.diff(edges) - 1)
+    return np.array(rows, dtype=float) / steps
+
+
+def oat_weights(weights, criterion, values):
+    """
+    One-at-a-time perturbation of a single criterion weight
+    
+    The weight of the criterion is set to each of the values and the other
+    weights are rescaled proportionally so that every vector sums to 1.
+    
+    Args:
+        weights: Base criteria weights
+        criterion: Index of the perturbed criterion
+        values: Weights to give the criterion (between 0 and 1)
+    
+    Returns:
+        Array of shape (len(values), n_crit)
+    """
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+    values = np.asarray(values, dtype=float)
+    
+    others = weights.copy()
+    others[criterion] = 0.0
+    rest = others.sum()
+    if rest > 0:
+        others /= rest
+    else:
+        # The criterion had all the weight - share the remainder equally
+        others[:] = 1.0 / max(len(weights) - 1, 1)
+        others[criterion] = 0.0
+    
+    batch = np.outer(1.0 - values, others)
+    batch[:, criterion] = values
+    return batch
+
+
+def dirichlet_weights(n_crit, samples=1000, alpha=1.0, seed=None):
+    """
+    Random weight vectors drawn from a Dirichlet distribution
+    
+    Args:
+        n_crit: Number of criteria
+        samples: Number of weight vectors
+        alpha: Concentration, a scalar or one value per criterion (e.g. the
+            base weights times a constant to sample around them)
+        seed: Seed of the random generator
+    
+    Returns:
+        Array of shape (samples, n_crit)
+    """
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (n_crit,))
+    return np.random.default_rng(seed).dirichlet(alpha, size=samples)
+
+
+def batch_scores(matrix, weight_batch, method, preference_functions=None):
+    """
+    Scores of a weighted method for a batch of weight vectors
+    
+    WSR and GRA scores are linear in the weights and come from one
+    (n x k) @ (k x W) product, as do PROMETHEE net flows once the flows of
+    every single criterion are known. With non-negative weights the TOPSIS
+    ideal solutions scale with the weights, so both squared distances are
+    products with the squared weights. VIKOR S is a product, and R is a
+    running maximum of the weighted columns.
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        weight_batch: Weight vectors, array of shape (W, k)
+        method: Method name from BATCH_METHODS
+        preference_functions: Preference function specs for PROMETHEE
+    
+    Returns:
+        Array of shape (n, W) with the score of every alternative for every weight vector
+    """
+    cache = as_normalization_cache(matrix)
+    x = cache.matrix
+    batch = np.atleast_2d(np.asarray(weight_batch, dtype=float)).T  # k x W
+    
+    if method == 'WSR':
+        return x @ batch
+    
+    if method == 'TOPSIS':
+        norm_matrix = cache.normalized('vector')
+        squared = batch ** 2
+        dist_positive = np.sqrt(((norm_matrix - norm_matrix.max(axis=0)) ** 2) @ squared)
+        dist_negative = np.sqrt(((norm_matrix - norm_matrix.min(axis=0)) ** 2) @ squared)
+        return dist_negative / (dist_positive + dist_negative)
+    
+    if method == 'VIKOR':
+        f_best = cache.column_stat('max')
+        f_worst = cache.column_stat('min')
+        diffs = (f_best - x) / (f_best - f_worst + 1e-10)
+        S = diffs @ batch
+        # Running maximum over criteria, so no n x k x W array is built
+        R = np.outer(diffs[:, 0], batch[0])
+        term = np.empty_like(R)
+        for k in range(1, x.shape[1]):
+            np.multiply(diffs[:, k, np.newaxis], batch[k], out=term)
+            np.maximum(R, term, out=R)
+        
+        S_best, S_worst = S.min(axis=0), S.max(axis=0)
+        R_best, R_worst = R.min(axis=0), R.max(axis=0)
+        v = 0.5  # Strategy weight
+        Q = v * (S - S_best) / (S_worst - S_best + 1e-10) + (1 - v) * (R - R_best) / (R_worst - R_best + 1e-10)
+        Q[:, S_best == S_worst] = 0.0
+        return Q
+    
+    if method == 'GRA':
+        normalized_matrix = cache.normalized('minmax', constant=1.0)
+        deviation_matrix = np.abs(normalized_matrix - normalized_matrix.max(axis=0))
+        max_dev = deviation_matrix.max()
+        zeta = 0.5
+        grey_rel_coeff = (deviation_matrix.min() + zeta * max_dev) / (deviation_matrix + zeta * max_dev)
+        return grey_rel_coeff @ batch
+    
+    if method == 'PROMETHEE':
+        # Net flow of every criterion on its own; the weighted net flow is their linear combination
+        n_crit = x.shape[1]
+        criterion_flows = np.empty(x.shape)
+        for k in range(n_crit):
+            criterion_flows[:, k] = promethee_flows(cache, np.eye(n_crit)[k], preference_functions)[2]
+        return criterion_flows @ batch
+    
+    raise ValueError(f"Method {method} does not support batched weights")
+
+
+def batch_positions(scores, higher_is_better=True):
+    """
+    0-based rank position of every alternative for every weight vector
+    
+    Ties are broken as in rank_order.
+    
+    Args:
+        scores: Array of shape (n, W) from batch_scores
+        higher_is_better: Whether higher scores are better
+    
+    Returns:
+        Integer array of shape (n, W)
+    """
+    # Sorting the contiguous rows of the transpose is much faster than strided columns
+    keys = np.ascontiguousarray((-scores if higher_is_better else scores).T)
+    order = np.argsort(keys, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(keys.shape[1])[np.newaxis, :], axis=1)
+    return positions.T
+
+
+def rank_stability(positions, base_positions):
+    """
+    Rank-stability statistics of a batch of rankings
+    
+    Args:
+        positions: Array of shape (n, W) from batch_positions
+        base_positions: Rank positions under the base weights, array of shape (n,)
+    
+    Returns:
+        Dictionary with:
+            'top_frequency': share of weight vectors in which each alternative is best
+            'mean_rank', 'std_rank', 'min_rank', 'max_rank': rank position statistics per alternative
+            'base_top_share': share of weight vectors that keep the base top alternative best
+            'unchanged_share': share of weight vectors that give exactly the base ranking
+            'spearman': Spearman correlation of each ranking with the base ranking
+            'mean_spearman': its mean over the batch
+    """
+    n_alt, n_weights = positions.shape
+    base_positions = np.asarray(base_positions)
+    base_top = int(np.argmin(base_positions))
+    
+    top_frequency = np.bincount(np.argmin(positions, axis=0), minlength=n_alt) / n_weights
+    
+    if n_alt > 1:
+        # Rank positions are permutations, so Spearman's rho has the closed form
+        d_sq = np.sum((positions - base_positions[:, np.newaxis]) ** 2, axis=0)
+        spearman = 1.0 - 6.0 * d_sq / (n_alt * (n_alt ** 2 - 1))
+    else:
+        spearman = np.ones(n_weights)
+    
+    return {
+        'top_frequency': top_frequency,
+        'mean_rank': positions.mean(axis=1),
+        'std_rank': positions.std(axis=1),
+        'min_rank': positions.min(axis=1),
+        'max_rank': positions.max(axis=1),
+        'base_top_share': float(top_frequency[base_top]),
+        'unchanged_share': float(np.mean(np.all(positions == base_positions[:, np.newaxis], axis=0))),
+        'spearman': spearman,
+        'mean_spearman': float(spearman.mean()),
+    }
+
+
+def top_weight_intervals(matrix, weights, method, steps=101, preference_functions=None):
+    """
+    Weight intervals within which the top alternative stays best
+    
+    Each criterion weight is swept one at a time over steps values in [0, 1]
+    (see oat_weights) and the contiguous range around the base weight where
+    the base top alternative keeps the first place is reported. Boundaries
+    are accurate to the sweep resolution 1 / (steps - 1).
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria) or NormalizationCache
+        weights: Base criteria weights
+        method: Method name from BATCH_METHODS
+        steps: Number of weight values per criterion
+        preference_functions: Preference function specs for PROMETHEE
+    
+    Returns:
+        List with a (low, high) tuple of the criterion weight per criterion
+    """
+    cache = as_normalization_cache(matrix)
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+    higher_is_better = BATCH_METHODS[method]
+    
+    base_scores = batch_scores(cache, weights, method, preference_functions)[:, 0]
+    top = int(np.argmin(batch_positions(base_scores[:, np.newaxis], higher_is_better)[:, 0]))
+    
+    values = np.linspace(0.0, 1.0, steps)
+    intervals = []
+    for criterion in range(len(weights)):
+        # The base weight is swept too, so the interval always contains it
+        sweep = np.union1d(values, weights[criterion])
+        scores = batch_scores(cache, oat_weights(weights, criterion, sweep), method, preference_functions)
+        stays = batch_positions(scores, higher_is_better)[top] == 0
+        
+        base = int(np.searchsorted(sweep, weights[criterion]))
+        if not stays[base]:
+            # Only possible with ties, where the base top is decided by index
+            intervals.append((float(weights[criterion]), float(weights[criterion])))
+            continue
+        lost = np.flatnonzero(~stays)
+        below = lost[lost < base]
+        above = lost[lost > base]
+        low = sweep[below[-1] + 1] if len(below) else sweep[0]
+        high = sweep[above[0] - 1] if len(above) else sweep[-1]
+        intervals.append((float(low), float(high)))
+    return intervals
+
+
+def sensitivity_analysis(matrix, weights, methods=None, weight_batch=None, mode='dirichlet',
+                         samples=1000, steps=10, seed=None, interval_steps=101,
+                         preference_functions=None):
+    """
+    Weight-sweep sensitivity analysis of the weighted methods
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria)
+        weights: Base criteria weights
+        methods: Method names from BATCH_METHODS (all if None)
+        weight_batch: Weight vectors to evaluate, array of shape (W, k)
+            (generated according to mode if None)
+        mode: 'dirichlet' (samples around the base weights), 'grid'
+            (grid_weights with the given steps) or 'oat' (every criterion
+            swept one at a time over steps + 1 values)
+        samples: Number of Dirichlet samples
+        steps: Grid or one-at-a-time resolution
+        seed: Seed of the random generator
+        interval_steps: Resolution of the top alternative weight intervals
+            (intervals are skipped if None)
+        preference_functions: Preference function specs for PROMETHEE
+    
+    Returns:
+        Dictionary mapping each method to a dictionary with 'base_ranking',
+        'positions' (n x W), the rank_stability statistics and
+        'top_intervals' (see top_weight_intervals)
+    """
+    cache = NormalizationCache(matrix)
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+    n_crit = len(weights)
+    methods = list(methods) if methods is not None else list(BATCH_METHODS)
+    
+    if weight_batch is None:
+        if mode == 'dirichlet':
+            # Concentration n_crit * 10 keeps the samples around the base weights
+            weight_batch = dirichlet_weights(n_crit, samples, np.maximum(weights, 1e-3) * n_crit * 10, seed)
+        elif mode == 'grid':
+            weight_batch = grid_weights(n_crit, steps)
+        elif mode == 'oat':
+            values = np.linspace(0.0, 1.0, steps + 1)
+            weight_batch = np.vstack([oat_weights(weights, k, values) for k in range(n_crit)])
+        else:
+            raise ValueError(f"Unknown weight sweep mode: {mode}")
+    weight_batch = np.atleast_2d(np.asarray(weight_batch, dtype=float))
+    
+    results = {}
+    for method in methods:
+        if method not in BATCH_METHODS:
+            raise ValueError(f"Method {method} does not support batched weights")
+        higher_is_better = BATCH_METHODS[method]
+        
+        base_positions = batch_positions(
+            batch_scores(cache, weights, method, preference_functions), higher_is_better)[:, 0]
+        positions = batch_positions(
+            batch_scores(cache, weight_batch, method, preference_functions), higher_is_better)
+        
+        result = {'base_ranking': np.argsort(base_positions), 'positions': positions}
+        result.update(rank_stability(positions, base_positions))
+        if interval_steps is not None:
+            result['top_intervals'] = top_weight_intervals(
+                cache, weights, method, interval_steps, preference_functions)
+        results[method] = result
+    return results
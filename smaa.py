@@ -0,0 +1,235 @@
+"""
+SMAA module
+Contains Stochastic Multicriteria Acceptability Analysis: rank acceptability
+indices and central weight vectors of the weighted MCDA methods under
+uncertain weights and noisy criterion values, estimated by Monte Carlo
+sampling sharded across a process pool
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from sensitivity import BATCH_METHODS, batch_positions, batch_scores
+from utils import attach_shared_array, share_array
+
+
+# Samples scored together with one matrix product
+SMAA_BATCH_SAMPLES = 1000
+
+# Samples per task sent to a worker process
+SMAA_CHUNK_SAMPLES = 50000
+
+
+def _sample_chunk(matrix, method, samples, seed, alpha, noise, batch_size, preference_functions):
+    """
+    Draw and score one chunk of samples
+    
+    Every batch draws one noisy matrix and batch_size weight vectors, which
+    are scored together by batch_scores.
+    
+    Returns:
+        Tuple of (rank counts n x n, first-rank weight sums n x k, samples drawn,
+        batch statistics), the batch statistics being (sum of squared per-batch
+        rank counts, sum of per-batch rank counts times batch size, number of
+        batches, sum of squared batch sizes) with noise and None without
+    """
+    n_alt, n_crit = matrix.shape
+    rng = np.random.default_rng(seed)
+    higher_is_better = BATCH_METHODS[method]
+    rows = np.arange(n_alt)[:, np.newaxis] * n_alt
+    
+    rank_counts = np.zeros(n_alt * n_alt, dtype=np.int64)
+    central_sums = np.zeros((n_alt, n_crit))
+    if noise is not None:
+        counts_sq = np.zeros(n_alt * n_alt)
+        counts_cross = np.zeros(n_alt * n_alt)
+        sizes_sq = 0
+    n_batches = 0
+    done = 0
+    while done < samples:
+        size = min(batch_size, samples - done)
+        if noise is not None:
+            values = matrix * (1.0 + noise * rng.standard_normal(matrix.shape))
+        else:
+            values = matrix
+        weights = rng.dirichlet(alpha, size=size)
+        
+        positions = batch_positions(batch_scores(values, weights, method, preference_functions),
+                                    higher_is_better)
+        counts = np.bincount((rows + positions).ravel(), minlength=n_alt * n_alt)
+        rank_counts += counts
+        if noise is not None:
+            counts_sq += counts.astype(float) ** 2
+            counts_cross += counts * float(size)
+            sizes_sq += size * size
+        first = np.argmin(positions, axis=0)
+        for k in range(n_crit):
+            central_sums[:, k] += np.bincount(first, weights=weights[:, k], minlength=n_alt)
+        done += size
+        n_batches += 1
+    
+    batch_stats = None
+    if noise is not None:
+        batch_stats = (counts_sq.reshape(n_alt, n_alt), counts_cross.reshape(n_alt, n_alt), n_batches, sizes_sq)
+    return rank_counts.reshape(n_alt, n_alt), central_sums, done, batch_stats
+
+
+def _sample_shared_chunk(name, shape, *args):
+    """Worker entry point: _sample_chunk on a matrix in shared memory"""
+    return _sample_chunk(attach_shared_array(name, shape), *args)
+
+
+def smaa(matrix, method='TOPSIS', weights=None, samples=1000000, noise=None, concentration=None,
+         tolerance=None, workers=None, batch_size=SMAA_BATCH_SAMPLES, chunk_samples=SMAA_CHUNK_SAMPLES,
+         seed=None, preference_functions=None):
+    """
+    Stochastic Multicriteria Acceptability Analysis of a weighted method
+    
+    Samples are split into chunks that worker processes draw and score in
+    vectorized batches; the decision matrix is passed to them through a
+    shared-memory block. Every worker returns histograms of rank positions
+    and sums of the weight vectors that put each alternative first, which
+    are merged as chunks finish. With a tolerance, sampling stops as soon as
+    the largest standard error of the acceptability indices falls below it
+    and the remaining chunks are cancelled.
+    
+    Criterion values are perturbed once per batch, so batch_size trades
+    independence of the matrix draws for speed (1 gives fully independent draws).
+    With noise the standard error is therefore estimated from the spread of
+    the per-batch acceptability estimates (batch means), not from the number
+    of samples.
+    
+    Args:
+        matrix: Decision matrix (alternatives x criteria)
+        method: Method name from sensitivity.BATCH_METHODS
+        weights: Base criteria weights; weights are drawn uniformly from the
+            simplex if None, otherwise from a Dirichlet distribution around them
+        samples: Maximum number of samples
+        noise: Relative standard deviation of Gaussian noise on the criterion
+            values, a scalar or one value per criterion (exact values if None)
+        concentration: Dirichlet concentration around the base weights
+            (n_crit * 10 if None)
+        tolerance: Stop once the largest standard error is below this value
+            (all samples are drawn if None)
+        workers: Number of worker processes (os.cpu_count() if None, 0 runs
+            in the calling process)
+        batch_size: Samples scored together with one matrix product
+        chunk_samples: Samples per worker task, also the early stopping check interval
+        seed: Seed of the random generator
+        preference_functions: Preference function specs for PROMETHEE
+    
+    Returns:
+        Dictionary with:
+            'acceptability': n x n array, share of samples placing alternative i at rank r
+            'central_weights': n x k array, mean weight vector of the samples
+                where the alternative is best (NaN if it never is)
+            'samples': number of samples drawn
+            'standard_error': largest standard error of the acceptability indices
+                (inf with noise and fewer than two batches)
+            'converged': whether the tolerance was reached
+    """
+    if method not in BATCH_METHODS:
+        raise ValueError(f"Method {method} does not support batched weights")
+    matrix = np.ascontiguousarray(matrix, dtype=float)
+    n_alt, n_crit = matrix.shape
+    
+    if weights is None:
+        alpha = np.ones(n_crit)
+    else:
+        weights = np.asarray(weights, dtype=float)
+        if concentration is None:
+            concentration = n_crit * 10
+        alpha = np.maximum(weights / weights.sum(), 1e-3) * concentration
+    if noise is not None:
+        noise = np.broadcast_to(np.asarray(noise, dtype=float), (n_crit,))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    chunks = [min(chunk_samples, samples - start) for start in range(0, samples, chunk_samples)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    params = (alpha, noise, batch_size, preference_functions)
+    
+    rank_counts = np.zeros((n_alt, n_alt), dtype=np.int64)
+    central_sums = np.zeros((n_alt, n_crit))
+    drawn = 0
+    # Noisy samples are independent only between batches: sums over batches b of
+    # c_b^2 and c_b * m_b (c_b rank counts, m_b batch size), of m_b^2 and the batch count
+    counts_sq = np.zeros((n_alt, n_alt))
+    counts_cross = np.zeros((n_alt, n_alt))
+    n_batches = 0
+    sizes_sq = 0
+    
+    def merge(result):
+        nonlocal rank_counts, central_sums, drawn, counts_sq, counts_cross, n_batches, sizes_sq
+        rank_counts += result[0]
+        central_sums += result[1]
+        drawn += result[2]
+        if result[3] is not None:
+            counts_sq += result[3][0]
+            counts_cross += result[3][1]
+            n_batches += result[3][2]
+            sizes_sq += result[3][3]
+    
+    def standard_error():
+        p = rank_counts / max(drawn, 1)
+        if noise is None:
+            return float(np.sqrt(np.max(p * (1 - p)) / max(drawn, 1)))
+        if n_batches < 2:
+            return float('inf')
+        # Batch means estimate of the ratio p = sum(c_b) / sum(m_b): the samples of a
+        # batch share one noisy matrix, so the batches are the independent draws
+        residual_sq = counts_sq - 2 * p * counts_cross + p * p * sizes_sq
+        mean_size = drawn / n_batches
+        return float(np.sqrt(max(np.max(residual_sq), 0.0) / (n_batches * (n_batches - 1))) / mean_size)
+    
+    converged = False
+    if workers == 0:
+        for size, chunk_seed in zip(chunks, seeds):
+            merge(_sample_chunk(matrix, method, size, chunk_seed, *params))
+            if tolerance is not None and standard_error() < tolerance:
+                converged = True
+                break
+    else:
+        block = share_array(matrix)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                tasks = iter(zip(chunks, seeds))
+                pending = set()
+                
+                def submit():
+                    # Keep two chunks per worker in flight so no worker idles between merges
+                    for size, chunk_seed in tasks:
+                        pending.add(executor.submit(_sample_shared_chunk, block.name, matrix.shape,
+                                                    method, size, chunk_seed, *params))
+                        if len(pending) >= 2 * workers:
+                            break
+                
+                submit()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.discard(future)
+                        merge(future.result())
+                    if tolerance is not None and standard_error() < tolerance:
+                        converged = True
+                        for future in pending:
+                            future.cancel()
+                        break
+                    submit()
+        finally:
+            block.close()
+            block.unlink()
+    
+    counts = rank_counts.sum(axis=1)[:, np.newaxis]
+    first = rank_counts[:, :1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        central_weights = np.where(first > 0, central_sums / first, np.nan)
+    return {
+        'acceptability': rank_counts / np.where(counts > 0, counts, 1),
+        'central_weights': central_weights,
+        'samples': drawn,
+        'standard_error': standard_error(),
+        'converged': converged,
+    }
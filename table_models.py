@@ -0,0 +1,233 @@
+"""
+Table Models module
+Contains Qt item models over NumPy arrays and pandas DataFrames, so table
+views only format the cells that are visible instead of creating one
+QTableWidgetItem per cell
+"""
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+def format_value(value):
+    """Text shown for a cell value (empty for missing values)"""
+    if value is None or (isinstance(value, (float, np.floating)) and np.isnan(value)):
+        return ""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return str(value)
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """
+    Table model over a 2D float NumPy array
+    
+    The array is the model's storage: views read cells from it on demand and
+    edits are parsed and written straight into it, so the whole matrix is
+    available through array() without reading the view. Empty cells are NaN.
+    """
+    
+    def __init__(self, array=None, headers=None, editable=True, parent=None):
+        """
+        Args:
+            array: Decision matrix (alternatives x criteria), copied to float
+            headers: Column headers ('Criterion 1', 'Criterion 2', ... if None)
+            editable: Whether cells can be edited in the view
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.editable = editable
+        self._array = np.zeros((0, 0))
+        self._headers = []
+        self.set_array(array if array is not None else np.zeros((0, 0)), headers)
+    
+    def set_array(self, array, headers=None):
+        """
+        Replace the whole matrix
+        
+        Args:
+            array: New matrix, copied to a float array
+            headers: Column headers ('Criterion N' if None)
+        """
+        self.beginResetModel()
+        self._array = np.array(array, dtype=float)
+        if self._array.ndim != 2:
+            self._array = self._array.reshape(len(self._array), -1) if self._array.size else np.zeros((0, 0))
+        n_cols = self._array.shape[1]
+        self._headers = list(headers) if headers is not None else [f"Criterion {i+1}" for i in range(n_cols)]
+        self.endResetModel()
+    
+    def array(self):
+        """The backing matrix (shared, changes with edits in the view)"""
+        return self._array
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._array.shape[0]
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._array.shape[1]
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return format_value(float(self._array[index.row(), index.column()]))
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        text = str(value).strip()
+        try:
+            number = float(text) if text else np.nan
+        except ValueError:
+            return False
+        self._array[index.row(), index.column()] = number
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.editable and index.isValid():
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._headers):
+            return str(self._headers[section])
+        return super().headerData(section, orientation, role)
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """
+    Read-only table model over equally long columns
+    
+    Every column is an array (or list) with an optional formatter applied to
+    a value only when its cell is displayed, e.g. to show alternative indices
+    as 'A1', 'A2', ...
+    """
+    
+    def __init__(self, columns=None, headers=None, formatters=None, parent=None):
+        """
+        Args:
+            columns: List of columns
+            headers: Column headers
+            formatters: Functions turning a column value into text (format_value if None)
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._columns = []
+        self._headers = []
+        self._formatters = []
+        self.set_columns(columns or [], headers, formatters)
+    
+    def set_columns(self, columns, headers=None, formatters=None):
+        """Replace all columns"""
+        self.beginResetModel()
+        self._columns = list(columns)
+        self._headers = list(headers) if headers is not None else [str(i + 1) for i in range(len(self._columns))]
+        self._formatters = list(formatters) if formatters is not None else [None] * len(self._columns)
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or not self._columns:
+            return 0
+        return max(len(column) for column in self._columns)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        column = self._columns[index.column()]
+        if index.row() >= len(column):
+            return None
+        formatter = self._formatters[index.column()] or format_value
+        return formatter(column[index.row()])
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._headers):
+            return str(self._headers[section])
+        return super().headerData(section, orientation, role)
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Table model over a pandas DataFrame, used for import previews
+    
+    Cells are read from the column arrays of the DataFrame on demand. Edits
+    are written into the DataFrame, converted to the column's type when it
+    is numeric, so dataframe() returns the corrected data.
+    """
+    
+    def __init__(self, df=None, editable=True, parent=None):
+        """
+        Args:
+            df: DataFrame to show (not copied)
+            editable: Whether cells can be edited in the view
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.editable = editable
+        self._df = pd.DataFrame()
+        self._values = []
+        self.set_dataframe(df if df is not None else pd.DataFrame())
+    
+    def set_dataframe(self, df):
+        """Replace the DataFrame"""
+        self.beginResetModel()
+        self._df = df
+        # Column arrays are fetched once, so a cell lookup does not go through pandas indexing
+        self._values = [df.iloc[:, j].to_numpy() for j in range(df.shape[1])]
+        self.endResetModel()
+    
+    def dataframe(self):
+        """The DataFrame including the edits made in the view"""
+        return self._df
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._df.shape[0]
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._df.shape[1]
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        value = self._values[index.column()][index.row()]
+        return "" if pd.isna(value) else format_value(value)
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        row, col = index.row(), index.column()
+        text = str(value).strip()
+        dtype = self._df.dtypes.iloc[col]
+        if pd.api.types.is_numeric_dtype(dtype):
+            try:
+                value = float(text) if text else np.nan
+            except ValueError:
+                return False
+            if pd.api.types.is_integer_dtype(dtype):
+                if value.is_integer():
+                    value = int(value)
+                else:
+                    # Fractional or missing value in an integer column
+                    self._df.isetitem(col, self._df.iloc[:, col].astype(float))
+        else:
+            value = text if text else None
+        self._df.iat[row, col] = value
+        self._values[col] = self._df.iloc[:, col].to_numpy()
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.editable and index.isValid():
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < self._df.shape[1]:
+            return str(self._df.columns[section])
+        return super().headerData(section, orientation, role)
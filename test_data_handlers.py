@@ -0,0 +1,383 @@
+"""
+Тестовый файл для проверки загрузки и сохранения данных
+"""
+import os
+import sys
+import tempfile
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from data_handlers import (
+    DataManager, clean_data_matrix, coerce_numeric, collect_blocks, count_lines, csv_width, metadata_path
+)
+from mcda_methods import METHODS, perform_analysis, perform_analysis_results
+
+
+def test_streaming_csv_loader():
+    """Проверяет потоковую загрузку CSV блоками в массив float64"""
+    print("=== Тестирование потоковой загрузки CSV ===")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("1,2,3\n4,,6\n7,abc,9\n10,11,12")
+        assert count_lines(path) == 4
+        
+        manager = DataManager()
+        assert manager.load_from_file(path)
+        assert manager.data.dtype == np.float64
+        assert manager.data.tolist() == [[1, 2, 3], [4, 0, 6], [7, 0, 9], [10, 11, 12]]
+        assert manager.original_data is manager.data
+        
+        blocks = list(manager.iter_blocks(path, block_rows=3, missing='nan'))
+        assert [len(block) for block in blocks] == [3, 1]
+        assert np.isnan(blocks[0][1, 1]) and np.isnan(blocks[0][2, 1])
+        
+        # Пропуски сохраняются как NaN и заполняются при очистке
+        assert manager.load_from_file(path, missing='nan')
+        assert manager.validate_data()['has_missing_values']
+        assert manager.clean_data('fill_mean')
+        assert manager.data[1, 1] == 6.5
+        
+        manager.save_to_file(os.path.join(tmp, "copy.csv"))
+        copy = DataManager()
+        assert copy.load_from_file(os.path.join(tmp, "copy.csv"))
+        assert np.array_equal(copy.data, manager.data)
+    print("CSV загружен блоками, пропуски обработаны")
+
+
+def test_ragged_csv_rows():
+    """Проверяет загрузку CSV со строками разной длины"""
+    print("\n=== Тестирование CSV со строками разной длины ===")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ragged.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("1,2\n3,4\n\n5,6,7\n8\n9,10")
+        
+        manager = DataManager()
+        assert manager.load_from_file(path, missing='nan')
+        assert manager.data.shape == (5, 3)
+        assert np.array_equal(manager.data, [[1, 2, np.nan], [3, 4, np.nan], [5, 6, 7],
+                                             [8, np.nan, np.nan], [9, 10, np.nan]], equal_nan=True)
+        
+        # Длинная строка во втором блоке не обрезается
+        blocks = list(manager.iter_blocks(path, block_rows=2))
+        assert [block.shape for block in blocks] == [(2, 3), (2, 3), (1, 3)]
+        assert np.array_equal(collect_blocks(iter(blocks)), np.nan_to_num(manager.data))
+        assert csv_width(path, chunk_size=3) == 3
+        
+        # Файлы с кавычками читаются модулем csv
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('"1",2\n3,4,5\n')
+        assert csv_width(path) is None
+        assert manager.load_from_file(path)
+        assert manager.data.tolist() == [[1, 2, 0], [3, 4, 5]]
+    print(f"Загружена матрица {manager.data.shape}")
+
+
+def test_collect_blocks_growth():
+    """Проверяет сборку блоков при неверной оценке числа строк"""
+    print("\n=== Тестирование сборки блоков ===")
+    
+    blocks = [np.full((5, 2), i, dtype=float) for i in range(4)]
+    matrix = collect_blocks(iter(blocks), expected_rows=3)
+    assert matrix.shape == (20, 2)
+    assert matrix[:, 0].tolist() == np.repeat(np.arange(4), 5).tolist()
+    assert collect_blocks(iter(blocks), expected_rows=100).shape == (20, 2)
+    
+    # Списки по-прежнему очищаются в списки
+    assert clean_data_matrix([[1.0, float('nan')], [3.0, 4.0]], 'remove_rows') == [[3.0, 4.0]]
+    print(f"Собрана матрица {matrix.shape}")
+
+
+def test_npy_memmap_format():
+    """Проверяет собственный формат .npy с отображением в память и метаданными"""
+    print("\n=== Тестирование формата .npy ===")
+    
+    matrix = np.random.default_rng(5).random((50, 3))
+    weights = [0.5, 0.3, 0.2]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.npy")
+        manager = DataManager()
+        manager.data = matrix
+        manager.metadata = {'criteria_names': ['Цена', 'Качество', 'Срок'], 'directions': ['cost', 'max', 'min']}
+        assert manager.save_to_file(path)
+        assert os.path.exists(metadata_path(path))
+        
+        loaded = DataManager()
+        assert loaded.load_from_file(path)
+        assert isinstance(loaded.data, np.memmap)
+        assert not loaded.data.flags.writeable
+        assert np.array_equal(loaded.data, matrix)
+        assert loaded.metadata['criteria_names'] == ['Цена', 'Качество', 'Срок']
+        assert loaded.metadata['directions'] == ['cost', 'max', 'min']
+        
+        # Методы работают с отображенной матрицей только на чтение
+        assert perform_analysis(loaded.data, list(METHODS), weights) == perform_analysis(matrix, list(METHODS), weights)
+        
+        # Сохранение поверх отображенного файла не портит ни файл, ни загруженные данные
+        assert loaded.save_to_file(path)
+        assert np.array_equal(loaded.data, matrix)
+        reloaded = DataManager()
+        assert reloaded.load_from_file(path)
+        assert np.array_equal(reloaded.data, matrix)
+        assert reloaded.metadata['criteria_names'] == ['Цена', 'Качество', 'Срок']
+        assert sorted(os.listdir(tmp)) == ['matrix.npy', 'matrix.npy.json']
+        del loaded, reloaded
+    print("Матрица отображена в память, метаданные восстановлены")
+
+
+def test_columnar_formats():
+    """Проверяет форматы Parquet и Arrow с выбором столбцов и фильтрами"""
+    print("\n=== Тестирование форматов Parquet и Arrow ===")
+    
+    try:
+        import pyarrow
+    except ImportError:
+        print("pyarrow не установлен, тест пропущен")
+        return
+    
+    matrix = np.arange(30, dtype=float).reshape(10, 3)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ["matrix.parquet", "matrix.arrow"]:
+            path = os.path.join(tmp, name)
+            manager = DataManager()
+            manager.data = matrix
+            manager.metadata = {'criteria_names': ['a', 'b', 'c']}
+            assert manager.save_to_file(path)
+            
+            loaded = DataManager()
+            assert loaded.load_from_file(path)
+            assert np.array_equal(loaded.data, matrix)
+            assert loaded.metadata['criteria_names'] == ['a', 'b', 'c']
+            
+            # Читаются только выбранные критерии и подходящие строки
+            assert loaded.load_from_file(path, columns=['c', 'a'], filters=[('b', '>=', 16)])
+            assert loaded.data.tolist() == matrix[5:, [2, 0]].tolist()
+            assert loaded.metadata['criteria_names'] == ['c', 'a']
+            print(f"{name}: прочитано {loaded.data.shape}")
+
+
+def test_metadata_reset_between_files():
+    """Проверяет, что имена критериев предыдущего файла не переносятся на следующий"""
+    print("\n=== Тестирование сброса метаданных при загрузке ===")
+    
+    import json
+    import sqlite3
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "wide.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"a": [1, 2], "b": [3, 4], "c": [5, 6], "d": [7, 8]}, f)
+        csv_path = os.path.join(tmp, "narrow.csv")
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("1,2\n3,4\n5,6")
+        
+        manager = DataManager()
+        assert manager.load_from_file(json_path)
+        assert manager.metadata['criteria_names'] == ['a', 'b', 'c', 'd']
+        assert manager.load_from_file(csv_path)
+        assert 'criteria_names' not in manager.metadata
+        
+        # Имена, не совпадающие по числу со столбцами, заменяются сгенерированными
+        manager.metadata['criteria_names'] = ['a', 'b', 'c', 'd']
+        db_path = os.path.join(tmp, "narrow.db")
+        assert manager.save_to_file(db_path)
+        conn = sqlite3.connect(db_path)
+        names = [row[1] for row in conn.execute("PRAGMA table_info(data_matrix)")]
+        conn.close()
+        assert names == ['col_0', 'col_1']
+        
+        try:
+            import pyarrow
+        except ImportError:
+            print("pyarrow не установлен, Parquet пропущен")
+            return
+        parquet_path = os.path.join(tmp, "narrow.parquet")
+        assert manager.save_to_file(parquet_path)
+        loaded = DataManager()
+        assert loaded.load_from_file(parquet_path)
+        assert np.array_equal(loaded.data, manager.data)
+    print("Метаданные сброшены, сохранены все столбцы")
+
+
+def test_numeric_coercion_mask():
+    """Проверяет общее векторное преобразование в числа с маской нечисловых ячеек"""
+    print("\n=== Тестирование преобразования в числа ===")
+    
+    matrix, mask = coerce_numeric([[1, '2.5', 'x'], [None, 4, '1e3'], [7]])
+    assert np.array_equal(mask, [[False, False, True], [True, False, False], [False, True, True]])
+    assert matrix[0, 1] == 2.5 and matrix[1, 2] == 1000.0
+    
+    rows = [["1", "abc", "3"], ["4", "5", ""]]
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "matrix.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write('[[1, "abc", 3], [4, 5, null]]')
+        xml_path = os.path.join(tmp, "matrix.xml")
+        with open(xml_path, 'w', encoding='utf-8') as f:
+            f.write("<data>" + "".join(
+                "<row>" + "".join(f"<value>{cell}</value>" for cell in row) + "</row>" for row in rows
+            ) + "</data>")
+        
+        for path in [json_path, xml_path]:
+            manager = DataManager()
+            assert manager.load_from_file(path)
+            assert manager.data.tolist() == [[1, 0, 3], [4, 5, 0]]
+            assert manager.non_numeric_mask.tolist() == [[False, True, False], [False, False, True]]
+    print("Нечисловые ячейки отмечены в маске")
+
+
+def test_streaming_xml():
+    """Проверяет потоковое чтение и запись XML"""
+    print("\n=== Тестирование потокового XML ===")
+    
+    matrix = np.random.default_rng(9).random((25, 4))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.xml")
+        manager = DataManager()
+        manager.data = matrix
+        assert manager.save_to_file(path)
+        
+        # Файл остается совместимым с разбором всего дерева
+        import xml.etree.ElementTree as ET
+        root = ET.parse(path).getroot()
+        assert len(root) == 25 and root[3].get('id') == '3' and len(root[3]) == 4
+        
+        blocks = list(manager.iter_blocks(path, block_rows=10))
+        assert [len(block) for block in blocks] == [10, 10, 5]
+        
+        loaded = DataManager()
+        assert loaded.load_from_file(path)
+        assert np.array_equal(loaded.data, matrix)
+        assert not loaded.non_numeric_mask.any()
+    print(f"XML прочитан блоками: {[len(block) for block in blocks]}")
+
+
+def test_streaming_json():
+    """Проверяет потоковую загрузку JSON Lines и массивов JSON с записями"""
+    print("\n=== Тестирование потокового JSON ===")
+    
+    matrix = np.random.default_rng(4).random((30, 3))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ["matrix.json", "matrix.jsonl"]:
+            path = os.path.join(tmp, name)
+            manager = DataManager()
+            manager.data = matrix
+            assert manager.save_to_file(path)
+            loaded = DataManager()
+            assert loaded.load_from_file(path)
+            assert np.array_equal(loaded.data, matrix)
+        
+        # Ключи записей становятся критериями, отсутствующие значения отмечаются в маске
+        path = os.path.join(tmp, "records.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"цена": 10, "качество": "8"}\n\n{"качество": 7, "срок": "нет"}\n')
+        loaded = DataManager()
+        assert loaded.load_from_file(path)
+        assert loaded.metadata['criteria_names'] == ['цена', 'качество', 'срок']
+        assert loaded.data.tolist() == [[10, 8, 0], [0, 7, 0]]
+        assert loaded.non_numeric_mask.tolist() == [[False, False, True], [True, False, True]]
+        
+        path = os.path.join(tmp, "columns.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"a": [1, 2], "b": [3, 4]}')
+        assert loaded.load_from_file(path)
+        assert loaded.data.tolist() == [[1, 3], [2, 4]]
+    print("JSON Lines и массивы JSON загружены")
+
+
+def test_sqlite_reader():
+    """Проверяет чтение SQLite с выбором таблицы, запроса и столбцов"""
+    print("\n=== Тестирование чтения SQLite ===")
+    
+    import sqlite3
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE names (id INTEGER, name TEXT)")
+        conn.execute("CREATE TABLE scores (id INTEGER, \"цена\" REAL, quality REAL, note TEXT)")
+        conn.executemany("INSERT INTO scores VALUES (?, ?, ?, ?)",
+                         [(i, i * 10.0, i / 2, 'текст') for i in range(7)])
+        conn.commit()
+        conn.close()
+        
+        progress = []
+        manager = DataManager()
+        assert manager.load_from_file(path, table='scores', columns=['цена', 'quality'],
+                                      progress_callback=lambda done, total: progress.append((done, total)))
+        assert manager.data.tolist() == [[i * 10.0, i / 2] for i in range(7)]
+        assert manager.metadata['criteria_names'] == ['цена', 'quality']
+        assert manager.metadata['row_count'] == 7
+        assert progress[0] == (0, 7) and progress[-1] == (7, 7)
+        
+        assert manager.load_from_file(path, query="SELECT quality FROM scores WHERE id > 4;")
+        assert manager.data.tolist() == [[2.5], [3.0]]
+        
+        # Соединение только для чтения не может изменить базу
+        assert manager.load_from_file(path, query="DELETE FROM scores") is False
+        assert manager.load_from_file(path, table='scores')
+        assert manager.data.shape == (7, 4) and manager.non_numeric_mask[:, 3].all()
+    print(f"Прочитано строк: {progress[-1][0]}")
+
+
+def test_sqlite_bulk_writer():
+    """Проверяет пакетную запись SQLite и сохранение результатов анализа"""
+    print("\n=== Тестирование пакетной записи SQLite ===")
+    
+    import sqlite3
+    
+    matrix = np.random.default_rng(8).random((40, 3))
+    weights = [0.2, 0.3, 0.5]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.db")
+        manager = DataManager()
+        manager.data = matrix
+        assert manager.save_to_file(path, journal_mode='WAL', synchronous='NORMAL', index_columns=['col_0'])
+        assert manager.save_to_file(path, journal_mode='нет') is False
+        
+        results = perform_analysis_results(matrix, ['TOPSIS', 'VIKOR'], weights, top_k=3)
+        assert manager.save_results(path, results)
+        assert manager.save_results(path, results)  # Повторная запись заменяет строки
+        
+        loaded = DataManager()
+        assert loaded.load_from_file(path)
+        assert np.array_equal(loaded.data, matrix)
+        
+        conn = sqlite3.connect(path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='index'").fetchone()[0] == 1
+        rows = conn.execute("SELECT alternative, score FROM analysis_results "
+                            "WHERE method = 'TOPSIS' AND rank IS NOT NULL ORDER BY rank").fetchall()
+        conn.close()
+        assert [row[0] for row in rows] == results['TOPSIS'].tolist()
+        assert np.isclose(rows[0][1], results['TOPSIS'].scores[rows[0][0]])
+        
+        # Список top_k короче числа альтернатив, строки пишутся только для ранжированных
+        rankings = perform_analysis(matrix, ['WSR'], weights, top_k=5)
+        assert manager.save_results(path, rankings)
+        conn = sqlite3.connect(path)
+        ranked = conn.execute("SELECT alternative, rank FROM analysis_results "
+                              "WHERE method = 'WSR' ORDER BY rank").fetchall()
+        conn.close()
+        assert ranked == [(alternative, position) for position, alternative in enumerate(rankings['WSR'])]
+    print(f"Лучшие альтернативы TOPSIS из базы: {[row[0] for row in rows]}")
+
+
+if __name__ == "__main__":
+    test_streaming_csv_loader()
+    test_ragged_csv_rows()
+    test_collect_blocks_growth()
+    test_npy_memmap_format()
+    test_columnar_formats()
+    test_metadata_reset_between_files()
+    test_numeric_coercion_mask()
+    test_streaming_xml()
+    test_streaming_json()
+    test_sqlite_reader()
+    test_sqlite_bulk_writer()
+    
+    print("\n=== Все тесты загрузки данных пройдены ===")
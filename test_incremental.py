@@ -0,0 +1,62 @@
+"""
+Тестовый файл для проверки инкрементального пересчета рейтингов
+"""
+import sys
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from incremental import INCREMENTAL_METHODS, IncrementalAnalysis, SortedRanking
+from mcda_methods import perform_analysis_results
+
+
+def test_incremental_matches_full_recompute():
+    """Проверяет, что правки ячеек и строк дают те же оценки, что и полный пересчет"""
+    print("=== Тестирование инкрементального анализа ===")
+    
+    rng = np.random.default_rng(12)
+    matrix = rng.random((60, 4))
+    weights = [0.4, 0.3, 0.2, 0.1]
+    session = IncrementalAnalysis(matrix, weights)
+    
+    for step in range(200):
+        row, col = rng.integers(60), rng.integers(4)
+        # Иногда записываем новые минимумы и максимумы столбцов, иногда возвращаем их внутрь
+        value = rng.choice([rng.random(), -rng.random(), 1 + rng.random(), 0.5])
+        if step % 25 == 0:
+            session.update_row(row, rng.random(4))
+        else:
+            session.update_cell(row, col, value)
+    
+    expected = perform_analysis_results(session.matrix, list(INCREMENTAL_METHODS), weights, cache=False)
+    for method, result in expected.items():
+        assert np.allclose(session.scores(method), result.scores), method
+        assert session.ranking(method) == result.tolist(), method
+        best = session.ranking(method)[0]
+        assert session.rank_of(method, best) == 0
+    assert np.allclose(session.mins, session.matrix.min(axis=0))
+    assert np.allclose(session.maxs, session.matrix.max(axis=0))
+    print(f"Лучшие 5 по WSR после правок: {session.ranking('WSR', top_k=5)}")
+
+
+def test_sorted_ranking():
+    """Проверяет перемещение альтернатив в упорядоченной структуре"""
+    print("\n=== Тестирование упорядоченного рейтинга ===")
+    
+    scores = np.array([5.0, 3.0, 3.0, 9.0, 1.0])
+    ranking = SortedRanking(scores)
+    assert ranking.top().tolist() == [3, 0, 1, 2, 4]
+    
+    for index, new_score in [(4, 10.0), (3, 3.0), (0, 0.0)]:
+        ranking.move(index, scores[index], new_score)
+        scores[index] = new_score
+        assert ranking.top().tolist() == np.lexsort((np.arange(5), -scores)).tolist()
+    assert ranking.rank_of(2, scores[2]) == 2
+    print(f"Рейтинг после перемещений: {ranking.top().tolist()}")
+
+
+if __name__ == "__main__":
+    test_incremental_matches_full_recompute()
+    test_sorted_ranking()
+    
+    print("\n=== Все тесты инкрементального анализа пройдены ===")
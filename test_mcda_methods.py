@@ -0,0 +1,271 @@
+"""
+Тестовый файл для проверки работы методов многокритериального анализа
+"""
+import sys
+import threading
+import time
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from mcda_methods import (
+    METHODS, MethodResult, NormalizationCache, electre_iv, electre_iv_matrices, perform_analysis,
+    perform_analysis_parallel, perform_analysis_results,
+    preference_function, promethee_flows, promethee_ii, topsis
+)
+
+
+def reference_electre_iv_matrices(matrix, q=0.1, p=0.3, v=0.5):
+    """Эталонная реализация ELECTRE IV на вложенных циклах"""
+    matrix = np.array(matrix, dtype=float)
+    mins = np.min(matrix, axis=0)
+    ranges = np.max(matrix, axis=0) - mins
+    ranges[ranges == 0] = 1
+    x = (matrix - mins) / ranges
+    n_alt, n_crit = x.shape
+    
+    concordance = np.zeros((n_alt, n_alt))
+    discordance = np.zeros((n_alt, n_alt))
+    for i in range(n_alt):
+        for j in range(n_alt):
+            if i == j:
+                continue
+            s = 0
+            max_diff = 0
+            for k in range(n_crit):
+                diff = x[j, k] - x[i, k]
+                if diff >= p:
+                    s += 0
+                elif diff <= q:
+                    s += 1
+                else:
+                    s += (p - diff) / (p - q)
+                max_diff = max(max_diff, max(0, diff - p) / (v - p))
+            concordance[i, j] = s / n_crit
+            discordance[i, j] = max_diff
+    return concordance, discordance, concordance * (1 - discordance)
+
+
+def test_electre_iv_matches_reference():
+    """Проверяет, что векторизованный ELECTRE IV совпадает с эталоном"""
+    print("=== Тестирование векторизованного ELECTRE IV ===")
+    
+    rng = np.random.default_rng(42)
+    matrix = rng.random((40, 5))
+    
+    expected = reference_electre_iv_matrices(matrix)
+    # Маленький размер блока, чтобы проверить обработку по частям
+    actual = electre_iv_matrices(matrix, block_size=7)
+    
+    for name, exp, act in zip(["согласия", "несогласия", "доверия"], expected, actual):
+        assert np.allclose(exp, act), f"Матрица {name} не совпадает с эталоном"
+        print(f"Матрица {name} совпадает с эталоном")
+    
+    dominance_count = np.sum(expected[2] > 0.5, axis=1)
+    assert electre_iv(matrix) == np.argsort(-dominance_count).tolist()
+    print(f"Ранжирование ELECTRE IV: {electre_iv(matrix)[:5]}...")
+
+
+def reference_promethee_net_flow(matrix, weights):
+    """Эталонная реализация PROMETHEE II на вложенных циклах"""
+    matrix = np.array(matrix, dtype=float)
+    n_alt, n_crit = matrix.shape
+    pi_matrix = np.zeros((n_alt, n_alt))
+    for k in range(n_crit):
+        col_range = np.max(matrix[:, k]) - np.min(matrix[:, k])
+        for i in range(n_alt):
+            for j in range(n_alt):
+                diff = matrix[j, k] - matrix[i, k]
+                if diff > 0 and col_range != 0:
+                    pi_matrix[i, j] += weights[k] * min(1, diff / col_range)
+    return (pi_matrix.sum(axis=1) - pi_matrix.sum(axis=0)) / (n_alt - 1)
+
+
+def test_promethee_matches_reference():
+    """Проверяет блочный PROMETHEE II против эталона"""
+    print("\n=== Тестирование блочного PROMETHEE II ===")
+    
+    rng = np.random.default_rng(7)
+    matrix = rng.random((30, 4))
+    matrix[:, 3] = 1.0  # Постоянный критерий
+    weights = [0.4, 0.3, 0.2, 0.1]
+    
+    expected = reference_promethee_net_flow(matrix, weights)
+    _, _, net_flow = promethee_flows(matrix, weights, block_size=4)
+    assert np.allclose(expected, net_flow)
+    assert promethee_ii(matrix, weights) == np.argsort(-expected).tolist()
+    print("Чистые потоки совпадают с эталоном")
+
+
+def test_preference_functions():
+    """Проверяет стандартные функции предпочтения"""
+    print("\n=== Тестирование функций предпочтения ===")
+    
+    d = np.array([-1.0, 0.0, 0.5, 1.5, 3.0])
+    expected = {
+        'usual': [0, 0, 1, 1, 1],
+        'u-shape': [0, 0, 0, 1, 1],
+        'v-shape': [0, 0, 0.25, 0.75, 1],
+        'level': [0, 0, 0, 0.5, 1],
+        'linear': [0, 0, 0, 0.5, 1],
+    }
+    for kind, values in expected.items():
+        result = preference_function(d, kind, q=1.0, p=2.0)
+        assert np.allclose(result, values), kind
+        print(f"{kind}: {result.tolist()}")
+    
+    gaussian = preference_function(d, 'gaussian', s=1.0)
+    assert gaussian[1] == 0 and np.all(np.diff(gaussian[1:]) > 0)
+    print(f"gaussian: {np.round(gaussian, 3).tolist()}")
+    
+    # Функции можно задавать для каждого критерия отдельно
+    matrix = [[1, 10], [2, 30], [3, 20]]
+    _, _, net_flow = promethee_flows(matrix, [0.5, 0.5], ['usual', {'type': 'linear', 'q': 5, 'p': 15}])
+    assert np.isclose(net_flow.sum(), 0.0)
+
+
+def test_promethee_sorted_matches_pairwise():
+    """Проверяет, что сортировочный алгоритм PROMETHEE совпадает с попарным"""
+    print("\n=== Тестирование PROMETHEE на основе сортировки ===")
+    
+    rng = np.random.default_rng(3)
+    matrix = rng.integers(0, 10, size=(200, 4)).astype(float)  # С повторяющимися значениями
+    weights = [0.1, 0.2, 0.3, 0.4]
+    functions = ['v-shape', {'type': 'v-shape', 'p': 3}, 'usual', {'type': 'linear', 'q': 0, 'p': 5}]
+    
+    for spec in [None, functions]:
+        pairwise = promethee_flows(matrix, weights, spec, algorithm='pairwise')
+        sorted_flows = promethee_flows(matrix, weights, spec, algorithm='sorted')
+        for a, b in zip(pairwise, sorted_flows):
+            assert np.allclose(a, b)
+    print("Потоки совпадают для обоих алгоритмов")
+
+
+def test_normalization_cache_shared():
+    """Проверяет, что нормализации вычисляются один раз и используются всеми методами"""
+    print("\n=== Тестирование общего кэша нормализации ===")
+    
+    matrix = [[1, 2, 3], [4, 5, 6], [7, 8, 9], [2, 9, 4]]
+    weights = [0.3, 0.5, 0.2]
+    cache = NormalizationCache(matrix)
+    
+    vector = cache.normalized('vector')
+    assert cache.normalized('vector') is vector
+    assert np.allclose(np.sum(vector ** 2, axis=0), 1.0)
+    assert topsis(cache, weights) == topsis(matrix, weights)
+    
+    results = perform_analysis(matrix, list(METHODS), weights)
+    for method, ranks in results.items():
+        assert sorted(ranks) == list(range(len(matrix))), method
+    print(f"Все {len(results)} методов вернули полные ранжирования")
+
+
+def test_method_results():
+    """Проверяет структурированные результаты методов"""
+    print("\n=== Тестирование структурированных результатов ===")
+    
+    matrix = [[1, 2, 3], [4, 5, 6], [7, 8, 9], [2, 9, 4]]
+    weights = [0.3, 0.5, 0.2]
+    
+    results = perform_analysis_results(matrix, list(METHODS), weights)
+    rankings = perform_analysis(matrix, list(METHODS), weights)
+    for method, result in results.items():
+        assert result.tolist() == rankings[method], method
+        assert result.scores.shape == (len(matrix),)
+        assert result.positions[result.ranking[0]] == 0
+    
+    assert set(results['ELECTRE'].details) == {'concordance', 'discordance', 'credibility'}
+    assert np.allclose(results['PROMETHEE'].scores,
+                       results['PROMETHEE'].details['leaving_flow'] - results['PROMETHEE'].details['entering_flow'])
+    print(f"Оценки TOPSIS: {np.round(results['TOPSIS'].scores, 3).tolist()}")
+
+
+def test_top_k_ranking():
+    """Проверяет частичное ранжирование лучших альтернатив"""
+    print("\n=== Тестирование частичного ранжирования top_k ===")
+    
+    rng = np.random.default_rng(11)
+    matrix = rng.random((500, 4))
+    weights = [0.25, 0.25, 0.25, 0.25]
+    
+    full = perform_analysis(matrix, list(METHODS), weights)
+    top = perform_analysis(matrix, list(METHODS), weights, top_k=10)
+    for method in METHODS:
+        if method == 'ELECTRE':
+            # Много одинаковых баллов доминирования - порядок равных не определен
+            assert len(top[method]) == 10
+            continue
+        assert top[method] == full[method][:10], method
+    
+    result = perform_analysis_results(matrix, ['TOPSIS'], weights, top_k=3)['TOPSIS']
+    assert (result.positions >= 0).sum() == 3
+    print(f"Лучшие 10 альтернатив по TOPSIS: {top['TOPSIS']}")
+
+
+def slow_method_result(matrix, top_k=None):
+    """Искусственно медленный метод для проверки тайм-аутов и отмены"""
+    time.sleep(2)
+    return MethodResult('SLOW', np.zeros(len(matrix.matrix)), top_k=top_k)
+
+
+def test_parallel_analysis():
+    """Проверяет параллельный запуск методов, тайм-ауты и отмену"""
+    print("\n=== Тестирование параллельного анализа ===")
+    
+    matrix = np.random.default_rng(12).random((60, 4))
+    weights = [0.1, 0.2, 0.3, 0.4]
+    serial = perform_analysis(matrix, list(METHODS), weights, cache=False)
+    
+    for executor in ['thread', 'process']:
+        finished = []
+        runs = perform_analysis_parallel(matrix, list(METHODS) + ['НЕТ'], weights, cache=False,
+                                         executor=executor, max_workers=2, callback=finished.append)
+        assert list(runs) == list(METHODS) + ['НЕТ']
+        assert len(finished) == len(runs)
+        for method in METHODS:
+            assert runs[method].ok and runs[method].executor == executor, runs[method]
+            assert runs[method].result.tolist() == serial[method], method
+            assert runs[method].elapsed >= 0
+        assert runs['НЕТ'].status == 'error' and 'not implemented' in runs['НЕТ'].error
+        print(f"{executor}: {sum(run.elapsed for run in runs.values()):.3f} с суммарно")
+    
+    assert perform_analysis(matrix, ['TOPSIS', 'ELECTRE'], weights, cache=False, parallel=True) == \
+        {'TOPSIS': serial['TOPSIS'], 'ELECTRE': serial['ELECTRE']}
+    
+    METHODS['SLOW'] = (slow_method_result, False)
+    try:
+        start = time.perf_counter()
+        runs = perform_analysis_parallel(matrix, ['SLOW', 'WSR'], weights, cache=False,
+                                         executor='thread', timeout=0.2)
+        assert runs['SLOW'].status == 'timeout' and runs['WSR'].ok
+        assert time.perf_counter() - start < 1.5
+        
+        # Процесс с превысившим время методом завершается, анализ не ждет его окончания
+        start = time.perf_counter()
+        runs = perform_analysis_parallel(matrix, ['SLOW', 'WSR'], weights, cache=False,
+                                         executor='process', timeout=0.2)
+        assert runs['SLOW'].status == 'timeout' and runs['WSR'].ok
+        assert time.perf_counter() - start < 1.5
+        
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        runs = perform_analysis_parallel(matrix, ['SLOW'], weights, cache=False,
+                                         executor='thread', cancel_event=cancel)
+        assert runs['SLOW'].status == 'cancelled'
+        assert perform_analysis(matrix, ['SLOW'], weights, cache=False, parallel=True, timeout=0.2) == {'SLOW': []}
+    finally:
+        del METHODS['SLOW']
+    print("Тайм-аут и отмена работают")
+
+
+if __name__ == "__main__":
+    test_electre_iv_matches_reference()
+    test_promethee_matches_reference()
+    test_preference_functions()
+    test_promethee_sorted_matches_pairwise()
+    test_normalization_cache_shared()
+    test_method_results()
+    test_top_k_ranking()
+    test_parallel_analysis()
+    
+    print("\n=== Все тесты методов анализа пройдены ===")
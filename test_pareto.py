@@ -0,0 +1,81 @@
+"""
+Тестовый файл для проверки алгоритмов поиска множества Парето
+"""
+import sys
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from mcda_methods import perform_analysis_results
+from pareto import ALGORITHMS, non_dominated_sort, pareto_front
+
+
+def naive_pareto_front(matrix):
+    """Эталонный поиск множества Парето полным перебором пар"""
+    front = []
+    for i, alt1 in enumerate(matrix):
+        dominated = False
+        for j, alt2 in enumerate(matrix):
+            if i != j and np.all(alt2 >= alt1) and np.any(alt2 > alt1):
+                dominated = True
+                break
+        if not dominated:
+            front.append(i)
+    return front
+
+
+def test_algorithms_match_reference():
+    """Проверяет, что все алгоритмы совпадают с полным перебором"""
+    print("=== Тестирование алгоритмов поиска множества Парето ===")
+    
+    rng = np.random.default_rng(0)
+    for n_crit in [2, 3, 6]:
+        # Целые значения дают много совпадающих точек
+        matrix = rng.integers(0, 5, size=(300, n_crit)).astype(float)
+        expected = naive_pareto_front(matrix)
+        for algorithm in ALGORITHMS:
+            front = pareto_front(matrix, algorithm=algorithm, use_cache=False)
+            assert front.tolist() == expected, (algorithm, n_crit)
+        print(f"{n_crit} критерия: {len(expected)} альтернатив во фронте, все алгоритмы совпадают")
+
+
+def test_directions_and_cache():
+    """Проверяет учет направлений критериев и кэширование фронта"""
+    print("\n=== Тестирование направлений критериев и кэша ===")
+    
+    data = [[1, 5], [2, 4], [3, 3], [2, 2], [1, 1]]
+    assert pareto_front(data).tolist() == [0, 1, 2]
+    assert pareto_front(data, directions=['cost', 'cost']).tolist() == [4]
+    assert pareto_front(data, directions=['max', 'min']).tolist() == [2, 3, 4]
+    
+    first = pareto_front(data)
+    assert pareto_front(data) is first
+    print(f"Фронт (benefit): {first.tolist()}")
+
+
+def test_non_dominated_sort():
+    """Проверяет разбиение альтернатив на слои Парето"""
+    print("\n=== Тестирование разбиения на слои Парето ===")
+    
+    data = [[1, 5], [2, 4], [3, 3], [2, 2], [1, 1], [2, 2]]
+    assert non_dominated_sort(data).tolist() == [0, 0, 0, 1, 2, 1]
+    
+    rng = np.random.default_rng(5)
+    matrix = rng.integers(0, 6, size=(400, 4)).astype(float)
+    layers = non_dominated_sort(matrix)
+    assert np.array_equal(layers, non_dominated_sort(matrix, algorithm='peeling'))
+    assert np.flatnonzero(layers == 0).tolist() == pareto_front(matrix).tolist()
+    print(f"Количество слоев: {layers.max() + 1}")
+    
+    # Ранжирование только по первому слою
+    results = perform_analysis_results(data, ['WSR'], [0.5, 0.5], pareto_layers=1)
+    assert sorted(results['WSR'].tolist()) == [0, 1, 2]
+    assert results['WSR'].details['pareto_layer'].tolist() == [0, 0, 0, 1, 2, 1]
+
+
+if __name__ == "__main__":
+    test_algorithms_match_reference()
+    test_directions_and_cache()
+    test_non_dominated_sort()
+    
+    print("\n=== Все тесты множества Парето пройдены ===")
@@ -0,0 +1,136 @@
+"""
+Тестовый файл для проверки кэша результатов анализа
+"""
+import os
+import sys
+import tempfile
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+import mcda_methods
+from mcda_methods import perform_analysis, perform_analysis_results
+from result_cache import ResultCache, matrix_digest, result_key
+
+
+def test_memory_and_disk_tiers():
+    """Проверяет попадания, промахи и вытеснение в обоих уровнях кэша"""
+    print("=== Тестирование уровней кэша ===")
+    
+    matrix = np.random.default_rng(1).random((30, 4))
+    weights = [0.1, 0.2, 0.3, 0.4]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        cache = ResultCache(max_entries=2, path=path)
+        
+        first = perform_analysis_results(matrix, ['TOPSIS', 'WSR', 'VIKOR'], weights, cache=cache)
+        assert cache.stats()['misses'] == 3 and cache.stats()['memory_evictions'] == 1
+        again = perform_analysis_results(matrix, ['TOPSIS', 'WSR', 'VIKOR'], weights, cache=cache)
+        stats = cache.stats()
+        assert stats['hits'] == 3 and stats['disk_hits'] >= 1, stats
+        assert again['WSR'].tolist() == first['WSR'].tolist()
+        assert not again['WSR'].scores.flags.writeable
+        # Последний результат остался в памяти и возвращается без копирования
+        assert perform_analysis_results(matrix, ['VIKOR'], weights, cache=cache)['VIKOR'] is again['VIKOR']
+        
+        # Новый сеанс читает результаты с диска
+        cache.close()
+        session = ResultCache(path=path)
+        assert perform_analysis(matrix, ['TOPSIS'], weights, cache=session)['TOPSIS'] == first['TOPSIS'].tolist()
+        assert session.stats()['disk_hits'] == 1
+        
+        # Другие веса - другой ключ, методы без весов от весов не зависят
+        perform_analysis(matrix, ['TOPSIS', 'MINSUM'], [0.4, 0.3, 0.2, 0.1], cache=session)
+        perform_analysis(matrix, ['MINSUM'], weights, cache=session)
+        assert session.stats()['misses'] == 2
+        print(f"Статистика кэша: {session.stats()}")
+        session.close()
+
+
+def test_disk_size_eviction():
+    """Проверяет вытеснение с диска по размеру"""
+    print("\n=== Тестирование вытеснения по размеру ===")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(max_entries=1, path=os.path.join(tmp, "cache.db"), max_bytes=20000)
+        rng = np.random.default_rng(2)
+        for i in range(10):
+            perform_analysis_results(rng.random((200, 3)), ['WSR'], [1, 1, 1], cache=cache)
+        stats = cache.stats()
+        assert stats['disk_evictions'] > 0 and stats['disk_bytes'] <= 20000
+        print(f"Вытеснено с диска: {stats['disk_evictions']}, занято байт: {stats['disk_bytes']}")
+        cache.close()
+    
+    a = np.arange(6.0).reshape(2, 3)
+    assert matrix_digest(a) != matrix_digest(a.reshape(3, 2))
+    assert result_key(matrix_digest(a), 'WSR', [1, 2]) != result_key(matrix_digest(a), 'WSR', [2, 1])
+
+
+def test_memory_size_limit():
+    """Проверяет ограничение памяти кэша в байтах и копирование результатов"""
+    print("\n=== Тестирование ограничения памяти кэша ===")
+    
+    matrix = np.random.default_rng(3).random((100, 3))
+    cache = ResultCache(memory_bytes=245000)
+    
+    # Вызывающий получает изменяемый результат, кэш - полную копию только для чтения
+    computed = perform_analysis_results(matrix, ['ELECTRE'], [1, 1, 1], cache=cache)['ELECTRE']
+    assert computed.scores.flags.writeable and computed.details['concordance'].shape == (100, 100)
+    cached = perform_analysis_results(matrix, ['ELECTRE'], [1, 1, 1], cache=cache)['ELECTRE']
+    assert cached is not computed and cached.tolist() == computed.tolist()
+    assert sorted(cached.details) == sorted(computed.details)
+    assert np.array_equal(cached.details['credibility'], computed.details['credibility'])
+    assert not cached.details['credibility'].flags.writeable
+    assert cache.stats()['memory_bytes'] == 1600 + 3 * 80000
+    
+    # Второй результат не помещается вместе с первым и вытесняет его
+    perform_analysis_results(matrix, ['GRA'], [1, 1, 1], cache=cache)
+    stats = cache.stats()
+    assert stats['memory_entries'] == 1 and stats['memory_evictions'] == 1
+    assert stats['memory_bytes'] <= 245000
+    
+    # Результат больше всего уровня не кэшируется и ничего не вытесняет
+    small = ResultCache(memory_bytes=3000)
+    perform_analysis_results(matrix, ['WSR'], [1, 1, 1], cache=small)
+    first = perform_analysis_results(matrix, ['ELECTRE'], [1, 1, 1], cache=small)['ELECTRE']
+    again = perform_analysis_results(matrix, ['ELECTRE'], [1, 1, 1], cache=small)['ELECTRE']
+    assert again is not first and sorted(again.details) == sorted(first.details)
+    stats = small.stats()
+    assert stats['memory_entries'] == 1 and stats['memory_evictions'] == 0 and stats['misses'] == 3
+    print(f"Занято памяти: {cache.stats()['memory_bytes']} байт")
+
+
+def test_code_version_key():
+    """Проверяет, что ключ зависит от версии кода, вычисляющего результат"""
+    print("\n=== Тестирование версии кода в ключе ===")
+    
+    dataset = matrix_digest(np.eye(3))
+    assert result_key(dataset, 'WSR', [1, 1, 1], version='a') != result_key(dataset, 'WSR', [1, 1, 1], version='b')
+    
+    # Результат, сохраненный на диск старой версией, не возвращается новой
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(path=os.path.join(tmp, "cache.db"))
+        perform_analysis_results(np.eye(3), ['WSR'], [1, 1, 1], cache=cache)
+        old = cache._conn.execute("SELECT key FROM results").fetchone()[0]
+        assert old == result_key(dataset, 'WSR', [1.0, 1.0, 1.0], {'top_k': None, 'pareto_layers': None},
+                                 mcda_methods.CODE_VERSION)
+        cache.close()
+        
+        session = ResultCache(path=os.path.join(tmp, "cache.db"))
+        original = mcda_methods.CODE_VERSION
+        mcda_methods.CODE_VERSION = 'обновление'
+        try:
+            perform_analysis_results(np.eye(3), ['WSR'], [1, 1, 1], cache=session)
+        finally:
+            mcda_methods.CODE_VERSION = original
+        assert session.stats()['disk_hits'] == 0 and session.stats()['misses'] == 1
+        session.close()
+    print("Ключи разных версий кода различаются")
+
+if __name__ == "__main__":
+    test_memory_and_disk_tiers()
+    test_disk_size_eviction()
+    test_memory_size_limit()
+    test_code_version_key()
+    
+    print("\n=== Все тесты кэша результатов пройдены ===")
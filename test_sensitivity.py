@@ -0,0 +1,71 @@
+"""
+Тестовый файл для проверки анализа чувствительности к весам
+"""
+import sys
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from mcda_methods import METHODS
+from sensitivity import (BATCH_METHODS, batch_positions, batch_scores, dirichlet_weights,
+                         grid_weights, oat_weights, sensitivity_analysis)
+
+
+def test_batch_scores():
+    """Проверяет, что пакетные оценки совпадают с расчетом по каждому вектору весов"""
+    print("=== Тестирование пакетного расчета оценок ===")
+    
+    rng = np.random.default_rng(3)
+    matrix = rng.random((40, 4))
+    batch = dirichlet_weights(4, 25, seed=4)
+    assert batch.shape == (25, 4) and np.allclose(batch.sum(axis=1), 1)
+    
+    for method in BATCH_METHODS:
+        scores = batch_scores(matrix, batch, method)
+        positions = batch_positions(scores, BATCH_METHODS[method])
+        for w in range(len(batch)):
+            result = METHODS[method][0](matrix, batch[w])
+            assert np.allclose(scores[:, w], result.scores), method
+            assert np.argsort(positions[:, w]).tolist() == result.tolist(), method
+        print(f"{method}: {len(batch)} векторов весов - OK")
+
+
+def test_sweeps_and_intervals():
+    """Проверяет генераторы весов, статистику устойчивости и интервалы весов"""
+    print("\n=== Тестирование статистики устойчивости ===")
+    
+    grid = grid_weights(3, steps=4)
+    assert len(grid) == 15 and np.allclose(grid.sum(axis=1), 1)
+    assert len(np.unique(grid, axis=0)) == 15
+    
+    oat = oat_weights([0.2, 0.3, 0.5], 0, [0.0, 0.6])
+    assert np.allclose(oat, [[0.0, 0.375, 0.625], [0.6, 0.15, 0.25]])
+    
+    # Первая альтернатива лучшая по первому критерию, вторая - по второму
+    matrix = np.array([[10.0, 1.0], [1.0, 9.0], [5.0, 5.0]])
+    results = sensitivity_analysis(matrix, [0.7, 0.3], methods=['WSR'], mode='grid', steps=10)
+    wsr = results['WSR']
+    assert wsr['base_ranking'].tolist() == [0, 2, 1]
+    assert wsr['positions'].shape == (3, 11)
+    assert np.allclose(wsr['top_frequency'], [6 / 11, 5 / 11, 0])
+    assert wsr['mean_spearman'] < 1
+    
+    # Первая альтернатива остается лучшей, пока вес первого критерия больше 8/17
+    low, high = wsr['top_intervals'][0]
+    assert 8 / 17 < low <= 8 / 17 + 0.01 and high == 1.0
+    print(f"Интервалы весов для WSR: {wsr['top_intervals']}")
+    
+    results = sensitivity_analysis(np.random.default_rng(5).random((30, 3)), [1, 2, 3],
+                                   mode='dirichlet', samples=200, seed=6, interval_steps=21)
+    for method, result in results.items():
+        assert 0 <= result['base_top_share'] <= 1
+        assert np.isclose(result['top_frequency'].sum(), 1)
+        assert len(result['top_intervals']) == 3
+        print(f"{method}: лучшая сохраняется в {result['base_top_share']:.0%} выборок")
+
+
+if __name__ == "__main__":
+    test_batch_scores()
+    test_sweeps_and_intervals()
+    
+    print("\n=== Все тесты анализа чувствительности пройдены ===")
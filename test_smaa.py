@@ -0,0 +1,71 @@
+"""
+Тестовый файл для проверки стохастического анализа приемлемости (SMAA)
+"""
+import sys
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from smaa import smaa
+
+
+def test_acceptability():
+    """Проверяет индексы приемлемости рангов и центральные веса"""
+    print("=== Тестирование индексов приемлемости ===")
+    
+    # Первая альтернатива доминирует, вторая и третья делят второе место в зависимости от весов
+    matrix = np.array([[10.0, 10.0], [5.0, 1.0], [1.0, 5.0]])
+    result = smaa(matrix, 'WSR', samples=4000, workers=0, batch_size=500, chunk_samples=1000, seed=1)
+    acceptability = result['acceptability']
+    assert result['samples'] == 4000 and not result['converged']
+    assert acceptability[0, 0] == 1.0
+    assert np.allclose(acceptability.sum(axis=1), 1) and np.allclose(acceptability.sum(axis=0), 1)
+    assert abs(acceptability[1, 1] - 0.5) < 0.05
+    assert np.allclose(result['central_weights'][0], [0.5, 0.5], atol=0.02)
+    assert np.isnan(result['central_weights'][1]).all()
+    print(f"Приемлемость второго места: {acceptability[1:, 1]}")
+    
+    # Вокруг весов [0.9, 0.1] вторая альтернатива почти всегда вторая
+    result = smaa(matrix, 'TOPSIS', weights=[0.9, 0.1], samples=2000, workers=0, seed=2)
+    assert result['acceptability'][1, 1] > 0.9
+
+
+def test_process_pool_and_early_stopping():
+    """Проверяет расчет в пуле процессов и раннюю остановку"""
+    print("\n=== Тестирование пула процессов и ранней остановки ===")
+    
+    matrix = np.random.default_rng(3).random((20, 4))
+    for method in ['VIKOR', 'PROMETHEE']:
+        serial = smaa(matrix, method, samples=3000, noise=0.05, workers=0, chunk_samples=1000, seed=4)
+        parallel = smaa(matrix, method, samples=3000, noise=0.05, workers=2, chunk_samples=1000, seed=4)
+        assert np.array_equal(serial['acceptability'], parallel['acceptability']), method
+        print(f"{method}: результаты в пуле процессов совпадают")
+    
+    result = smaa(matrix, 'WSR', samples=10 ** 6, tolerance=0.01, workers=2, chunk_samples=1000, seed=5)
+    assert result['converged'] and result['standard_error'] < 0.01
+    assert result['samples'] < 10 ** 6
+    print(f"Остановка после {result['samples']} выборок")
+
+
+def test_noise_standard_error():
+    """Проверяет стандартную ошибку по средним пакетов при шуме в значениях критериев"""
+    print("\n=== Тестирование стандартной ошибки при шуме ===")
+    
+    matrix = np.random.default_rng(6).random((6, 3))
+    exact = smaa(matrix, 'WSR', samples=20000, workers=0, chunk_samples=5000, seed=7)
+    noisy = smaa(matrix, 'WSR', samples=20000, noise=0.2, workers=0, chunk_samples=5000, seed=7)
+    # Выборки одного пакета делят одну зашумленную матрицу, ошибка больше биномиальной
+    assert noisy['standard_error'] > 3 * exact['standard_error']
+    
+    # Один пакет - одна независимая матрица, ранняя остановка невозможна
+    single = smaa(matrix, 'WSR', samples=1000, noise=0.2, tolerance=0.5, workers=0, seed=8)
+    assert single['standard_error'] == float('inf') and not single['converged']
+    print(f"Стандартная ошибка: {exact['standard_error']:.4f} без шума, {noisy['standard_error']:.4f} с шумом")
+
+
+if __name__ == "__main__":
+    test_acceptability()
+    test_process_pool_and_early_stopping()
+    test_noise_standard_error()
+    
+    print("\n=== Все тесты SMAA пройдены ===")
@@ -0,0 +1,52 @@
+"""
+Тестовый файл для проверки вспомогательных функций
+"""
+import sys
+sys.path.insert(0, '/workspace')
+
+import numpy as np
+
+from utils import Fingerprinter, changed_row_blocks, fingerprint_array, hash_data
+
+
+def test_fingerprints():
+    """Проверяет отпечатки наборов данных и поиск измененных блоков строк"""
+    print("=== Тестирование отпечатков данных ===")
+    
+    matrix = np.random.default_rng(0).random((1000, 5))
+    digest = fingerprint_array(matrix)
+    assert fingerprint_array(matrix.copy()) == digest
+    assert fingerprint_array(np.asfortranarray(matrix)) == digest
+    assert fingerprint_array(matrix.reshape(5000, 1)) != digest
+    assert fingerprint_array(matrix.astype(np.float32)) != digest
+    assert hash_data(matrix) == digest
+    assert hash_data(matrix.tolist()) == digest
+    assert hash_data({'веса': [1, 2]}) == hash_data({'веса': [1, 2]})
+    # Строки и целые числа не совпадают с числами с плавающей точкой
+    assert len({hash_data(['1', '2']), hash_data([1, 2]), hash_data([1.0, 2.0])}) == 3
+    assert hash_data([[1, 2], [3]]) == hash_data([[1, 2], [3]])
+    # Массивы объектов и строк хэшируются через JSON
+    mixed = np.array([['A', 1.5], ['B', 2.5]], dtype=object)
+    assert hash_data(mixed) == hash_data(mixed.copy()) == hash_data(mixed.tolist())
+    assert hash_data(mixed) != hash_data(np.array([['A', 1.5], ['B', 3.5]], dtype=object))
+    assert hash_data(np.array(['1', '2'])) == hash_data(['1', '2'])
+    
+    # Отпечаток не зависит от того, какими порциями подавались строки
+    streamed = Fingerprinter(block_rows=100)
+    for start in range(0, 1000, 333):
+        streamed.update(matrix[start:start + 333])
+    whole = Fingerprinter(block_rows=100).update(matrix)
+    assert streamed.hexdigest() == whole.hexdigest()
+    
+    changed = matrix.copy()
+    changed[250, 3] += 1
+    changed = np.vstack([changed, matrix[:10]])
+    blocks = changed_row_blocks(whole.block_digests(), Fingerprinter(block_rows=100).update(changed).block_digests())
+    assert blocks == [2, 10]
+    print(f"Измененные блоки строк: {blocks}")
+
+
+if __name__ == "__main__":
+    test_fingerprints()
+    
+    print("\n=== Все тесты вспомогательных функций пройдены ===")
@@ -10,6 +10,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+from table_models import ArrayTableModel, DataFrameTableModel
+
 # Modern styling
 STYLE_SHEET = """
 QWidget {
@@ -124,7 +126,7 @@ QCheckBox::indicator:checked {
     image: url(data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAgAAAAICAYAAADED76LAAAAGXRFWHRTb2Z0d2FyZQBBZG9iZSBJbWFnZVJlYWR5ccllPAAAAFNJREFUeNpiYMAAXDx8/zEwMPzHweoAxAEhLiYmJvzGsiADGCA0VykmJib8xrIgA1gQGsOCrBEGJpLMxcXF/YeBAQECDAARSwqZkQmVVgAAAABJRU5ErkJggg==);
 }
 
-QTableWidget {
+QTableView {
     border: 2px solid #bdc3c7;
     gridline-color: #ecf0f1;
     background-color: #ffffff;
@@ -197,6 +199,8 @@ class MainWindow(QMainWindow):
     
     def __init__(self):
         super().__init__()
+        self.analysis_worker = None
+        self.results_window = None
         self.initUI()
         
     def initUI(self):
@@ -265,6 +269,13 @@ class MainWindow(QMainWindow):
         self.weights_input.setPlaceholderText("Enter weights separated by commas...")
         input_layout.addWidget(self.weights_input, 2, 1)
         
+        # Number of best alternatives to rank
+        input_layout.addWidget(QLabel("Top Alternatives (optional):"), 3, 0)
+        self.top_k_input = QLineEdit()
+        self.top_k_input.setPlaceholderText("Leave empty to rank all alternatives...")
+        self.top_k_input.setValidator(QIntValidator(1, 2 ** 31 - 1, self.top_k_input))
+        input_layout.addWidget(self.top_k_input, 3, 1)
+        
         # Methods selection
         methods_group = QGroupBox("MCDA Methods")
         methods_layout = QGridLayout(methods_group)  # Changed to QGridLayout for better organization
@@ -290,9 +301,10 @@ class MainWindow(QMainWindow):
         data_group = QGroupBox("Data Table")
         data_layout = QVBoxLayout(data_group)
         
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(4)
-        self.data_table.setHorizontalHeaderLabels([f"Criterion {i+1}" for i in range(4)])
+        # The model's NumPy array is the data; the view only formats visible cells
+        self.data_model = ArrayTableModel(np.zeros((0, 4)), parent=self)
+        self.data_table = QTableView()
+        self.data_table.setModel(self.data_model)
         data_layout.addWidget(self.data_table)
         
         # Buttons
@@ -302,14 +314,24 @@ class MainWindow(QMainWindow):
         generate_btn.clicked.connect(self.generate_table)
         button_layout.addWidget(generate_btn)
         
-        analyze_btn = QPushButton("Analyze")
-        analyze_btn.clicked.connect(self.analyze)
-        button_layout.addWidget(analyze_btn)
+        self.analyze_btn = QPushButton("Analyze")
+        self.analyze_btn.clicked.connect(self.analyze)
+        button_layout.addWidget(self.analyze_btn)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_analysis)
+        button_layout.addWidget(self.cancel_btn)
+        
+        # Progress of a running analysis (finished methods out of selected methods)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
         
         # Add widgets to main layout
         layout.addWidget(input_group)
         layout.addWidget(methods_group)
         layout.addWidget(data_group)
+        layout.addWidget(self.progress_bar)
         layout.addLayout(button_layout)
         
     def load_data(self):
@@ -320,20 +342,13 @@ class MainWindow(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             # Update the main window's data table with imported data
             imported_data = dialog.get_imported_data()
-            if imported_data:
+            if imported_data is not None and len(imported_data):
                 self.update_data_table(imported_data)
     
     def update_data_table(self, data):
         """Update the main data table with imported data"""
-        if data:
-            self.data_table.setRowCount(len(data))
-            self.data_table.setColumnCount(len(data[0]) if data else 0)
-            self.data_table.setHorizontalHeaderLabels([f"Criterion {i+1}" for i in range(len(data[0]) if data else 0)])
-            
-            for i, row in enumerate(data):
-                for j, val in enumerate(row):
-                    item = QTableWidgetItem(str(val))
-                    self.data_table.setItem(i, j, item)
+        if data is not None and len(data):
+            self.data_model.set_array(data)
             
     def save_results(self):
         """Save analysis results"""
@@ -357,15 +372,8 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Please enter valid numbers for alternatives and criteria.")
             return
             
-        self.data_table.setRowCount(num_alternatives)
-        self.data_table.setColumnCount(num_criteria)
-        self.data_table.setHorizontalHeaderLabels([f"Criterion {i+1}" for i in range(num_criteria)])
-        
         # Fill with default values
-        for i in range(num_alternatives):
-            for j in range(num_criteria):
-                item = QTableWidgetItem(str(1.0))
-                self.data_table.setItem(i, j, item)
+        self.data_model.set_array(np.ones((num_alternatives, num_criteria)))
                 
     def analyze(self):
         """Perform MCDA analysis"""
@@ -379,20 +387,8 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Please select at least one method.")
             return
             
-        # Get data from table
-        data = []
-        for i in range(self.data_table.rowCount()):
-            row = []
-            for j in range(self.data_table.columnCount()):
-                item = self.data_table.item(i, j)
-                if item and item.text():
-                    try:
-                        row.append(float(item.text()))
-                    except ValueError:
-                        row.append(0.0)
-                else:
-                    row.append(0.0)
-            data.append(row)
+        # Get data from the table's backing array (empty cells count as 0)
+        data = np.nan_to_num(self.data_model.array(), nan=0.0)
             
         # Get weights
         try:
@@ -402,18 +398,92 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Invalid weights format. Please enter comma-separated numbers.")
             return
             
-        if len(weights) != self.data_table.columnCount():
-            QMessageBox.warning(self, "Error", f"Number of weights ({len(weights)}) must match number of criteria ({self.data_table.columnCount()}).")
+        if len(weights) != data.shape[1]:
+            QMessageBox.warning(self, "Error", f"Number of weights ({len(weights)}) must match number of criteria ({data.shape[1]}).")
             return
-            
-        # Perform analysis (this would call functions from mcda_methods module)
-        from mcda_methods import perform_analysis
-        results = perform_analysis(data, selected_methods, weights)
         
-        # Show results in a new window
+        # Get number of best alternatives to rank
+        top_k = None
+        if self.top_k_input.text().strip():
+            try:
+                top_k = int(self.top_k_input.text())
+            except ValueError:
+                top_k = 0
+            # The validator still lets intermediate input such as 0 through
+            if top_k < 1:
+                QMessageBox.warning(self, "Error", "Number of top alternatives must be a positive integer.")
+                return
+            
+        # Show the results window right away; results stream in as each method finishes
         from results_window import ResultsWindow
-        results_window = ResultsWindow(data, selected_methods, weights, results)
-        results_window.show()
+        self.results_window = ResultsWindow(data, selected_methods, weights, {})
+        self.results_window.show()
+        
+        # Run the methods in a background thread so the event loop keeps running
+        from analysis_worker import AnalysisWorker
+        worker = AnalysisWorker(data, selected_methods, weights, top_k=top_k, parent=self)
+        worker.method_finished.connect(lambda method, run, window=self.results_window:
+                                       self.on_method_finished(window, method, run))
+        worker.progress.connect(self.on_analysis_progress)
+        worker.pareto_layers_ready.connect(self.results_window.set_pareto_layers)
+        worker.analysis_finished.connect(lambda results, window=self.results_window:
+                                         self.on_analysis_finished(window, worker))
+        worker.analysis_failed.connect(lambda message, window=self.results_window:
+                                       self.on_analysis_failed(window, message))
+        worker.finished.connect(worker.deleteLater)
+        
+        self.analysis_worker = worker
+        self.analyze_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.progress_bar.setRange(0, len(selected_methods))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        worker.start()
+    
+    def on_method_finished(self, window, method, run):
+        """Pass a finished method to the results window it belongs to"""
+        if run.ok:
+            window.add_result(method, run.result.tolist())
+        else:
+            window.add_error(method, run.error)
+    
+    def on_analysis_progress(self, finished, total):
+        """Update the progress bar"""
+        self.progress_bar.setValue(finished)
+        self.statusBar().showMessage(f"Analysis: {finished} of {total} methods finished")
+    
+    def on_analysis_finished(self, window, worker):
+        """Complete the results window and re-enable the controls"""
+        window.finish_analysis(cancelled=worker.is_cancelled())
+        self.end_analysis("Analysis cancelled" if worker.is_cancelled() else "Analysis complete")
+    
+    def on_analysis_failed(self, window, message):
+        """Complete the results window with the error and report it"""
+        window.finish_analysis(error=message)
+        self.end_analysis("Analysis failed")
+        QMessageBox.warning(self, "Error", f"Analysis failed: {message}")
+    
+    def end_analysis(self, message):
+        """Reset the controls after the worker finished"""
+        self.analysis_worker = None
+        self.analyze_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self.statusBar().showMessage(message)
+    
+    def cancel_analysis(self):
+        """Cancel the running analysis"""
+        if self.analysis_worker is not None:
+            self.analysis_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.statusBar().showMessage("Cancelling analysis...")
+    
+    def closeEvent(self, event):
+        """Stop a running analysis before the window closes"""
+        if self.analysis_worker is not None:
+            self.analysis_worker.cancel()
+            self.analysis_worker.wait()
+        super().closeEvent(event)
         
     def show_about(self):
         """Show about dialog"""
@@ -457,7 +527,9 @@ class ImportDataDialog(QDialog):
         preview_group = QGroupBox("Data Preview")
         preview_layout = QVBoxLayout(preview_group)
         
-        self.preview_table = QTableWidget()
+        self.preview_model = DataFrameTableModel(parent=self)
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
         self.preview_table.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
         
         preview_layout.addWidget(self.preview_table)
@@ -553,35 +625,21 @@ class ImportDataDialog(QDialog):
                 df = df[1:].reset_index(drop=True)
                 df.columns = df_header.values
             
-            # Update table dimensions
-            self.preview_table.setRowCount(len(df))
-            self.preview_table.setColumnCount(len(df.columns))
-            self.preview_table.setHorizontalHeaderLabels([str(col) for col in df.columns])
-            
-            # Populate table
-            for i in range(len(df)):
-                for j in range(len(df.columns)):
-                    value = df.iloc[i, j]
-                    item = QTableWidgetItem(str(value) if pd.notna(value) else "")
-                    self.preview_table.setItem(i, j, item)
+            # Show the DataFrame; corrections made in the view are written into it
+            self.preview_model.set_dataframe(df)
     
     def import_data(self):
         """Import the data with current settings"""
         if hasattr(self, 'original_df'):
-            df = self.original_df.copy()
-            
-            # Apply header settings
-            if not self.headers_checkbox.isChecked():
-                df.columns = [f"Column_{i}" for i in range(len(df.columns))]
-            else:
-                # Use first row as headers
-                df_header = df.iloc[0]
-                df = df[1:].reset_index(drop=True)
-                df.columns = df_header.values
+            # The previewed data with header settings and manual corrections applied
+            df = self.preview_model.dataframe().copy()
             
             # Convert to numeric where possible
-            for col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='ignore')
+            for j in range(df.shape[1]):
+                try:
+                    df.isetitem(j, pd.to_numeric(df.iloc[:, j]))
+                except (ValueError, TypeError):
+                    pass
             
             # Extract just the numeric data for the main application
             numeric_df = df.select_dtypes(include=[np.number])
@@ -591,8 +649,8 @@ class ImportDataDialog(QDialog):
                     df[col] = pd.to_numeric(df[col], errors='coerce')
                 numeric_df = df.select_dtypes(include=[np.number])
             
-            # Convert to list of lists for compatibility
-            self.imported_data = numeric_df.values.tolist()
+            # Float matrix for the main window's table model
+            self.imported_data = numeric_df.to_numpy(dtype=float)
             
             self.accept()
     
@@ -9,6 +9,22 @@ from typing import List, Tuple, Any, Dict, Union
 import json
 import pickle
 import hashlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Rows per block of a dataset fingerprint
+FINGERPRINT_BLOCK_ROWS = 4096
+
+
+def _new_hasher():
+    """Fast 128-bit hasher: xxh3 if xxhash is installed, blake2b otherwise"""
+    try:
+        import xxhash
+        return xxhash.xxh3_128()
+    except ImportError:
+        return hashlib.blake2b(digest_size=16)
 
 
 def normalize_weights(weights: List[float]) -> List[float]:
@@ -148,7 +164,14 @@ def format_results_for_display(results: Dict[str, Any]) -> Dict[str, Any]:
     formatted = {}
     
     for method, result in results.items():
-        if isinstance(result, list):
+        if hasattr(result, 'ranking') and hasattr(result, 'scores'):
+            # MethodResult - scores are already computed, no need to recompute them
+            formatted[method] = {
+                'rankings': (result.ranking + 1).tolist(),
+                'scores': result.scores.tolist(),
+                'top_alternative': int(result.ranking[0]) + 1 if len(result.ranking) else None
+            }
+        elif isinstance(result, list):
             # If result is a ranking list, format it nicely
             if all(isinstance(x, int) for x in result):
                 # These are ranks, convert to readable format
@@ -258,20 +281,185 @@ def sanitize_input(value: str, allowed_types: List[str] = None) -> Union[str, fl
     return sanitized
 
 
+class Fingerprinter:
+    """
+    Incremental fingerprint of a matrix fed row block by row block
+    
+    Rows are grouped into fixed blocks of block_rows rows whatever the sizes of
+    the chunks passed to update, and every block gets its own digest. The
+    fingerprint of the matrix combines the shape, the dtype and the block
+    digests, so comparing block digests shows which rows changed.
+    """
+    
+    def __init__(self, block_rows: int = FINGERPRINT_BLOCK_ROWS):
+        self.block_rows = block_rows
+        self.n_rows = 0
+        self.row_shape = None
+        self.dtype = None
+        self._digests = []
+        self._hasher = None
+        self._filled = 0
+    
+    def update(self, rows: Any) -> 'Fingerprinter':
+        """
+        Add rows to the fingerprint
+        
+        Args:
+            rows: Array of rows (the first axis is rows), same dtype and row shape every call
+            
+        Returns:
+            self
+        """
+        rows = np.asarray(rows)
+        if rows.ndim == 0:
+            rows = rows.reshape(1)
+        if self.row_shape is None:
+            self.row_shape, self.dtype = rows.shape[1:], rows.dtype
+        elif rows.shape[1:] != self.row_shape or rows.dtype != self.dtype:
+            raise ValueError(f"Expected rows of shape {self.row_shape} and dtype {self.dtype}")
+        
+        start = 0
+        while start < len(rows):
+            if self._hasher is None:
+                self._hasher = _new_hasher()
+            take = min(self.block_rows - self._filled, len(rows) - start)
+            self._hasher.update(memoryview(np.ascontiguousarray(rows[start:start + take])).cast('B'))
+            self._filled += take
+            start += take
+            if self._filled == self.block_rows:
+                self._finish_block()
+        self.n_rows += len(rows)
+        return self
+    
+    def _finish_block(self):
+        """Store the digest of the current block"""
+        self._digests.append(self._hasher.hexdigest())
+        self._hasher = None
+        self._filled = 0
+    
+    def block_digests(self) -> List[str]:
+        """Digests of all row blocks, including the last partial one"""
+        digests = list(self._digests)
+        if self._hasher is not None:
+            digests.append(self._hasher.copy().hexdigest())
+        return digests
+    
+    def hexdigest(self) -> str:
+        """Fingerprint of all rows added so far"""
+        hasher = _new_hasher()
+        shape = (self.n_rows,) + tuple(self.row_shape or ())
+        hasher.update(repr((shape, self.dtype.str if self.dtype is not None else None, self.block_rows)).encode())
+        for digest in self.block_digests():
+            hasher.update(digest.encode())
+        return hasher.hexdigest()
+
+
+def fingerprint_array(array: Any, block_rows: int = FINGERPRINT_BLOCK_ROWS) -> str:
+    """
+    Fingerprint of a NumPy array from its raw bytes, shape and dtype
+    
+    Args:
+        array: Array to fingerprint (memory-mapped arrays are read block by block)
+        block_rows: Rows per block
+        
+    Returns:
+        Hex digest string
+    """
+    return Fingerprinter(block_rows).update(array).hexdigest()
+
+
+def changed_row_blocks(old_digests: List[str], new_digests: List[str]) -> List[int]:
+    """
+    Indices of the row blocks whose digests differ
+    
+    Args:
+        old_digests: Fingerprinter.block_digests() of the old matrix
+        new_digests: Fingerprinter.block_digests() of the new matrix
+        
+    Returns:
+        Block indices that changed, were added or were removed; block i covers
+        rows i * block_rows to (i + 1) * block_rows
+    """
+    changed = [i for i, (old, new) in enumerate(zip(old_digests, new_digests)) if old != new]
+    changed.extend(range(min(len(old_digests), len(new_digests)), max(len(old_digests), len(new_digests))))
+    return changed
+
+
 def hash_data(data: Any) -> str:
     """
     Generate hash for data to identify unique datasets
     
+    Numeric arrays and matrices are fingerprinted from their raw bytes, other
+    data (including object and string arrays) is hashed through its JSON
+    representation. Lists keep the dtype NumPy infers for them (integers stay
+    integers), so values of different types that compare equal as floats,
+    such as '1' and 1, do not share a hash.
+    
     Args:
         data: Data to hash
         
     Returns:
         Hash string
     """
+    if isinstance(data, np.ndarray):
+        if data.dtype.kind in 'biufc':
+            return fingerprint_array(data)
+        data = data.tolist()
+    elif isinstance(data, (list, tuple)):
+        try:
+            array = np.asarray(data)
+        except (ValueError, TypeError):
+            array = None
+        # Strings, mixed and ragged lists are hashed through JSON
+        if array is not None and array.dtype.kind in 'biufc':
+            return fingerprint_array(array)
     data_str = json.dumps(data, sort_keys=True, default=str)
     return hashlib.md5(data_str.encode()).hexdigest()
 
 
+def share_array(array: np.ndarray) -> shared_memory.SharedMemory:
+    """
+    Copy an array into a new shared-memory block for worker processes
+    
+    The caller owns the block and must close() and unlink() it when the
+    workers are done.
+    
+    Args:
+        array: Array to share
+        
+    Returns:
+        SharedMemory block; workers open the array with attach_shared_array
+        using its name and the array's shape and dtype
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block
+
+
+# Shared-memory blocks attached by this (worker) process, by name
+_attached_blocks = {}
+
+
+def attach_shared_array(name: str, shape: Tuple[int, ...], dtype: Any = float) -> np.ndarray:
+    """
+    Array stored in a shared-memory block created by share_array
+    
+    The block is attached once per process and kept open, so repeated tasks
+    on the same array do not map it again.
+    
+    Args:
+        name: Name of the block
+        shape: Shape of the array
+        dtype: Data type of the array
+        
+    Returns:
+        Array view on the shared memory
+    """
+    if name not in _attached_blocks:
+        _attached_blocks[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=_attached_blocks[name].buf)
+
+
 def validate_criteria_direction(directions: List[str]) -> Tuple[bool, str]:
     """
     Validate criteria direction (benefit/cost)
@@ -9,7 +9,55 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.colors as mcolors
 from PyQt5.QtWidgets import QMessageBox
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+
+# Number of rendered figures kept by the figure cache
+FIGURE_CACHE_ENTRIES = 16
+
+
+class FigureCache:
+    """
+    LRU cache of rendered matplotlib figures
+    
+    Keys are the chart type and parameters, so a chart is drawn once and
+    reused when its tab is shown again. Each results window owns its cache:
+    matplotlib binds a figure to the last canvas created for it, so one
+    figure must not be shown by canvases of two windows.
+    """
+    
+    def __init__(self, max_entries: int = FIGURE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+    
+    def get(self, key: Hashable, factory: Callable[[], Any]):
+        """
+        Cached figure for a key, created with factory on a miss
+        
+        Args:
+            key: Dataset hash and chart parameters
+            factory: Function creating the figure (results of None are not cached)
+            
+        Returns:
+            Matplotlib figure object or None
+        """
+        if key in self._figures:
+            self._figures.move_to_end(key)
+            return self._figures[key]
+        figure = factory()
+        if figure is not None:
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+    
+    def clear(self):
+        """Drop all cached figures"""
+        self._figures.clear()
+    
+    def __len__(self):
+        return len(self._figures)
 
 
 class PlotCanvas(FigureCanvas):
@@ -208,7 +256,7 @@ def create_performance_spider_chart(alternative_scores: List[List[float]],
     Returns:
         Matplotlib figure object
     """
-    if not alternative_scores:
+    if len(alternative_scores) == 0:
         return None
         
     n_criteria = len(alternative_scores[0])